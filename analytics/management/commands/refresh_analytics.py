@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from analytics.models import refresh
+
+
+class Command(BaseCommand):
+    help = 'Refreshes the sales and review analytics materialized views'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--blocking', action='store_true',
+            help='Refresh without CONCURRENTLY: faster, but readers wait until it is done',
+        )
+
+    def handle(self, *args, **options):
+        for name in refresh(concurrently=not options['blocking']):
+            self.stdout.write(f'Refreshed {name}')
+
+        self.stdout.write(self.style.SUCCESS('Analytics views refreshed'))
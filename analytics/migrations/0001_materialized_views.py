@@ -0,0 +1,195 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:10
+
+from django.db import migrations, models
+
+# Cancelled orders count in the funnel only
+DAILY_REVENUE = """
+    SELECT (o.created_at AT TIME ZONE 'UTC')::date AS day,
+           COUNT(*) AS orders,
+           COALESCE(SUM(i.units), 0) AS units,
+           SUM(o.total_amount) AS revenue,
+           now() AS refreshed_at
+    FROM products_order o
+    LEFT JOIN (
+        SELECT order_id, SUM(quantity) AS units FROM products_orderitem GROUP BY order_id
+    ) i ON i.order_id = o.id
+    WHERE o.status <> 'CANCELLED'
+    GROUP BY 1
+"""
+
+PRODUCT_SALES = """
+    SELECT p.id AS product_id,
+           p.title,
+           p.category_id,
+           COUNT(DISTINCT i.order_id) AS orders,
+           COALESCE(SUM(i.quantity), 0) AS units,
+           COALESCE(SUM(i.quantity * i.price), 0) AS revenue,
+           now() AS refreshed_at
+    FROM products_product p
+    LEFT JOIN (
+        products_orderitem i JOIN products_order o ON o.id = i.order_id AND o.status <> 'CANCELLED'
+    ) ON i.product_id = p.id
+    GROUP BY p.id
+"""
+
+CATEGORY_SALES = """
+    SELECT c.id AS category_id,
+           c.name,
+           COUNT(DISTINCT i.order_id) AS orders,
+           COALESCE(SUM(i.quantity), 0) AS units,
+           COALESCE(SUM(i.quantity * i.price), 0) AS revenue,
+           now() AS refreshed_at
+    FROM products_productcategory c
+    LEFT JOIN products_product p ON p.category_id = c.id
+    LEFT JOIN (
+        products_orderitem i JOIN products_order o ON o.id = i.order_id AND o.status <> 'CANCELLED'
+    ) ON i.product_id = p.id
+    GROUP BY c.id
+"""
+
+PRODUCT_RATINGS = """
+    SELECT p.id AS product_id,
+           p.title,
+           COUNT(r.id) AS review_count,
+           COALESCE(AVG(r.rating), 0)::double precision AS average_rating,
+           COUNT(*) FILTER (WHERE r.rating = 1) AS rating_1,
+           COUNT(*) FILTER (WHERE r.rating = 2) AS rating_2,
+           COUNT(*) FILTER (WHERE r.rating = 3) AS rating_3,
+           COUNT(*) FILTER (WHERE r.rating = 4) AS rating_4,
+           COUNT(*) FILTER (WHERE r.rating = 5) AS rating_5,
+           now() AS refreshed_at
+    FROM products_product p
+    LEFT JOIN products_productreview r ON r.product_id = p.id
+    GROUP BY p.id
+"""
+
+ORDER_FUNNEL = """
+    SELECT status,
+           array_position(ARRAY['PENDING', 'SHIPPED', 'DELIVERED', 'CANCELLED'], status::text) AS stage,
+           COUNT(*) AS orders,
+           SUM(total_amount) AS revenue,
+           COUNT(*)::double precision / SUM(COUNT(*)) OVER () AS share,
+           now() AS refreshed_at
+    FROM products_order
+    GROUP BY status
+"""
+
+
+def materialized_view(name, query, unique, *indexes):
+    """
+    Create the view with a unique index, which REFRESH ... CONCURRENTLY
+    requires, and any other ``indexes``.
+    """
+    sql = [
+        f'CREATE MATERIALIZED VIEW {name} AS {query}',
+        f'CREATE UNIQUE INDEX {name}_key ON {name} ({unique})',
+    ]
+    sql += [f'CREATE INDEX {name}_{suffix} ON {name} ({columns})' for suffix, columns in indexes]
+    return migrations.RunSQL(sql, f'DROP MATERIALIZED VIEW IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0007_inventory'),
+    ]
+
+    operations = [
+        materialized_view('analytics_daily_revenue', DAILY_REVENUE, 'day'),
+        materialized_view(
+            'analytics_product_sales', PRODUCT_SALES, 'product_id',
+            ('revenue', 'revenue DESC, product_id'), ('category', 'category_id'),
+        ),
+        materialized_view('analytics_category_sales', CATEGORY_SALES, 'category_id'),
+        materialized_view(
+            'analytics_product_ratings', PRODUCT_RATINGS, 'product_id',
+            ('rating', 'average_rating DESC, review_count DESC, product_id'),
+        ),
+        materialized_view('analytics_order_funnel', ORDER_FUNNEL, 'status'),
+        migrations.CreateModel(
+            name='CategorySales',
+            fields=[
+                ('category_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('orders', models.PositiveIntegerField()),
+                ('units', models.PositiveIntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'analytics_category_sales',
+                'ordering': ['-revenue', 'category_id'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('orders', models.PositiveIntegerField()),
+                ('units', models.PositiveIntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'analytics_daily_revenue',
+                'ordering': ['-day'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderFunnel',
+            fields=[
+                ('status', models.CharField(max_length=10, primary_key=True, serialize=False)),
+                ('stage', models.PositiveSmallIntegerField()),
+                ('orders', models.PositiveIntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('share', models.FloatField()),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'analytics_order_funnel',
+                'ordering': ['stage'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductRating',
+            fields=[
+                ('product_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('review_count', models.PositiveIntegerField()),
+                ('average_rating', models.FloatField()),
+                ('rating_1', models.PositiveIntegerField()),
+                ('rating_2', models.PositiveIntegerField()),
+                ('rating_3', models.PositiveIntegerField()),
+                ('rating_4', models.PositiveIntegerField()),
+                ('rating_5', models.PositiveIntegerField()),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'analytics_product_ratings',
+                'ordering': ['-average_rating', '-review_count', 'product_id'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductSales',
+            fields=[
+                ('product_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('category_id', models.BigIntegerField()),
+                ('orders', models.PositiveIntegerField()),
+                ('units', models.PositiveIntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'analytics_product_sales',
+                'ordering': ['-revenue', 'product_id'],
+                'managed': False,
+            },
+        ),
+    ]
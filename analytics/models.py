@@ -0,0 +1,97 @@
+"""
+Read-only models over the sales and review materialized views.
+
+The views are created by this app's migrations and rebuilt by the
+``refresh_analytics`` command; every row carries the ``refreshed_at`` time
+of the refresh that produced it. Cancelled orders are left out of the sales
+figures.
+"""
+from django.db import connection, models
+
+
+class DailyRevenue(models.Model):
+    day = models.DateField(primary_key=True)
+    orders = models.PositiveIntegerField()
+    units = models.PositiveIntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        managed = False
+        db_table = 'analytics_daily_revenue'
+        ordering = ['-day']
+
+class ProductSales(models.Model):
+    product_id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    category_id = models.BigIntegerField()
+    orders = models.PositiveIntegerField()
+    units = models.PositiveIntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        managed = False
+        db_table = 'analytics_product_sales'
+        ordering = ['-revenue', 'product_id']
+
+class CategorySales(models.Model):
+    category_id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    orders = models.PositiveIntegerField()
+    units = models.PositiveIntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        managed = False
+        db_table = 'analytics_category_sales'
+        ordering = ['-revenue', 'category_id']
+
+class ProductRating(models.Model):
+    product_id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    review_count = models.PositiveIntegerField()
+    average_rating = models.FloatField()
+    rating_1 = models.PositiveIntegerField()
+    rating_2 = models.PositiveIntegerField()
+    rating_3 = models.PositiveIntegerField()
+    rating_4 = models.PositiveIntegerField()
+    rating_5 = models.PositiveIntegerField()
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        managed = False
+        db_table = 'analytics_product_ratings'
+        ordering = ['-average_rating', '-review_count', 'product_id']
+
+class OrderFunnel(models.Model):
+    status = models.CharField(max_length=10, primary_key=True)
+    # Position of the status in PENDING > SHIPPED > DELIVERED > CANCELLED
+    stage = models.PositiveSmallIntegerField()
+    orders = models.PositiveIntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    share = models.FloatField()
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        managed = False
+        db_table = 'analytics_order_funnel'
+        ordering = ['stage']
+
+
+MATERIALIZED_VIEWS = [DailyRevenue, ProductSales, CategorySales, ProductRating, OrderFunnel]
+
+
+def refresh(views=None, concurrently=True):
+    """
+    Rebuild the materialized views behind the ``views`` models (all of them
+    by default). A concurrent refresh keeps the views readable while it runs.
+    Returns the names of the views refreshed.
+    """
+    names = [model._meta.db_table for model in views or MATERIALIZED_VIEWS]
+    option = ' CONCURRENTLY' if concurrently else ''
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW{option} {connection.ops.quote_name(name)}')
+    return names
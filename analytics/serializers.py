@@ -0,0 +1,28 @@
+from rest_framework import serializers
+from .models import DailyRevenue, ProductSales, CategorySales, ProductRating, OrderFunnel
+
+class DailyRevenueSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailyRevenue
+        fields = ['day', 'orders', 'units', 'revenue', 'refreshed_at']
+
+class ProductSalesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductSales
+        fields = ['product_id', 'title', 'category_id', 'orders', 'units', 'revenue', 'refreshed_at']
+
+class CategorySalesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CategorySales
+        fields = ['category_id', 'name', 'orders', 'units', 'revenue', 'refreshed_at']
+
+class ProductRatingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductRating
+        fields = ['product_id', 'title', 'review_count', 'average_rating', 'rating_1', 'rating_2',
+                  'rating_3', 'rating_4', 'rating_5', 'refreshed_at']
+
+class OrderFunnelSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderFunnel
+        fields = ['status', 'stage', 'orders', 'revenue', 'share', 'refreshed_at']
@@ -0,0 +1,20 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import (
+    DailyRevenueViewSet,
+    ProductSalesViewSet,
+    CategorySalesViewSet,
+    ProductRatingViewSet,
+    OrderFunnelViewSet
+)
+
+router = DefaultRouter()
+router.register(r'daily-revenue', DailyRevenueViewSet)
+router.register(r'product-sales', ProductSalesViewSet)
+router.register(r'category-sales', CategorySalesViewSet)
+router.register(r'product-ratings', ProductRatingViewSet)
+router.register(r'order-funnel', OrderFunnelViewSet)
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,52 @@
+from rest_framework import viewsets
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
+from django_filters.rest_framework import DjangoFilterBackend
+from .models import DailyRevenue, ProductSales, CategorySales, ProductRating, OrderFunnel
+from .serializers import (
+    DailyRevenueSerializer,
+    ProductSalesSerializer,
+    CategorySalesSerializer,
+    ProductRatingSerializer,
+    OrderFunnelSerializer
+)
+from core.permissions import IsAdminUser
+
+class AnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Pre-aggregated figures read from the analytics materialized views,
+    as fresh as the last ``refresh_analytics`` run.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    # The views have no created_at to page through with a cursor
+    pagination_class = PageNumberPagination
+
+class DailyRevenueViewSet(AnalyticsViewSet):
+    queryset = DailyRevenue.objects.all()
+    serializer_class = DailyRevenueSerializer
+    filterset_fields = {'day': ['gte', 'lte']}
+    ordering_fields = ['day', 'orders', 'units', 'revenue']
+
+class ProductSalesViewSet(AnalyticsViewSet):
+    queryset = ProductSales.objects.all()
+    serializer_class = ProductSalesSerializer
+    filterset_fields = ['category_id']
+    ordering_fields = ['orders', 'units', 'revenue']
+
+class CategorySalesViewSet(AnalyticsViewSet):
+    queryset = CategorySales.objects.all()
+    serializer_class = CategorySalesSerializer
+    ordering_fields = ['orders', 'units', 'revenue']
+
+class ProductRatingViewSet(AnalyticsViewSet):
+    queryset = ProductRating.objects.all()
+    serializer_class = ProductRatingSerializer
+    filterset_fields = {'review_count': ['gte']}
+    ordering_fields = ['review_count', 'average_rating']
+
+class OrderFunnelViewSet(AnalyticsViewSet):
+    queryset = OrderFunnel.objects.all()
+    serializer_class = OrderFunnelSerializer
+    pagination_class = None
@@ -8,7 +8,7 @@ class BlogAdmin(admin.ModelAdmin):
     search_fields = ('title', 'content', 'author__first_name', 'author__last_name')
     prepopulated_fields = {'slug': ('title',)}
     autocomplete_fields = ('author', 'tags')
-    readonly_fields = ('views', 'created_at', 'updated_at')
+    readonly_fields = ('views', 'comment_count', 'created_at', 'updated_at')
     date_hierarchy = 'created_at'
     ordering = ('-created_at',)
 
@@ -17,7 +17,7 @@ class BlogAdmin(admin.ModelAdmin):
             'fields': ('title', 'slug', 'content', 'thumbnail_url', 'author', 'tags', 'published')
         }),
         ('Metadata', {
-            'fields': ('views', 'created_at', 'updated_at'),
+            'fields': ('views', 'comment_count', 'created_at', 'updated_at'),
             'classes': ('collapse',),
         }),
     )
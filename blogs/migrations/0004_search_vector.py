@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def search_vector(weights):
+    # Frozen copy of core.search.search_vector
+    vectors = [SearchVector(field, weight=weight, config=settings.SEARCH_CONFIG) for field, weight in weights.items()]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def backfill_search_vector(apps, schema_editor):
+    Blog = apps.get_model('blogs', 'Blog')
+    Blog.objects.update(search_vector=search_vector({'title': 'A', 'content': 'B'}))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0003_trending_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='blog_search_idx'),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogcomment',
+            index=models.Index(fields=['blog', 'created_at', 'id'], name='blogcomment_blog_created_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0005_created_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(condition=models.Q(('published', True)), fields=['-created_at'], name='blog_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['author', '-created_at'], name='blog_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogcomment',
+            index=models.Index(condition=models.Q(('parent__isnull', True)), fields=['blog', '-created_at'], name='blogcomment_toplevel_idx'),
+        ),
+    ]
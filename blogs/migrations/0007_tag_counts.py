@@ -0,0 +1,30 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:20
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount(model, field, related_model, related_field):
+    # Frozen copy of core.counters.recount
+    rows = related_model.objects.filter(**{related_field: OuterRef('pk')}).order_by()
+    rows = rows.values(related_field).annotate(n=Count('pk')).values('n')
+    model.objects.update(**{field: Coalesce(Subquery(rows, output_field=IntegerField()), 0)})
+
+
+def backfill_tag_counts(apps, schema_editor):
+    Tag = apps.get_model('stories', 'Tag')
+    Blog = apps.get_model('blogs', 'Blog')
+    recount(Tag, 'blog_count', Blog.tags.through, 'tag')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0006_list_indexes'),
+        ('stories', '0008_tag_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_tag_counts, migrations.RunPython.noop),
+    ]
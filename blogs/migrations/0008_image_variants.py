@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0007_tag_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='thumbnail_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
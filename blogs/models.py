@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from django.utils.text import slugify
 from core.models import TimeStampedModel
@@ -9,13 +12,24 @@ class Blog(TimeStampedModel):
     slug = models.SlugField(max_length=255, unique=True, blank=True)
     content = models.TextField()
     thumbnail_url = models.URLField(blank=True)
+    # Resized copies of the thumbnail (see core.images)
+    thumbnail_variants = models.JSONField(default=dict, blank=True, editable=False)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='blogs')
     tags = models.ManyToManyField(Tag, related_name='blogs', blank=True)
     published = models.BooleanField(default=False)
     views = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    trending_score = models.FloatField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-trending_score'], name='blog_trending_idx'),
+            GinIndex(fields=['search_vector'], name='blog_search_idx'),
+            models.Index(fields=['-created_at'], condition=Q(published=True), name='blog_published_idx'),
+            models.Index(fields=['author', '-created_at'], name='blog_author_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -33,6 +47,10 @@ class BlogComment(TimeStampedModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['blog', 'created_at', 'id'], name='blogcomment_blog_created_idx'),
+            models.Index(fields=['blog', '-created_at'], condition=Q(parent__isnull=True), name='blogcomment_toplevel_idx'),
+        ]
     
     def __str__(self):
         return f"Comment by {self.user.get_full_name()} on {self.blog.title}"
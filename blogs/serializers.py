@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from .models import Blog, BlogComment
 from users.serializers import UserSerializer
+from core.fastpath import FastPath
+from core.trees import get_tree_replies
 from stories.serializers import TagSerializer
+from stories.tagging import set_tags
 
 class BlogCommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -13,9 +16,12 @@ class BlogCommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'replies']
     
     def get_replies(self, obj):
-        if not obj.replies.exists():
-            return []
-        return BlogCommentSerializer(obj.replies.all(), many=True).data
+        replies = get_tree_replies(obj)
+        if replies is None:
+            if not obj.replies.exists():
+                return []
+            replies = obj.replies.all()
+        return BlogCommentSerializer(replies, many=True, context=self.context).data
 
 class BlogCommentCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -25,16 +31,15 @@ class BlogCommentCreateSerializer(serializers.ModelSerializer):
 class BlogSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    comment_count = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Blog
-        fields = ['id', 'title', 'slug', 'content', 'thumbnail_url', 'author', 
+        fields = ['id', 'title', 'slug', 'content', 'thumbnail_url', 'thumbnail_variants', 'author', 
                   'tags', 'published', 'views', 'comment_count', 'created_at', 'updated_at']
         read_only_fields = ['id', 'slug', 'views', 'created_at', 'updated_at']
-    
-    def get_comment_count(self, obj):
-        return obj.comments.count()
+
+blog_fast_path = FastPath(BlogSerializer)
 
 class BlogCreateUpdateSerializer(serializers.ModelSerializer):
     tags = serializers.ListField(
@@ -50,10 +55,8 @@ class BlogCreateUpdateSerializer(serializers.ModelSerializer):
         tags_data = validated_data.pop('tags', [])
         blog = Blog.objects.create(author=self.context['request'].user, **validated_data)
         
-        # Process tags
-        for tag_name in tags_data:
-            tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-            blog.tags.add(tag)
+        if tags_data:
+            set_tags(blog, tags_data)
         
         return blog
     
@@ -67,9 +70,6 @@ class BlogCreateUpdateSerializer(serializers.ModelSerializer):
         
         # Update tags if provided
         if tags_data is not None:
-            instance.tags.clear()
-            for tag_name in tags_data:
-                tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-                instance.tags.add(tag)
+            set_tags(instance, tags_data)
         
         return instance
@@ -0,0 +1,16 @@
+from core.cache import register_cache_invalidation
+from core.counters import register_counter
+from core.images import register_images
+from core.search import register_search
+from stories.models import Tag
+from .models import Blog, BlogComment
+
+register_counter(Blog, 'comment_count', BlogComment, 'blog')
+register_counter(Tag, 'blog_count', Blog.tags.through, 'tag')
+
+register_search(Blog, {'title': 'A', 'content': 'B'})
+
+register_images(Blog, {'thumbnail_url': 'thumbnail_variants'})
+
+register_cache_invalidation(Blog)
+register_cache_invalidation(BlogComment)
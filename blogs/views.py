@@ -1,23 +1,43 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Q
 from .models import Blog, BlogComment
 from .serializers import (
     BlogSerializer, 
     BlogCreateUpdateSerializer, 
     BlogCommentSerializer, 
-    BlogCommentCreateSerializer
+    BlogCommentCreateSerializer,
+    blog_fast_path
 )
+from core.asyncviews import AsyncViewMixin
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin
+from core.fastpath import FastListMixin
 from core.permissions import IsOwnerOrReadOnly, IsOwnerOrAdmin, IsAdminUser
+from core.search import FullTextSearchFilter, RankedOrderingFilter
+from core.trees import ReplyTreeMixin
+from core.trending import TrendingMixin
+from core.viewcounts import ViewCountMixin
 
-class BlogViewSet(viewsets.ModelViewSet):
+class BlogViewSet(AsyncViewMixin, CachedResponseMixin, ConditionalGetMixin, ViewCountMixin, TrendingMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = BlogSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['tags__name', 'author__id', 'published']
+    fast_path = blog_fast_path
+    # Anonymous users only see published blogs. Retrieves are not cached so
+    # that every read is still counted as a view.
+    cache_actions = ['list']
+    cache_models = ['blogs.Blog', 'blogs.BlogComment', 'stories.Tag', 'users.User']
+    etag_fields = ['comment_count']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RankedOrderingFilter]
+    filterset_fields = {
+        'tags__name': ['exact'],
+        'author__id': ['exact'],
+        'published': ['exact'],
+        'comment_count': ['gte'],
+    }
     search_fields = ['title', 'content']
-    ordering_fields = ['created_at', 'views']
+    ordering_fields = ['created_at', 'views', 'comment_count']
     ordering = ['-created_at']
     lookup_field = 'slug'
     
@@ -27,15 +47,15 @@ class BlogViewSet(viewsets.ModelViewSet):
         elif self.request.user.is_authenticated:
             # Show published blogs and user's own unpublished blogs
             return Blog.objects.filter(
-                models.Q(published=True) | 
-                models.Q(published=False, author=self.request.user)
+                Q(published=True) | 
+                Q(published=False, author=self.request.user)
             )
         else:
             # Show only published blogs to anonymous users
             return Blog.objects.filter(published=True)
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'trending']:
             permission_classes = [AllowAny]
         elif self.action == 'create':
             permission_classes = [IsAuthenticated]
@@ -50,17 +70,11 @@ class BlogViewSet(viewsets.ModelViewSet):
             return BlogCreateUpdateSerializer
         return BlogSerializer
     
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        # Increment view count
-        instance.views += 1
-        instance.save()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
-
-class BlogCommentViewSet(viewsets.ModelViewSet):
+class BlogCommentViewSet(ReplyTreeMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = BlogComment.objects.filter(parent=None)  # Only top-level comments
     serializer_class = BlogCommentSerializer
+    reply_scope_field = 'blog'
+    etag_scope_field = 'blog'
     
     def get_permissions(self):  
         if self.action in ['list', 'retrieve']:
@@ -77,7 +91,7 @@ class BlogCommentViewSet(viewsets.ModelViewSet):
         return BlogCommentSerializer
     
     def get_queryset(self):
-        queryset = BlogComment.objects.filter(parent=None)  # Only top-level comments
+        queryset = BlogComment.objects.filter(parent=None).select_related('user')  # Only top-level comments
         
         # Filter by blog if provided
         blog_id = self.request.query_params.get('blog', None)
@@ -0,0 +1,87 @@
+"""
+Nearest dialysis center lookup.
+
+Centers are found in two steps, both in SQL:
+
+1. a bounding box around the point, ``radius_km`` wide in every direction,
+   answered by the composite ``(latitude, longitude)`` index;
+2. the great-circle (haversine) distance of the few rows left in the box,
+   which are filtered on the exact radius and sorted by distance.
+
+Only the rows inside the box are ever read, so a lookup costs the same with
+a hundred centers or with tens of thousands of them.
+"""
+import math
+
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Return ``(min_lat, max_lat, lng_ranges)`` enclosing every point within
+    ``radius_km`` of ``(lat, lng)``. ``lng_ranges`` holds two ranges when the
+    box crosses the antimeridian.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+
+    # Near the poles the box spans every longitude
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 0 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+
+    dlng = radius_km / (KM_PER_DEGREE * cos_lat)
+    min_lng, max_lng = lng - dlng, lng + dlng
+    if min_lng < -180:
+        return min_lat, max_lat, [(min_lng + 360, 180.0), (-180.0, max_lng)]
+    if max_lng > 180:
+        return min_lat, max_lat, [(min_lng, 180.0), (-180.0, max_lng - 360)]
+    return min_lat, max_lat, [(min_lng, max_lng)]
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance in kilometres between two points, in Python.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_expression(lat, lng):
+    """
+    Haversine distance in kilometres from ``(lat, lng)`` to the row's
+    ``latitude``/``longitude``, as a database expression.
+    """
+    row_lat = Radians(Cast(F('latitude'), FloatField()))
+    row_lng = Radians(Cast(F('longitude'), FloatField()))
+    phi, lam = math.radians(lat), math.radians(lng)
+    a = (
+        Power(Sin((row_lat - phi) / 2), 2)
+        + math.cos(phi) * Cos(row_lat) * Power(Sin((row_lng - lam) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
+
+
+def nearby(queryset, lat, lng, radius_km, limit):
+    """
+    The ``limit`` rows of ``queryset`` closest to ``(lat, lng)`` within
+    ``radius_km``, nearest first, annotated with ``distance_km``.
+    """
+    min_lat, max_lat, lng_ranges = bounding_box(lat, lng, radius_km)
+    in_box = Q()
+    for min_lng, max_lng in lng_ranges:
+        in_box |= Q(longitude__gte=min_lng, longitude__lte=max_lng)
+
+    return (
+        queryset
+        .filter(in_box, latitude__gte=min_lat, latitude__lte=max_lat)
+        .annotate(distance_km=distance_expression(lat, lng))
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km', 'pk')[:limit]
+    )
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0002_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dialysiscenter',
+            index=models.Index(fields=['city', 'name'], name='center_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dialysiscenter',
+            index=models.Index(fields=['state', 'name'], name='center_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dialysiscenter',
+            index=models.Index(fields=['type', 'name'], name='center_type_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0003_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dialysiscenter',
+            index=models.Index(fields=['latitude', 'longitude'], name='center_location_idx'),
+        ),
+    ]
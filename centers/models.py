@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from core.models import TimeStampedModel
 
@@ -19,9 +21,17 @@ class DialysisCenter(TimeStampedModel):
     image_url = models.URLField(blank=True)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['name']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='center_search_idx'),
+            models.Index(fields=['city', 'name'], name='center_city_idx'),
+            models.Index(fields=['state', 'name'], name='center_state_idx'),
+            models.Index(fields=['type', 'name'], name='center_type_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='center_location_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import DialysisCenter
+from core.fastpath import FastPath
 
 class DialysisCenterSerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,3 +9,20 @@ class DialysisCenterSerializer(serializers.ModelSerializer):
                   'website', 'type', 'description', 'image_url', 'latitude', 
                   'longitude', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+center_fast_path = FastPath(DialysisCenterSerializer)
+
+
+class NearbyDialysisCenterSerializer(DialysisCenterSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+    
+    class Meta(DialysisCenterSerializer.Meta):
+        fields = DialysisCenterSerializer.Meta.fields + ['distance_km']
+
+
+class NearbyQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(min_value=0.1, max_value=500, default=25)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
@@ -0,0 +1,7 @@
+from core.cache import register_cache_invalidation
+from core.search import register_search
+from .models import DialysisCenter
+
+register_search(DialysisCenter, {'name': 'A', 'city': 'B', 'state': 'B', 'address': 'C'})
+
+register_cache_invalidation(DialysisCenter)
@@ -1,20 +1,43 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import DialysisCenter
-from .serializers import DialysisCenterSerializer
+from .geo import nearby
+from .serializers import DialysisCenterSerializer, NearbyDialysisCenterSerializer, NearbyQuerySerializer, center_fast_path
+from core.asyncviews import AsyncViewMixin
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin
+from core.fastpath import FastListMixin
 from core.permissions import IsAdminUser
+from core.search import FullTextSearchFilter
 
-class DialysisCenterViewSet(viewsets.ModelViewSet):
+class DialysisCenterViewSet(AsyncViewMixin, CachedResponseMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = DialysisCenter.objects.all()
+    fast_path = center_fast_path
+    cache_models = ['centers.DialysisCenter']
     serializer_class = DialysisCenterSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['city', 'state', 'type']
     search_fields = ['name', 'address', 'city', 'state']
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'nearby']:
             permission_classes = [AllowAny]
         else:
             permission_classes = [IsAuthenticated, IsAdminUser]
         return [permission() for permission in permission_classes]
+    
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """
+        Centers within ``?radius_km=`` (default 25) of ``?lat=&lng=``,
+        nearest first, at most ``?limit=`` of them.
+        """
+        params = NearbyQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        
+        centers = nearby(self.filter_queryset(self.get_queryset()), **params.validated_data)
+        serializer = NearbyDialysisCenterSerializer(centers, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third-party apps
     'rest_framework',
@@ -42,6 +43,8 @@ INSTALLED_APPS = [
     'centers',
     'products',
     'feedback',
+    'analytics',
+    'tasks',
     'core',
 ]
 
@@ -89,6 +92,33 @@ DATABASES = {
     }
 }
 
+# Cache: CACHE_BACKEND selects locmem (default, per process), file or redis.
+# Response cache invalidation across workers needs file or redis in
+# production. View counts are only buffered with redis, the one backend here
+# that is shared and increments atomically across processes; otherwise each
+# view is written straight to the database (see core.viewcounts).
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'default', 'viewcounts'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache'), str(BASE_DIR / '.viewcounts')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1', 'redis://127.0.0.1:6379/1'),
+}
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.getenv('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'OPTIONS': {'MAX_ENTRIES': 10000} if CACHE_BACKEND != 'redis' else {},
+    },
+    # Buffered view counts are the only copy of the views until they are
+    # flushed, so this cache must not cull them (a noeviction or volatile-*
+    # redis maxmemory policy)
+    'viewcounts': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.getenv('VIEW_COUNT_CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][2]),
+        'OPTIONS': {'MAX_ENTRIES': 10 ** 9} if CACHE_BACKEND != 'redis' else {},
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -129,22 +159,35 @@ REST_FRAMEWORK = {
     # 'DEFAULT_PERMISSION_CLASSES': (
     #     'rest_framework.permissions.IsAuthenticated',
     # ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # orjson-backed JSON when installed (see core.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.SelectablePagination',
     'PAGE_SIZE': 9,
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
+        'core.search.FullTextSearchFilter',
+        'core.search.RankedOrderingFilter',
     ),
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
         'rest_framework.throttling.UserRateThrottle',
     ],
+    # Empty ANON_THROTTLE_RATE / USER_THROTTLE_RATE disable the limits,
+    # for load tests (see benchmark_servers)
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/day',
-        'user': '1000/day',
+        'anon': os.getenv('ANON_THROTTLE_RATE', '100/day') or None,
+        'user': os.getenv('USER_THROTTLE_RATE', '1000/day') or None,
         'login': '5/minute',
         'feedback': '10/day',
+        'uploads': os.getenv('UPLOAD_THROTTLE_RATE', '60/hour') or None,
     },
 }
 
@@ -181,3 +224,64 @@ MINIO_ACCESS_KEY = os.getenv('MINIO_ACCESS_KEY', 'minioadmin')
 MINIO_SECRET_KEY = os.getenv('MINIO_SECRET_KEY', 'minioadmin')
 MINIO_BUCKET_NAME = os.getenv('MINIO_BUCKET_NAME', 'kidney-story')
 MINIO_USE_SSL = os.getenv('MINIO_USE_SSL', 'False') == 'True'
+# Presigning is local once the region is known (see core.storage)
+MINIO_REGION = os.getenv('MINIO_REGION', 'us-east-1')
+MINIO_POOL_SIZE = int(os.getenv('MINIO_POOL_SIZE', '20'))
+MINIO_CONNECT_TIMEOUT = float(os.getenv('MINIO_CONNECT_TIMEOUT', '3'))
+MINIO_READ_TIMEOUT = float(os.getenv('MINIO_READ_TIMEOUT', '30'))
+MINIO_PRESIGN_EXPIRES = int(os.getenv('MINIO_PRESIGN_EXPIRES', '3600'))
+# Multipart uploads (see core.uploads)
+UPLOAD_PART_SIZE = int(os.getenv('UPLOAD_PART_SIZE', str(8 * 1024 * 1024)))
+UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', str(24 * 60 * 60)))
+# Resized image variants (see core.images)
+IMAGE_VARIANT_WIDTHS = [int(width) for width in os.getenv('IMAGE_VARIANT_WIDTHS', '160,480,960').split(',')]
+IMAGE_VARIANT_QUALITY = int(os.getenv('IMAGE_VARIANT_QUALITY', '80'))
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '4'))
+# Background tasks (see tasks.queue)
+TASKS_EAGER = os.getenv('TASKS_EAGER', 'False') == 'True'
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', '5'))
+TASK_RETRY_BACKOFF = int(os.getenv('TASK_RETRY_BACKOFF', '10'))
+TASK_RETRY_BACKOFF_MAX = int(os.getenv('TASK_RETRY_BACKOFF_MAX', '3600'))
+TASK_TIMEOUT = int(os.getenv('TASK_TIMEOUT', '900'))
+TASK_POLL_INTERVAL = float(os.getenv('TASK_POLL_INTERVAL', '1'))
+# Queues run_worker serves unless given --queues: every queue tasks use
+TASK_QUEUES = os.getenv('TASK_QUEUES', 'default,media').split(',')
+
+# View counting (see core.viewcounts)
+VIEW_COUNT_MODELS = ['stories.Story', 'blogs.Blog', 'forums.ForumThread']
+VIEW_COUNT_CACHE = os.getenv('VIEW_COUNT_CACHE', 'viewcounts')
+VIEW_COUNT_FLUSH_INTERVAL = int(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', '60'))
+
+# Trending ranking (see core.trending): engagement column weights per model
+TRENDING_MODELS = {
+    'stories.Story': {'views': 1, 'like_count': 4, 'comment_count': 6},
+    'blogs.Blog': {'views': 1, 'comment_count': 6},
+    'forums.ForumThread': {'views': 1, 'post_count': 4},
+}
+TRENDING_WINDOW_DAYS = int(os.getenv('TRENDING_WINDOW_DAYS', '30'))
+TRENDING_GRAVITY = float(os.getenv('TRENDING_GRAVITY', '1.5'))
+
+# Inventory (see products.inventory): seconds checkout holds reserved stock
+STOCK_RESERVATION_TTL = int(os.getenv('STOCK_RESERVATION_TTL', '900'))
+# Stock given by the inventory migration to products that were in stock
+INVENTORY_INITIAL_STOCK = int(os.getenv('INVENTORY_INITIAL_STOCK', '100'))
+
+# Serve hot list endpoints from .values() rows (see core.fastpath)
+FAST_PATH_SERIALIZERS = os.getenv('FAST_PATH_SERIALIZERS', 'True') == 'True'
+
+# wsgi or asgi, the server gunicorn.conf.py runs. Under ASGI the hot views
+# are served by their async twins (see core.asyncviews)
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', str(SERVER_MODE == 'asgi')) == 'True'
+
+# Anonymous response cache (see core.cache)
+RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', 'default')
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+
+# Full-text search (see core.search): text search configuration for
+# tsvector columns and queries
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'english')
+
+# Tags (see stories.tagging): seconds a worker trusts its name to id map
+# when the cache is per process and it cannot see the changes of the others
+TAG_ID_CACHE_TTL = int(os.getenv('TAG_ID_CACHE_TTL', '30'))
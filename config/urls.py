@@ -34,6 +34,7 @@ urlpatterns = [
     path('api/centers/', include('centers.urls')),
     path('api/products/', include('products.urls')),
     path('api/feedback/', include('feedback.urls')),
+    path('api/analytics/', include('analytics.urls')),
     path('api/', include('core.urls')),
 ]
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
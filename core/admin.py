@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import UploadSession
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('object_name', 'user', 'file_type', 'size', 'part_count', 'status', 'expires_at', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('object_name', 'user__email')
+    list_select_related = ('user',)
+    readonly_fields = ('upload_id',)
+    ordering = ('-created_at',)
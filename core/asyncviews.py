@@ -0,0 +1,80 @@
+"""
+Async request handling for the ASGI mode.
+
+Under ASGI (``SERVER_MODE=asgi``, see ``gunicorn.conf.py``) Django runs
+synchronous views one at a time per worker, on the thread kept for code that
+is not async safe. DRF 3.14 only dispatches synchronously, so views and
+viewsets that should not wait for that thread add ``AsyncViewMixin`` and
+give async twins, prefixed with ``a``, to their hot handlers::
+
+    class FileUploadView(AsyncViewMixin, APIView):
+        def post(self, request): ...
+        async def apost(self, request): ...
+
+    class StoryViewSet(AsyncViewMixin, ..., viewsets.ModelViewSet):
+        ...  # alist comes from FastListMixin
+
+With ``settings.ASYNC_VIEWS`` enabled the view is served as a coroutine:
+requests with an async twin run it on the event loop, the others run the
+synchronous handler as Django would. Authentication, permission and
+throttle checks read the database and the cache, so they run through
+``sync_to_async`` before the twin is awaited. With ``ASYNC_VIEWS`` disabled
+(WSGI) nothing changes.
+"""
+from functools import update_wrapper
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+
+
+class AsyncViewMixin:
+    """
+    View or viewset mixin dispatching to async ``a<handler>`` twins when
+    ``ASYNC_VIEWS`` is enabled. Place it first in the bases.
+    """
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        if not settings.ASYNC_VIEWS:
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            # dispatch() hands back the coroutine of adispatch()
+            return await view(request, *args, **kwargs)
+        return update_wrapper(async_view, view)
+
+    def dispatch(self, request, *args, **kwargs):
+        if settings.ASYNC_VIEWS:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_async_handler(self, request):
+        """
+        The async twin of the handler of ``request``, or ``None``.
+        """
+        method = request.method.lower()
+        if method not in self.http_method_names:
+            return None
+        # Viewsets route methods to actions (list, retrieve, ...)
+        name = getattr(self, 'action_map', {}).get(method, method)
+        handler = getattr(self, f'a{name}', None)
+        return handler if iscoroutinefunction(handler) else None
+
+    async def adispatch(self, request, *args, **kwargs):
+        handler = self.get_async_handler(request)
+        if handler is None:
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+        # APIView.dispatch() with the handler awaited
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,278 @@
+"""
+Response cache for anonymous read endpoints.
+
+``CachedResponseMixin`` stores the serialized data of anonymous ``list`` and
+``retrieve`` responses, keyed by path and normalized query string. Every
+entry is tagged with the models its payload is built from (``cache_models``)
+and each tag carries a version that is part of the key. Apps register their
+models with ``register_cache_invalidation`` from ``signals.py``. Saving or
+deleting one of those models, or changing one of its many-to-many
+relations, bumps the version, so stale entries are never read again and
+expire on their own.
+
+Entries live in the cache named by ``settings.RESPONSE_CACHE``. The default
+cache is configured from ``CACHE_BACKEND`` (locmem, file or redis). Use a
+shared backend so that invalidation is seen by every worker.
+"""
+import asyncio
+import hashlib
+import time
+from collections import defaultdict
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.response import Response
+
+KEY_PREFIX = 'respcache'
+# Validators set by ConditionalGetMixin, stored with the cached data
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE]
+
+
+def is_shared():
+    """
+    Whether the response cache, and so the tag versions, are seen by every
+    worker rather than kept per process.
+    """
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+
+def _tag_key(label):
+    return f'{KEY_PREFIX}:tag:{label.lower()}'
+
+
+def _stat_key(name, outcome):
+    return f'{KEY_PREFIX}:stats:{name}:{outcome}'
+
+
+def tag_versions(labels):
+    cache = get_cache()
+    keys = [_tag_key(label) for label in labels]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*labels):
+    """
+    Drop every cached response tagged with one of the model ``labels``.
+    """
+    get_cache().set_many({_tag_key(label): time.time_ns() for label in labels}, timeout=None)
+
+
+def _record(name, outcome):
+    cache = get_cache()
+    key = _stat_key(name, outcome)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def cache_stats(names):
+    """
+    Return ``{name: {'hits': n, 'misses': n}}`` for the given view names.
+    """
+    cache = get_cache()
+    keys = {(name, outcome): _stat_key(name, outcome) for name in names for outcome in ('hits', 'misses')}
+    values = cache.get_many(list(keys.values()))
+    return {
+        name: {outcome: values.get(keys[name, outcome], 0) for outcome in ('hits', 'misses')}
+        for name in names
+    }
+
+
+# Through model -> labels of the registered models owning the relation
+m2m_owners = defaultdict(set)
+# Model -> the fields whose changes invalidate, when not all of them do
+watched_fields = {}
+
+
+def _check_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    fields = watched_fields[sender]
+    if update_fields is not None:
+        changed = not fields.isdisjoint(update_fields)
+    else:
+        old = sender._base_manager.filter(pk=instance.pk).values(*fields).first()
+        changed = old is None or any(old[field] != getattr(instance, field) for field in fields)
+    if not changed:
+        instance.__dict__['_respcache_unchanged'] = True
+
+
+def _saved(sender, instance=None, **kwargs):
+    if instance is not None and instance.__dict__.pop('_respcache_unchanged', False):
+        return
+    invalidate(sender._meta.label)
+
+
+def _m2m_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate(*m2m_owners[sender])
+
+
+def register_cache_invalidation(model, fields=None):
+    """
+    Invalidate the responses tagged with ``model`` whenever one of its rows
+    is saved or deleted or one of its many-to-many relations changes, from
+    either side. With ``fields``, the names of the fields the responses
+    render, saves that leave all of them unchanged (``update_fields`` without
+    them, or the same values as in the database) do not invalidate.
+    """
+    uid = f'respcache:{model._meta.label}'
+    if fields:
+        watched_fields[model] = frozenset(fields)
+        pre_save.connect(_check_fields, sender=model, dispatch_uid=uid)
+    post_save.connect(_saved, sender=model, dispatch_uid=uid)
+    post_delete.connect(_saved, sender=model, dispatch_uid=uid)
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        m2m_owners[through].add(model._meta.label)
+        m2m_changed.connect(_m2m_changed, sender=through, dispatch_uid='respcache')
+
+
+def normalize_query(query_params):
+    """
+    Canonical form of a query string: parameters sorted by name, blank
+    values dropped, repeated values kept in the order given.
+    """
+    items = sorted((key, value) for key in query_params for value in query_params.getlist(key) if value != '')
+    return urlencode(items)
+
+
+registry = set()
+
+
+class CachedResponseMixin:
+    """
+    ViewSet mixin caching the data of anonymous, successful ``cache_actions``
+    responses. ``cache_models`` lists the labels of the models the payload
+    depends on and defaults to the queryset's model.
+
+    Concurrent misses on the same key are collapsed: one request renders the
+    response while the others wait for it for up to ``LOCK_WAIT`` seconds.
+    Cached ``ETag`` headers keep answering ``If-None-Match`` on hits.
+    """
+    cache_actions = ['list', 'retrieve']
+    cache_models = None
+    cache_timeout = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        registry.add(cls.__name__)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_models(self):
+        return self.cache_models or [self.get_queryset().model._meta.label]
+
+    def get_cache_key(self, request):
+        versions = ':'.join(str(version) for version in tag_versions(self.get_cache_models()))
+        query = hashlib.md5(normalize_query(request.query_params).encode()).hexdigest()
+        return f'{KEY_PREFIX}:{request.path}:{versions}:{query}'
+
+    def should_cache(self, request):
+        return self.action in self.cache_actions and not request.user.is_authenticated
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.should_cache(request):
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        name = type(self).__name__
+        key = self.get_cache_key(request)
+        lock = f'{key}:lock'
+
+        entry = cache.get(key)
+        if entry is None and not cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+            # Another request is rendering this response, wait for it
+            deadline = time.monotonic() + LOCK_WAIT
+            while entry is None and time.monotonic() < deadline:
+                time.sleep(0.02)
+                entry = cache.get(key)
+            lock = None
+
+        if entry is not None:
+            _record(name, 'hits')
+            return self.cached_hit(request, entry)
+
+        _record(name, 'misses')
+        try:
+            response = handler(request, *args, **kwargs)
+            if lock and response.status_code == status.HTTP_200_OK:
+                cache.set(key, self.cache_entry(response), timeout=self.cache_timeout or settings.RESPONSE_CACHE_TIMEOUT)
+        finally:
+            if lock:
+                cache.delete(lock)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(super().alist, request, *args, **kwargs)
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        """
+        ``cached_response`` for async handlers, through the cache's async API.
+        """
+        if not self.should_cache(request):
+            return await handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        name = type(self).__name__
+        key = await sync_to_async(self.get_cache_key)(request)
+        lock = f'{key}:lock'
+
+        entry = await cache.aget(key)
+        if entry is None and not await cache.aadd(lock, 1, timeout=LOCK_TIMEOUT):
+            deadline = time.monotonic() + LOCK_WAIT
+            while entry is None and time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+                entry = await cache.aget(key)
+            lock = None
+
+        if entry is not None:
+            await sync_to_async(_record)(name, 'hits')
+            return self.cached_hit(request, entry)
+
+        await sync_to_async(_record)(name, 'misses')
+        try:
+            response = await handler(request, *args, **kwargs)
+            if lock and response.status_code == status.HTTP_200_OK:
+                await cache.aset(key, self.cache_entry(response), timeout=self.cache_timeout or settings.RESPONSE_CACHE_TIMEOUT)
+        finally:
+            if lock:
+                await cache.adelete(lock)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def cache_entry(self, response):
+        headers = {header: response[header] for header in CACHED_HEADERS if header in response}
+        return response.data, headers
+
+    def cached_hit(self, request, entry):
+        data, headers = entry
+        response = Response(data, headers=headers)
+        response = get_conditional_response(request._request, etag=headers.get('ETag'), response=response)
+        response['X-Cache'] = 'HIT'
+        return response
@@ -0,0 +1,174 @@
+"""
+Conditional GET support (``ETag`` / ``Last-Modified``) for model viewsets.
+
+Validators are derived from ``TimeStampedModel.updated_at`` without
+serializing anything:
+
+* detail responses use the object's ``updated_at``;
+* list responses use ``Max('updated_at')`` and the row count of the filtered
+  queryset, so additions, edits and deletions all change the ``ETag``.
+
+Counter columns that are updated without touching ``updated_at`` are added
+through ``etag_fields``. Related rows rendered in the payload (reviews,
+posts) are added through ``etag_related``, and ``etag_scope_field`` widens
+the validators of threaded discussions to every row of the story, blog or
+thread they belong to. The requesting user and the full path are part of
+the ``ETag`` because payloads can depend on both.
+
+A matching ``If-None-Match`` (or, for detail responses, ``If-Modified-Since``)
+short-circuits with ``304 Not Modified`` before the page is fetched or the
+serializer runs.
+"""
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class PreconditionResponse(Exception):
+    """
+    Raised to abandon a request with the 304/412 response built by
+    ``get_conditional_response``.
+    """
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding ``ETag`` and ``Last-Modified`` to ``list`` and
+    ``retrieve`` responses and answering matching conditional requests with
+    ``304 Not Modified``.
+
+    Place it after ``CachedResponseMixin`` and ``ReplyTreeMixin`` in the
+    bases so that cached responses keep their validators and reply trees are
+    only loaded once the precondition has failed.
+    """
+    etag_fields = []
+    etag_related = []
+    etag_scope_field = None
+
+    def list(self, request, *args, **kwargs):
+        return self.add_validators(super().list(request, *args, **kwargs))
+
+    async def alist(self, request, *args, **kwargs):
+        return self.add_validators(await super().alist(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.add_validators(super().retrieve(request, *args, **kwargs))
+
+    def get_object(self):
+        obj = super().get_object()
+        if self.action == 'retrieve':
+            self.check_validators(*self.get_object_validators(obj))
+        return obj
+
+    def paginate_queryset(self, queryset):
+        # Cursor and count-less pages exist to avoid counting the whole
+        # result set, so they are served without list validators.
+        if self.action == 'list' and self.lists_validators():
+            # Lists only answer If-None-Match: Max(updated_at) does not move
+            # when a row is deleted, so If-Modified-Since alone is unsafe.
+            etag, last_modified = self.get_list_validators(queryset)
+            self.check_validators(etag, last_modified, use_last_modified=False)
+        return super().paginate_queryset(queryset)
+
+    def lists_validators(self):
+        counts_rows = getattr(self.paginator, 'counts_rows', None)
+        return counts_rows is None or counts_rows(self.request, self)
+
+    async def apaginate_queryset(self, queryset):
+        if self.action == 'list' and self.lists_validators():
+            etag, last_modified = await self.aget_list_validators(queryset)
+            self.check_validators(etag, last_modified, use_last_modified=False)
+        return await super().apaginate_queryset(queryset)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, PreconditionResponse):
+            return self.add_validators(exc.response)
+        return super().handle_exception(exc)
+
+    def _needs_aggregate(self):
+        return bool(self.etag_related or self.etag_scope_field or any('__' in f for f in self.etag_fields))
+
+    def get_validator_rows(self, queryset):
+        """
+        The rows whose changes can show up in a response rendering
+        ``queryset``.
+        """
+        manager = queryset.model._default_manager
+        if self.etag_scope_field:
+            scope = f'{self.etag_scope_field}_id'
+            return manager.filter(**{f'{scope}__in': queryset.order_by().values(scope)})
+        return manager.filter(pk__in=queryset.order_by().values('pk'))
+
+    def get_validator_aggregates(self):
+        aggregates = {'updated_at': Max('updated_at'), 'count': Count('pk', distinct=True)}
+        for field in self.etag_fields:
+            aggregates[field] = Sum(field)
+        for relation in self.etag_related:
+            aggregates[f'{relation}__updated_at'] = Max(f'{relation}__updated_at')
+            aggregates[f'{relation}__count'] = Count(relation, distinct=True)
+        return aggregates
+
+    def last_modified(self, values):
+        timestamps = [value for key, value in values.items() if key.endswith('updated_at') and value]
+        return max(timestamps) if timestamps else None
+
+    def aggregate_validators(self, rows):
+        values = rows.aggregate(**self.get_validator_aggregates())
+        return values, self.last_modified(values)
+
+    def get_etag_extras(self, obj):
+        """
+        Values of ``obj`` kept outside its row (e.g. pending views) that the
+        detail ``ETag`` must follow, provided by mixins later in the bases.
+        """
+        extras = getattr(super(), 'get_etag_extras', None)
+        return extras(obj) if extras else {}
+
+    def get_object_validators(self, obj):
+        if self._needs_aggregate():
+            values, last_modified = self.aggregate_validators(
+                self.get_validator_rows(type(obj)._default_manager.filter(pk=obj.pk))
+            )
+        else:
+            values = {field: getattr(obj, field) for field in ['pk', 'updated_at', *self.etag_fields]}
+            last_modified = obj.updated_at
+        values.update(self.get_etag_extras(obj))
+        return self.make_etag(values), last_modified
+
+    def get_list_validators(self, queryset):
+        values, last_modified = self.aggregate_validators(self.get_validator_rows(queryset))
+        return self.make_etag(values), last_modified
+
+    async def aget_list_validators(self, queryset):
+        values = await self.get_validator_rows(queryset).aaggregate(**self.get_validator_aggregates())
+        return self.make_etag(values), self.last_modified(values)
+
+    def make_etag(self, values):
+        user = self.request.user
+        key = repr((
+            self.request.get_full_path(),
+            user.pk if user.is_authenticated else None,
+            sorted(values.items()),
+        ))
+        return f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+
+    def check_validators(self, etag, last_modified, use_last_modified=True):
+        self._validators = (etag, last_modified)
+        timestamp = int(last_modified.timestamp()) if last_modified and use_last_modified else None
+        response = get_conditional_response(self.request._request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            raise PreconditionResponse(response)
+
+    def add_validators(self, response):
+        validators = getattr(self, '_validators', None)
+        if validators and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
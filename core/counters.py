@@ -0,0 +1,146 @@
+"""
+Denormalized counter columns (likes, comments, posts, reviews, ...) kept in
+step with the rows they count.
+
+Each app registers its counters from ``signals.py``. Inserts, moves and
+deletes of counted rows adjust the column with a single
+``UPDATE ... SET n = n + 1``, and many-to-many changes recount the affected
+rows. Deletes and many-to-many changes run inside the transaction Django
+opens for them, so the counter changes with the rows. A save is only
+wrapped in a transaction by its caller, so the counter is adjusted with
+``on_commit`` once the write is committed: a rolled back write is never
+counted, and the parent row is not locked until the end of the caller's
+transaction.
+
+Deleting the object on the other side of a many-to-many relation (a tagged
+story, a user who liked stories) cascades to the through rows without
+``m2m_changed``, so the rows it was counted on are recounted after the
+delete. The ``recount`` command repairs any drift left by bulk operations
+that bypass signals.
+"""
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+registry = []
+
+
+def recount(model, field, related_model, related_field, pks=None):
+    """
+    Recompute ``model.field`` as the number of ``related_model`` rows whose
+    ``related_field`` points at it. Usable with historical models in data
+    migrations.
+    """
+    rows = related_model.objects.filter(**{related_field: OuterRef('pk')}).order_by()
+    rows = rows.values(related_field).annotate(n=Count('pk')).values('n')
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    return queryset.update(**{field: Coalesce(Subquery(rows, output_field=IntegerField()), 0)})
+
+
+class Counter:
+    def __init__(self, model, field, related_model, related_field):
+        self.model = model
+        self.field = field
+        self.related_model = related_model
+        self.related_field = related_field
+        self.attname = related_model._meta.get_field(related_field).attname
+
+    def __str__(self):
+        return f'{self.model._meta.label}.{self.field}'
+
+    def adjust(self, pks, delta):
+        pks = [pk for pk in pks if pk is not None]
+        if pks:
+            self.model.objects.filter(pk__in=pks).update(**{self.field: F(self.field) + delta})
+
+    def recount(self, pks=None):
+        return recount(self.model, self.field, self.related_model, self.related_field, pks)
+
+    def connect(self):
+        uid = f'counter:{self}'
+        if self.related_model._meta.auto_created:
+            m2m_changed.connect(self.m2m_changed, sender=self.related_model, weak=False, dispatch_uid=uid)
+            other = self._other_field().related_model
+            pre_delete.connect(self.pre_delete_other, sender=other, weak=False, dispatch_uid=uid)
+            post_delete.connect(self.post_delete_other, sender=other, weak=False, dispatch_uid=uid)
+        else:
+            pre_save.connect(self.pre_save, sender=self.related_model, weak=False, dispatch_uid=uid)
+            post_save.connect(self.post_save, sender=self.related_model, weak=False, dispatch_uid=uid)
+            post_delete.connect(self.post_delete, sender=self.related_model, weak=False, dispatch_uid=uid)
+
+    def _initial_key(self):
+        return f'_counter_initial_{self.attname}'
+
+    def _other_field(self):
+        """
+        The foreign key of the through model pointing at the other side.
+        """
+        return next(
+            f for f in self.related_model._meta.get_fields()
+            if f.many_to_one and f.name != self.related_field
+        )
+
+    def pre_save(self, sender, instance, raw=False, update_fields=None, **kwargs):
+        # Only an update that writes the foreign key can move the row to
+        # another parent, read the current one back for those
+        if raw or instance._state.adding or self.attname not in instance.__dict__:
+            return
+        if update_fields is not None and self.related_field not in update_fields and self.attname not in update_fields:
+            return
+        initial = sender._base_manager.filter(pk=instance.pk).values_list(self.attname, flat=True).first()
+        instance.__dict__[self._initial_key()] = initial
+
+    def post_save(self, sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        current = getattr(instance, self.attname)
+        initial = None if created else instance.__dict__.pop(self._initial_key(), current)
+        if initial != current:
+            transaction.on_commit(lambda: self.move(initial, current))
+
+    def move(self, old, new):
+        self.adjust([old], -1)
+        self.adjust([new], 1)
+
+    def post_delete(self, sender, instance, **kwargs):
+        self.adjust([getattr(instance, self.attname)], -1)
+
+    def pre_delete_other(self, sender, instance, **kwargs):
+        # The through rows are still there, remember what they counted
+        instance.__dict__[f'_counter_deleted_{self}'] = list(
+            self.related_model.objects.filter(**{self._other_field().name: instance.pk})
+            .values_list(self.attname, flat=True)
+        )
+
+    def post_delete_other(self, sender, instance, **kwargs):
+        self.recount(instance.__dict__.pop(f'_counter_deleted_{self}', []))
+
+    def m2m_changed(self, sender, instance, action, pk_set, **kwargs):
+        counted = self.related_model._meta.get_field(self.related_field).related_model
+        if isinstance(instance, counted):
+            if action in ('post_add', 'post_remove', 'post_clear'):
+                self.recount([instance.pk])
+            return
+
+        # The change was made from the other side of the relation
+        if action == 'pre_clear':
+            instance.__dict__[self._initial_key()] = list(
+                sender.objects.filter(**{self._other_field().name: instance.pk}).values_list(self.attname, flat=True)
+            )
+        elif action == 'post_clear':
+            self.recount(instance.__dict__.pop(self._initial_key(), []))
+        elif action in ('post_add', 'post_remove'):
+            self.recount(pk_set)
+
+
+def register_counter(model, field, related_model, related_field):
+    """
+    Keep ``model.field`` equal to the number of ``related_model`` rows whose
+    ``related_field`` points at it. ``related_model`` may be the through
+    model of a many-to-many relation.
+    """
+    counter = Counter(model, field, related_model, related_field)
+    counter.connect()
+    registry.append(counter)
+    return counter
@@ -0,0 +1,252 @@
+"""
+Fast-path serialization for hot list endpoints.
+
+A ``FastPath`` compiles a read-only ``ModelSerializer`` once into a plan: the
+``.values()`` columns a page needs (nested to-one serializers become joined
+columns) and, per output key, how to turn a row into the value the serializer
+would have produced. Pages are then fetched as dicts and built without
+instantiating models or serializer fields:
+
+* plain fields pass database values through, or go through the declared
+  field's own ``to_representation`` (datetimes, decimals), so the output is
+  identical to the serializer's;
+* nested many-to-many serializers (tags) are loaded for the whole page with
+  one query on the through table;
+* ``SerializerMethodField`` values come from ``BatchField`` resolvers that
+  compute them for the whole page at once.
+
+Fields the plan cannot reproduce exactly raise ``ImproperlyConfigured`` at
+compile time. ``FastListMixin`` serves ``list`` through the viewset's
+``fast_path``; set ``FAST_PATH_SERIALIZERS = False`` to fall back to the
+serializers everywhere. Its ``alist`` twin serves the same payload to async
+views (``core.asyncviews``) through the async ORM.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import ManyToManyField
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+
+# Fields whose to_representation returns the database value unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+    PrimaryKeyRelatedField,
+)
+
+VALUE, CONVERT, NESTED, RESOLVED = range(4)
+
+
+class BatchField:
+    """
+    Replaces a ``SerializerMethodField`` on the fast path.
+    ``resolve(rows, context)`` returns ``{pk: value}`` for a page of rows;
+    rows missing from it get ``default``. ``columns`` are extra ``.values()``
+    columns the resolver reads.
+    """
+    def __init__(self, resolve, default=None, columns=()):
+        self.resolve = resolve
+        self.default = default
+        self.columns = tuple(columns)
+
+
+class Plan:
+    def __init__(self):
+        self.columns = []
+        self.steps = []
+
+    def build(self, row, resolved=None):
+        out = {}
+        for key, kind, arg in self.steps:
+            if kind is VALUE:
+                out[key] = row[arg]
+            elif kind is CONVERT:
+                value = row[arg[0]]
+                out[key] = None if value is None else arg[1](value)
+            elif kind is NESTED:
+                out[key] = None if row[arg[0]] is None else arg[1].build(row)
+            else:
+                values, default = resolved[key]
+                out[key] = values.get(row['id'], default)
+        return out
+
+
+class FastPath:
+    def __init__(self, serializer_class, batch_fields=None):
+        self.serializer_class = serializer_class
+        self.batch_fields = batch_fields or {}
+        self._compiled = None
+
+    @property
+    def compiled(self):
+        # Compiled on first use: serializer fields need the app registry
+        if self._compiled is None:
+            self._compiled = self.compile()
+        return self._compiled
+
+    def compile(self):
+        serializer = self.serializer_class()
+        model = serializer.Meta.model
+        plan = self._compile(serializer, model, prefix='', top=True)
+        relations = {}
+        for key, kind, arg in plan.steps:
+            if kind is RESOLVED and key not in self.batch_fields:
+                relations[key] = arg
+        for name, field in self.batch_fields.items():
+            plan.columns.extend(field.columns)
+        # Row identity, and the position used by cursor pagination
+        for column in ('id', 'created_at'):
+            if column not in plan.columns and any(f.name == column for f in model._meta.concrete_fields):
+                plan.columns.append(column)
+        return plan, relations
+
+    def _compile(self, serializer, model, prefix, top=False):
+        plan = Plan()
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = field.source
+            if top and name in self.batch_fields:
+                plan.steps.append((name, RESOLVED, None))
+            elif isinstance(field, serializers.ListSerializer) and top:
+                plan.steps.append((name, RESOLVED, self._compile_many(field, model)))
+            elif isinstance(field, serializers.ModelSerializer):
+                related = model._meta.get_field(source).related_model
+                nested = self._compile(field, related, f'{prefix}{source}__')
+                plan.columns.append(f'{prefix}{source}')
+                plan.columns.extend(nested.columns)
+                plan.steps.append((name, NESTED, (f'{prefix}{source}', nested)))
+            elif isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)) or '.' in source or source == '*':
+                raise ImproperlyConfigured(
+                    f'{type(serializer).__name__}.{name} cannot be served by the fast path, '
+                    'give it a BatchField'
+                )
+            else:
+                column = f'{prefix}{source}'
+                plan.columns.append(column)
+                if isinstance(field, PASSTHROUGH_FIELDS) and not isinstance(field, serializers.MultipleChoiceField):
+                    plan.steps.append((name, VALUE, column))
+                else:
+                    plan.steps.append((name, CONVERT, (column, field.to_representation)))
+        return plan
+
+    def _compile_many(self, field, model):
+        m2m = model._meta.get_field(field.source)
+        if not isinstance(m2m, ManyToManyField) or not isinstance(field.child, serializers.ModelSerializer):
+            raise ImproperlyConfigured(f'{field.field_name} must be a forward many-to-many nested serializer')
+        owner, target = m2m.m2m_field_name(), m2m.m2m_reverse_field_name()
+        nested = self._compile(field.child, m2m.related_model, f'{target}__')
+        # Same order as prefetch_related(): the related model's Meta.ordering
+        ordering = [
+            f'-{target}__{order[1:]}' if order.startswith('-') else f'{target}__{order}'
+            for order in m2m.related_model._meta.ordering
+        ]
+        return m2m.remote_field.through, owner, nested, ordering + ['pk']
+
+    def values(self, queryset):
+        """
+        ``queryset`` as the dict rows ``serialize`` expects.
+        """
+        plan, _ = self.compiled
+        return queryset.prefetch_related(None).values(*plan.columns)
+
+    def serialize(self, rows, context=None):
+        """
+        The list payload the serializer would produce for ``rows``.
+        """
+        plan, relations = self.compiled
+        context = context or {}
+        pks = [row['id'] for row in rows]
+
+        resolved = {}
+        for name, field in self.batch_fields.items():
+            resolved[name] = (field.resolve(rows, context) if rows else {}), field.default
+        for name, relation in relations.items():
+            related = {pk: [] for pk in pks}
+            if pks:
+                for entry in self.related_entries(relation, pks):
+                    related[entry[relation[1]]].append(relation[2].build(entry))
+            resolved[name] = related, []
+
+        return [plan.build(row, resolved) for row in rows]
+
+    async def aserialize(self, rows, context=None):
+        """
+        ``serialize`` for async views, through the async ORM. Batch
+        resolvers are synchronous and run through ``sync_to_async``.
+        """
+        plan, relations = self.compiled
+        context = context or {}
+        pks = [row['id'] for row in rows]
+
+        resolved = {}
+        for name, field in self.batch_fields.items():
+            resolved[name] = (await sync_to_async(field.resolve)(rows, context) if rows else {}), field.default
+        for name, relation in relations.items():
+            related = {pk: [] for pk in pks}
+            if pks:
+                async for entry in self.related_entries(relation, pks):
+                    related[entry[relation[1]]].append(relation[2].build(entry))
+            resolved[name] = related, []
+
+        return [plan.build(row, resolved) for row in rows]
+
+    def related_entries(self, relation, pks):
+        through, owner, nested, ordering = relation
+        entries = through.objects.filter(**{f'{owner}__in': pks}).order_by(*ordering)
+        return entries.values(owner, *nested.columns)
+
+
+class FastListMixin:
+    """
+    ViewSet mixin serving ``list`` from ``.values()`` rows through
+    ``fast_path`` whenever the action uses the serializer it was compiled
+    from. Place it right before the base viewset class.
+    """
+    fast_path = None
+
+    def use_fast_path(self):
+        return (
+            self.fast_path is not None
+            and getattr(settings, 'FAST_PATH_SERIALIZERS', True)
+            and self.get_serializer_class() is self.fast_path.serializer_class
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_path():
+            return super().list(request, *args, **kwargs)
+
+        rows = self.fast_path.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        context = self.get_serializer_context()
+        if page is not None:
+            return self.get_paginated_response(self.fast_path.serialize(page, context))
+        return Response(self.fast_path.serialize(list(rows), context))
+
+    async def alist(self, request, *args, **kwargs):
+        """
+        ``list`` for async views (see ``core.asyncviews``): the page and its
+        validators are read through the async ORM.
+        """
+        if not self.use_fast_path():
+            return await sync_to_async(super().list)(request, *args, **kwargs)
+
+        # Filter backends may validate values against the database
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        rows = self.fast_path.values(queryset)
+        page = await self.apaginate_queryset(rows)
+        context = self.get_serializer_context()
+        if page is not None:
+            return self.get_paginated_response(await self.fast_path.aserialize(page, context))
+        return Response(await self.fast_path.aserialize([row async for row in rows], context))
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        if not hasattr(self.paginator, 'apaginate_queryset'):
+            return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
@@ -0,0 +1,250 @@
+"""
+Resized variants of uploaded images.
+
+Models with image URL fields register them from ``signals.py`` together with
+a ``JSONField`` holding the variants of the image::
+
+    register_images(Story, {'image_url': 'image_variants'})
+
+For an image stored in the MinIO bucket, ``process`` writes one WebP and
+one JPEG per width in ``settings.IMAGE_VARIANT_WIDTHS`` (no wider than the
+original) under deterministic keys::
+
+    variants/<original object name>/<width>.webp
+    variants/<original object name>/<width>.jpg
+
+and the variants field of every row using the image is set to a
+srcset-style map::
+
+    {"source": "<original URL>",
+     "webp": {"160": "<url>", "480": "<url>"},
+     "jpeg": {"160": "<url>", "480": "<url>"}}
+
+Saving a new URL clears the map, and serializers return it as is: an empty
+map means the variants are not ready (or the image is not in the bucket)
+and the original should be used.
+
+Saving a row with a new image in the bucket queues a ``make_variants`` task
+on the ``media`` queue (see ``tasks.queue``), run by ``run_worker`` (the
+``worker`` service of ``docker-compose.yml``) with the other queues of
+``settings.TASK_QUEUES``, or alone with ``--queues media``. The
+``process_images`` command queues the images still missing variants, to
+backfill existing rows, or renders them itself with a pool of threads.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import io
+import logging
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.signals import post_save, pre_save
+from minio.error import S3Error
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from tasks.queue import task
+from .cache import invalidate
+from .storage import get_storage, object_name_for, public_url_prefix
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+# Format name in the variants map: (Pillow format, extension, content type)
+FORMATS = {
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+}
+# Variants never change once written for a given original
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class ImageError(Exception):
+    """
+    The original cannot be turned into variants; retrying will not help.
+    """
+
+
+def variant_key(object_name, width, extension):
+    return f'variants/{object_name}/{width}.{extension}'
+
+
+def render(data, widths=None, quality=None):
+    """
+    ``(width, format name, bytes)`` for each variant of the image ``data``.
+    """
+    widths = widths or settings.IMAGE_VARIANT_WIDTHS
+    quality = quality or settings.IMAGE_VARIANT_QUALITY
+    try:
+        image = Image.open(io.BytesIO(data))
+        image = ImageOps.exif_transpose(image)
+    except UnidentifiedImageError as e:
+        raise ImageError('Not a supported image format') from e
+    except (Image.DecompressionBombError, OSError) as e:
+        raise ImageError(str(e)) from e
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    # Originals narrower than every width get a single variant at their size
+    targets = sorted({min(width, image.width) for width in widths})
+
+    variants = []
+    for width in targets:
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        for name, (pillow_format, _, _) in FORMATS.items():
+            frame = resized
+            if pillow_format == 'JPEG' and frame.mode == 'RGBA':
+                # JPEG has no alpha, flatten on white
+                frame = Image.new('RGB', frame.size, (255, 255, 255))
+                frame.paste(resized, mask=resized.getchannel('A'))
+            out = io.BytesIO()
+            options = {'optimize': True, 'progressive': True} if pillow_format == 'JPEG' else {'method': 4}
+            frame.save(out, pillow_format, quality=quality, **options)
+            variants.append((width, name, out.getvalue()))
+    return variants
+
+
+def process(url):
+    """
+    Render and store the variants of the image at ``url`` and return its
+    variants map. Raises ``ImageError`` when the image is missing or cannot
+    be decoded.
+    """
+    object_name = object_name_for(url)
+    if object_name is None:
+        raise ImageError(f'{url} is not in the bucket')
+    storage = get_storage()
+    try:
+        data = storage.get_object_bytes(object_name)
+    except S3Error as e:
+        if e.code == 'NoSuchKey':
+            raise ImageError(f'{object_name} does not exist') from e
+        raise
+
+    variants = {'source': url, **{name: {} for name in FORMATS}}
+    for width, name, content in render(data):
+        _, extension, content_type = FORMATS[name]
+        key = variant_key(object_name, width, extension)
+        storage.put_object_bytes(key, content, content_type, cache_control=CACHE_CONTROL)
+        variants[name][str(width)] = storage.get_object_url(key)
+    return variants
+
+
+def pending(model, url_field, variants_field):
+    """
+    Rows of ``model`` whose image is in the bucket and has no variants for
+    its current URL.
+    """
+    return model.objects.filter(**{f'{url_field}__startswith': public_url_prefix()}).annotate(
+        variants_source=KeyTextTransform('source', variants_field),
+    ).filter(Q(variants_source__isnull=True) | ~Q(variants_source=F(url_field)))
+
+
+def pending_urls(limit=None):
+    urls = set()
+    for model, fields in registry.items():
+        for url_field, variants_field in fields.items():
+            rows = pending(model, url_field, variants_field).values_list(url_field, flat=True).distinct()
+            urls.update(rows[:limit] if limit else rows)
+    return sorted(urls)[:limit] if limit else sorted(urls)
+
+
+def store(url, variants):
+    """
+    Set the variants map of every registered row using the image at
+    ``url``, unless it changed in the meantime. Returns the rows updated.
+    """
+    updated = 0
+    for model, fields in registry.items():
+        changed = 0
+        for url_field, variants_field in fields.items():
+            changed += model.objects.filter(**{url_field: url}).update(**{variants_field: variants})
+        if changed:
+            # update() skips post_save, drop the cached responses here
+            invalidate(model._meta.label)
+        updated += changed
+    return updated
+
+
+@task(queue='media')
+def make_variants(url):
+    """
+    Render the variants of the image at ``url`` and store them on the rows
+    using it. Failures other than ``ImageError`` are retried by the queue.
+    """
+    try:
+        variants = process(url)
+    except ImageError as e:
+        logger.warning(f'Cannot make variants of {url}: {e}')
+        variants = {'source': url, 'error': str(e)}
+    store(url, variants)
+
+
+def enqueue_pending(limit=None):
+    """
+    Queue a ``make_variants`` task for each pending image. Returns the
+    number of images queued, not counting those already queued.
+    """
+    return sum(make_variants.enqueue([url], key=url) is not None for url in pending_urls(limit))
+
+
+def _process(url):
+    try:
+        return url, process(url)
+    except ImageError as e:
+        logger.warning(f'Cannot make variants of {url}: {e}')
+        # Recorded so that the image is not retried until its URL changes
+        return url, {'source': url, 'error': str(e)}
+    except Exception:
+        logger.exception(f'Error making variants of {url}')
+        return url, None
+
+
+def process_pending(workers=None, limit=None):
+    """
+    Make the variants of the pending images with ``workers`` threads.
+    Returns ``(processed, failed)`` counts; images that failed for a
+    transient reason stay pending.
+    """
+    processed = failed = 0
+    with ThreadPoolExecutor(max_workers=workers or settings.IMAGE_WORKERS) as pool:
+        for url, variants in pool.map(_process, pending_urls(limit)):
+            if variants is None or 'error' in variants:
+                failed += 1
+            else:
+                processed += 1
+            if variants is not None:
+                store(url, variants)
+    return processed, failed
+
+
+def _pre_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for url_field, variants_field in registry[sender].items():
+        variants = getattr(instance, variants_field) or {}
+        if variants and variants.get('source') != getattr(instance, url_field):
+            # The image changed, its variants are made again
+            setattr(instance, variants_field, {})
+
+
+def _post_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    for url_field, variants_field in registry[sender].items():
+        if update_fields is not None and url_field not in update_fields:
+            continue
+        url = getattr(instance, url_field)
+        if object_name_for(url) and (getattr(instance, variants_field) or {}).get('source') != url:
+            make_variants.enqueue([url], key=url)
+
+
+def register_images(model, fields):
+    """
+    Keep variants of the images at ``model``'s URL fields, ``fields``
+    mapping each URL field to the ``JSONField`` holding its variants map.
+    """
+    registry[model] = fields
+    pre_save.connect(_pre_save, sender=model, dispatch_uid=f'images:{model._meta.label}')
+    post_save.connect(_post_save, sender=model, dispatch_uid=f'images:{model._meta.label}')
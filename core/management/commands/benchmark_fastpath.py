@@ -0,0 +1,115 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.test import APIClient, APIRequestFactory
+
+from blogs.models import Blog
+from blogs.serializers import BlogSerializer, blog_fast_path
+from centers.models import DialysisCenter
+from centers.serializers import DialysisCenterSerializer, center_fast_path
+from forums.models import ForumThread
+from forums.serializers import ForumThreadSerializer, thread_fast_path
+from products.models import Product
+from products.serializers import ProductSerializer, product_fast_path
+from stories.models import Story
+from stories.serializers import StorySerializer, story_fast_path
+
+User = get_user_model()
+
+# Query strings exercising search, filters, ordering and both paginators
+REQUESTS = {
+    '/api/stories/': ['', '?page=2', '?search=vitae', '?ordering=-like_count', '?paginator=cursor', '?count=false'],
+    '/api/blogs/': ['', '?ordering=-comment_count', '?paginator=cursor'],
+    '/api/forums/threads/': ['', '?ordering=-views', '?page=2', '?paginator=cursor'],
+    '/api/products/': ['', '?ordering=-price', '?in_stock=true', '?search=workforce', '?count=false'],
+    '/api/centers/': ['', '?type=HOSPITAL', '?page=2'],
+}
+
+SERIALIZERS = {
+    'stories': (Story.objects.all().prefetch_related('tags'), StorySerializer, story_fast_path),
+    'blogs': (Blog.objects.select_related('author'), BlogSerializer, blog_fast_path),
+    'forum threads': (ForumThread.objects.select_related('user', 'category'), ForumThreadSerializer, thread_fast_path),
+    'products': (Product.objects.with_stats(), ProductSerializer, product_fast_path),
+    'centers': (DialysisCenter.objects.all(), DialysisCenterSerializer, center_fast_path),
+}
+
+
+def best_of(func, repeat, number):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number * 1000)
+    return min(timings), statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = 'Checks that the fast-path list endpoints return the same bytes as the serializers and times both'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=20, help='Runs per timing (default: 20)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timings per measurement (default: 5)')
+        parser.add_argument('--user', help='Email of the user to request as (default: the first active user)')
+
+    def get(self, client, path, fast):
+        with override_settings(FAST_PATH_SERIALIZERS=fast):
+            return client.get(path, HTTP_ACCEPT='application/json')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True).order_by('pk')
+        user = users.filter(email=options['user']).first() if options['user'] else users.first()
+        if user is None:
+            raise CommandError('No user to request as, run seed_data first')
+
+        # Authenticated requests skip the anonymous response cache and
+        # exercise the per-user fields (is_liked)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        mismatches = []
+        for base, queries in REQUESTS.items():
+            for query in queries:
+                path = base + query
+                slow, fast = self.get(client, path, False), self.get(client, path, True)
+                if slow.status_code != 200 or fast.status_code != 200:
+                    raise CommandError(f'{path}: {slow.status_code} / {fast.status_code}')
+                if slow.content != fast.content:
+                    mismatches.append(path)
+                    self.stdout.write(self.style.ERROR(f'  {path}: responses differ'))
+                else:
+                    self.stdout.write(f'  {path}: identical ({len(fast.content)} bytes)')
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} responses differ: {", ".join(mismatches)}')
+
+        request = APIRequestFactory().get('/')
+        request.user = user
+        request.query_params = request.GET
+        context = {'request': request}
+        self.stdout.write('Serialization of a full table:')
+        for name, (queryset, serializer_class, fast_path) in SERIALIZERS.items():
+            slow_best, slow_median = best_of(
+                lambda: serializer_class(queryset.all(), many=True, context=context).data,
+                options['repeat'], options['number'],
+            )
+            fast_best, fast_median = best_of(
+                lambda: fast_path.serialize(list(fast_path.values(queryset.all())), context),
+                options['repeat'], options['number'],
+            )
+            self.stdout.write(
+                f'  {name}: serializer {slow_best:.2f} ms (median {slow_median:.2f}), '
+                f'fast path {fast_best:.2f} ms (median {fast_median:.2f}), {slow_best / fast_best:.1f}x'
+            )
+
+        self.stdout.write('Requests:')
+        for base in REQUESTS:
+            slow_best, _ = best_of(lambda: self.get(client, base, False), options['repeat'], options['number'])
+            fast_best, _ = best_of(lambda: self.get(client, base, True), options['repeat'], options['number'])
+            self.stdout.write(
+                f'  {base}: serializer {slow_best:.2f} ms, fast path {fast_best:.2f} ms, {slow_best / fast_best:.1f}x'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Fast path output is identical'))
@@ -0,0 +1,76 @@
+import io
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+from forums.models import ForumThread
+from forums.serializers import ForumThreadDetailSerializer
+from products.models import Product, ProductReview
+from products.serializers import ProductDetailSerializer
+
+
+def best_of(func, repeat, number):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number * 1000)
+    return min(timings), statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = 'Compares the stdlib and orjson renderers and parsers on product and forum thread detail payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=50, help='Renders per timing (default: 50)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timings per measurement (default: 5)')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson is not installed, FastJSONRenderer falls back to the stdlib renderer')
+
+        request = APIRequestFactory().get('/')
+        request.query_params = request.GET
+        context = {'request': request}
+        products = Product.objects.with_stats().prefetch_related(
+            Prefetch('reviews', queryset=ProductReview.objects.select_related('user'))
+        )
+        payloads = {
+            'products': ProductDetailSerializer(products, many=True, context=context).data,
+            'forum threads': ForumThreadDetailSerializer(
+                ForumThread.objects.select_related('user', 'category'), many=True, context=context,
+            ).data,
+        }
+
+        for name, data in payloads.items():
+            if not data:
+                raise CommandError(f'No {name} to serialize, run seed_data first')
+
+            stdlib_body = JSONRenderer().render(data)
+            fast_body = FastJSONRenderer().render(data)
+            if json.loads(stdlib_body) != json.loads(fast_body):
+                raise CommandError(f'{name}: the renderers disagree')
+            identical = 'byte-identical' if stdlib_body == fast_body else 'equivalent'
+            self.stdout.write(f'{name}: {len(data)} objects, {len(stdlib_body) / 1024:.0f} KiB, {identical} output')
+
+            for label, stdlib, fast in (
+                ('render', lambda: JSONRenderer().render(data), lambda: FastJSONRenderer().render(data)),
+                ('parse', lambda: JSONParser().parse(io.BytesIO(stdlib_body)), lambda: FastJSONParser().parse(io.BytesIO(stdlib_body))),
+            ):
+                stdlib_best, stdlib_median = best_of(stdlib, options['repeat'], options['number'])
+                fast_best, fast_median = best_of(fast, options['repeat'], options['number'])
+                self.stdout.write(
+                    f'  {label}: stdlib {stdlib_best:.2f} ms (median {stdlib_median:.2f}), '
+                    f'orjson {fast_best:.2f} ms (median {fast_median:.2f}), {stdlib_best / fast_best:.1f}x'
+                )
+
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,90 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from centers.geo import haversine_km, nearby
+from centers.models import DialysisCenter
+
+BATCH_SIZE = 1000
+
+
+class Rollback(Exception):
+    pass
+
+
+def naive_nearby(lat, lng, radius_km, limit):
+    """
+    Full scan: every center is loaded and measured in Python.
+    """
+    rows = DialysisCenter.objects.exclude(latitude=None).exclude(longitude=None).values_list('pk', 'latitude', 'longitude')
+    hits = []
+    for pk, row_lat, row_lng in rows:
+        distance = haversine_km(lat, lng, float(row_lat), float(row_lng))
+        if distance <= radius_km:
+            hits.append((distance, pk))
+    hits.sort()
+    return [pk for _, pk in hits[:limit]]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the indexed nearby center lookup against a naive full scan on synthetic centers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--centers', type=int, default=50000, help='Synthetic centers to seed (default: 50000)')
+        parser.add_argument('--queries', type=int, default=50, help='Random lookups to time (default: 50)')
+        parser.add_argument('--radius', type=float, default=25, help='Search radius in km (default: 25)')
+        parser.add_argument('--limit', type=int, default=20, help='Centers per lookup (default: 20)')
+
+    def handle(self, *args, **options):
+        radius, limit = options['radius'], options['limit']
+        # Centers cluster around a few hundred cities, like real ones do
+        cities = [(random.uniform(-50, 60), random.uniform(-130, 150)) for _ in range(300)]
+
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Seeding {options['centers']} synthetic centers...")
+                DialysisCenter.objects.bulk_create(
+                    (self.make_center(i, random.choice(cities)) for i in range(options['centers'])),
+                    batch_size=BATCH_SIZE,
+                )
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(DialysisCenter._meta.db_table)}')
+
+                indexed_times, naive_times = [], []
+                for _ in range(options['queries']):
+                    city_lat, city_lng = random.choice(cities)
+                    lat, lng = city_lat + random.gauss(0, 0.1), city_lng + random.gauss(0, 0.1)
+                    indexed, elapsed = timed(
+                        lambda: [c.pk for c in nearby(DialysisCenter.objects.all(), lat, lng, radius, limit)]
+                    )
+                    indexed_times.append(elapsed)
+                    naive, elapsed = timed(naive_nearby, lat, lng, radius, limit)
+                    naive_times.append(elapsed)
+                    if indexed != naive:
+                        raise CommandError(f'Results differ at ({lat:.5f}, {lng:.5f}): {indexed} != {naive}')
+                raise Rollback
+        except Rollback:
+            pass
+
+        for name, times in (('indexed', indexed_times), ('full scan', naive_times)):
+            times.sort()
+            p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+            self.stdout.write(f'{name}: median {statistics.median(times):.2f} ms, p95 {p95:.2f} ms')
+        speedup = statistics.median(naive_times) / statistics.median(indexed_times)
+        self.stdout.write(self.style.SUCCESS(f'Indexed lookup is {speedup:.0f}x faster with identical results'))
+
+    def make_center(self, i, city):
+        lat, lng = city
+        return DialysisCenter(
+            name=f'Benchmark Center {i}', address='Address', city='City', state='State', contact='0',
+            type='HOSPITAL', latitude=round(lat + random.gauss(0, 0.3), 6), longitude=round(lng + random.gauss(0, 0.3), 6),
+        )
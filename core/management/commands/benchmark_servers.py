@@ -0,0 +1,212 @@
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+# Read-heavy endpoints served by async views in ASGI mode
+PATHS = [
+    '/api/stories/',
+    '/api/stories/?paginator=cursor',
+    '/api/forums/threads/',
+    '/api/blogs/',
+    '/api/products/?ordering=-price',
+    '/api/centers/?page=2',
+]
+UPLOAD = ('POST', '/api/upload/', json.dumps({'file_type': 'image/jpeg'}))
+# Every request names the same host, so links in the payloads match
+HOST = 'localhost'
+
+
+def percentile(latencies, fraction):
+    return latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] * 1000 if latencies else 0
+
+
+class Server:
+    """
+    gunicorn running gunicorn.conf.py in ``mode`` on ``port``.
+    """
+    def __init__(self, mode, port, workers):
+        self.mode, self.port, self.workers = mode, port, workers
+        self.process = None
+
+    def __enter__(self):
+        env = {
+            **os.environ,
+            'SERVER_MODE': self.mode,
+            'GUNICORN_BIND': f'127.0.0.1:{self.port}',
+            'WEB_CONCURRENCY': str(self.workers),
+            # The load comes from one address, far above the public limits
+            'ANON_THROTTLE_RATE': '',
+            'USER_THROTTLE_RATE': '',
+        }
+        env.pop('ASYNC_VIEWS', None)
+        self.log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py'],
+            cwd=settings.BASE_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.log.close()
+
+    def output(self):
+        self.log.seek(0)
+        return self.log.read().decode(errors='replace')[-2000:]
+
+    def wait_ready(self, path, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f'{self.mode} server exited:\n{self.output()}')
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=5)
+                connection.request('GET', path, headers={'Host': HOST})
+                connection.getresponse().read()
+                connection.close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'{self.mode} server did not start in {timeout}s:\n{self.output()}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Serves the API with gunicorn in WSGI and ASGI mode, checks that both give the same responses '
+        'and compares requests per second and latency under concurrent load'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help=f'Paths to request (default: {", ".join(PATHS)})')
+        parser.add_argument('--modes', default='wsgi,asgi', help='Server modes to run (default: wsgi,asgi)')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers per server (default: 2)')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients (default: 32)')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds of load per mode (default: 10)')
+        parser.add_argument('--warmup', type=float, default=2, help='Seconds of load before measuring (default: 2)')
+        parser.add_argument('--port', type=int, default=8700, help='Port of the servers (default: 8700)')
+        parser.add_argument('--upload', action='store_true', help='Also presign uploads (needs MinIO)')
+        parser.add_argument('--user', help='Email of the user to request as (default: anonymous)')
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        if any(mode not in ('wsgi', 'asgi') for mode in modes):
+            raise CommandError('Modes must be wsgi or asgi')
+
+        headers = {'Host': HOST, 'Accept': 'application/json', 'Content-Type': 'application/json'}
+        if options['user']:
+            # Authenticated requests skip the anonymous response cache
+            user = User.objects.filter(email=options['user'], is_active=True).first()
+            if user is None:
+                raise CommandError(f'No active user {options["user"]}')
+            headers['Authorization'] = f'Bearer {AccessToken.for_user(user)}'
+        requests = [('GET', path, None) for path in options['paths'] or PATHS]
+        if options['upload']:
+            requests.append(UPLOAD)
+
+        bodies, results = {}, {}
+        for mode in modes:
+            self.stdout.write(f'{mode}: starting {options["workers"]} workers')
+            with Server(mode, options['port'], options['workers']) as server:
+                server.wait_ready(requests[0][1])
+                self.check_responses(server, mode, requests, headers, bodies)
+                self.load(server.port, requests, headers, options['concurrency'], options['warmup'])
+                results[mode] = self.load(server.port, requests, headers, options['concurrency'], options['duration'])
+            self.report(mode, results[mode], options['duration'])
+
+        if len(results) > 1:
+            (first, a), (second, b) = list(results.items())[:2]
+            rps_a, rps_b = len(a['all']) / options['duration'], len(b['all']) / options['duration']
+            self.stdout.write(self.style.SUCCESS(
+                f'{second} vs {first}: {rps_b / rps_a if rps_a else 0:.2f}x requests per second, '
+                f'p99 {percentile(b["all"], 0.99):.1f} ms vs {percentile(a["all"], 0.99):.1f} ms'
+            ))
+
+    def check_responses(self, server, mode, requests, headers, bodies):
+        connection = http.client.HTTPConnection('127.0.0.1', server.port, timeout=30)
+        for method, path, body in requests:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            content = response.read()
+            if response.status >= 400:
+                raise CommandError(f'{mode} {method} {path}: {response.status} {content[:200]!r}')
+            # Presigned URLs are unique per request
+            if method == 'GET':
+                if bodies.setdefault((method, path), content) != content:
+                    raise CommandError(f'{method} {path}: {mode} response differs')
+        connection.close()
+
+    def load(self, port, requests, headers, concurrency, duration):
+        """
+        ``concurrency`` clients sending ``requests`` in turn on keep-alive
+        connections for ``duration`` seconds. Returns the sorted latencies
+        of successful responses per path and overall, and the errors.
+        """
+        latencies = defaultdict(list)
+        errors = []
+        deadline = time.monotonic() + duration
+
+        def client(offset):
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            i = offset
+            while time.monotonic() < deadline:
+                method, path, body = requests[i % len(requests)]
+                i += 1
+                start = time.perf_counter()
+                try:
+                    connection.request(method, path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                except (OSError, http.client.HTTPException) as exc:
+                    errors.append(repr(exc))
+                    connection.close()
+                    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                    continue
+                if response.status >= 400:
+                    errors.append(f'{path}: {response.status}')
+                else:
+                    latencies[path].append(time.perf_counter() - start)
+            connection.close()
+
+        clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+
+        results = {path: sorted(values) for path, values in latencies.items()}
+        results['all'] = sorted(value for values in latencies.values() for value in values)
+        results['errors'] = errors
+        return results
+
+    def report(self, mode, results, duration):
+        for path, latencies in results.items():
+            if path == 'errors':
+                continue
+            self.stdout.write(
+                f'  {path}: {len(latencies) / duration:.0f} req/s, '
+                f'p50 {percentile(latencies, 0.5):.1f} ms, p99 {percentile(latencies, 0.99):.1f} ms'
+            )
+        if results['errors']:
+            self.stdout.write(self.style.ERROR(
+                f'  {len(results["errors"])} errors, e.g. {", ".join(results["errors"][:3])}'
+            ))
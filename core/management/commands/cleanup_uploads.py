@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.uploads import cleanup
+
+
+class Command(BaseCommand):
+    help = 'Aborts expired multipart upload sessions and the abandoned multipart uploads left in MinIO'
+
+    def handle(self, *args, **options):
+        expired, stale = cleanup()
+        self.stdout.write(self.style.SUCCESS(
+            f'Aborted {expired} expired upload sessions and {stale} abandoned multipart uploads'
+        ))
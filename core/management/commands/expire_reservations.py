@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products.inventory import expire_reservations
+
+
+class Command(BaseCommand):
+    help = 'Gives back the stock held by expired checkout reservations'
+
+    def handle(self, *args, **kwargs):
+        count = expire_reservations()
+        self.stdout.write(self.style.SUCCESS(f'Expired {count} stock reservations'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.viewcounts import view_counter
+
+
+class Command(BaseCommand):
+    help = 'Writes buffered story, blog and forum thread views to the database'
+
+    def handle(self, *args, **kwargs):
+        flushed = view_counter.flush()
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} views'))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.images import enqueue_pending, process_pending
+
+
+class Command(BaseCommand):
+    help = 'Queues (or makes, with --inline) the resized variants of uploaded images that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inline', action='store_true', help='Make the variants here instead of queueing tasks')
+        parser.add_argument(
+            '--workers', type=int, default=settings.IMAGE_WORKERS,
+            help=f'Images processed at once with --inline (default: {settings.IMAGE_WORKERS})',
+        )
+        parser.add_argument('--limit', type=int, help='Images handled by this run (default: all pending)')
+
+    def handle(self, *args, **options):
+        if not options['inline']:
+            queued = enqueue_pending(limit=options['limit'])
+            self.stdout.write(self.style.SUCCESS(f'Queued {queued} images, run_worker --queues media makes them'))
+            return
+        processed, failed = process_pending(workers=options['workers'], limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f'Made variants of {processed} images, {failed} failed'))
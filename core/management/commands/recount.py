@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.counters import registry
+
+
+class Command(BaseCommand):
+    help = 'Recomputes denormalized counter columns (likes, comments, posts, reviews, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'counters', nargs='*',
+            help='Counters to repair, e.g. stories.Story.like_count or stories.Story (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        selected = options['counters']
+        counters = [
+            counter for counter in registry
+            if not selected or any(str(counter) == name or str(counter).startswith(f'{name}.') for name in selected)
+        ]
+        if selected and not counters:
+            raise CommandError(f"No registered counters match {', '.join(selected)}")
+
+        for counter in counters:
+            updated = counter.recount()
+            self.stdout.write(f'Recounted {counter} on {updated} rows')
+
+        self.stdout.write(self.style.SUCCESS(f'Recounted {len(counters)} counters'))
@@ -0,0 +1,29 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.cache import cache_stats, invalidate, registry
+
+
+class Command(BaseCommand):
+    help = 'Shows response cache hits and misses per viewset, or drops cached responses with --clear'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear', nargs='+', metavar='MODEL',
+            help='Invalidate the responses tagged with these models, e.g. products.Product',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            invalidate(*options['clear'])
+            self.stdout.write(self.style.SUCCESS(f"Invalidated {', '.join(options['clear'])}"))
+            return
+
+        # Importing the URLconf registers every cached viewset
+        import_module(settings.ROOT_URLCONF)
+        for name, stats in sorted(cache_stats(sorted(registry)).items()):
+            total = stats['hits'] + stats['misses']
+            ratio = stats['hits'] / total if total else 0
+            self.stdout.write(f"{name}: {stats['hits']} hits, {stats['misses']} misses ({ratio:.0%} hit rate)")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from stories.tagging import RELATED_PER_TAG, rollup_cooccurrence
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the tag co-occurrence table behind /api/stories/tags/{id}/related/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--per-tag', type=int, default=RELATED_PER_TAG,
+            help=f'Related tags kept per tag (default: {RELATED_PER_TAG})',
+        )
+
+    def handle(self, *args, **options):
+        written = rollup_cooccurrence(per_tag=options['per_tag'])
+        self.stdout.write(self.style.SUCCESS(f'Stored {written} tag pairs'))
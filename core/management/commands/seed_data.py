@@ -336,7 +336,7 @@ class Command(BaseCommand):
                 image_url=f"https://picsum.photos/seed/product{i}/800/800",
                 category=category,
                 price=price,
-                in_stock=random.random() > 0.1
+                stock=random.randint(1, 200) if random.random() > 0.1 else 0
             )
             
             # Add random tags
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.trending import refresh_all
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the trending scores of stories, blogs and forum threads'
+
+    def handle(self, *args, **kwargs):
+        for label, count in refresh_all().items():
+            self.stdout.write(f'Scored {count} {label} rows')
+
+        self.stdout.write(self.style.SUCCESS('Trending scores updated'))
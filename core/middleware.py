@@ -1,18 +1,14 @@
 import logging
 import traceback
 from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
 from rest_framework import status
 
 logger = logging.getLogger(__name__)
 
-class ExceptionMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
-        response = self.get_response(request)
-        return response
-
+# MiddlewareMixin makes it async capable, so that ASGI requests are not
+# switched to a thread on their way through it
+class ExceptionMiddleware(MiddlewareMixin):
     def process_exception(self, request, exception):
         logger.error(f"Exception occurred: {exception}")
         logger.error(traceback.format_exc())
@@ -1,4 +1,5 @@
 from django.db import models
+from django.conf import settings
 
 class TimeStampedModel(models.Model):
     """
@@ -10,3 +11,33 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class UploadSession(TimeStampedModel):
+    """
+    A multipart upload to MinIO in progress (see ``core.uploads``).
+    """
+    UPLOAD_STATUS = (
+        ('ACTIVE', 'Active'),
+        ('COMPLETED', 'Completed'),
+        ('ABORTED', 'Aborted'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    object_name = models.CharField(max_length=255, unique=True)
+    upload_id = models.CharField(max_length=255)
+    file_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    part_size = models.PositiveBigIntegerField()
+    part_count = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=UPLOAD_STATUS, default='ACTIVE')
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='upload_session_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return self.object_name
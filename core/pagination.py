@@ -0,0 +1,261 @@
+"""
+Pagination styles for the API.
+
+``SelectablePagination`` is the default pagination class. It keeps the
+classic ``?page=`` style and lets each request, or each viewset through
+``pagination_mode``, choose:
+
+* ``?paginator=cursor``: keyset pagination on ``(created_at, id)``. Every
+  page is a single index range scan whatever its depth, with no ``COUNT(*)``
+  and no ``OFFSET``. Rows inserted while a client is scrolling never shift
+  the following pages.
+* ``?count=false``: page numbers without the total count, for infinite
+  scroll clients that only need to know whether there is a next page.
+
+Both have an ``apaginate_queryset`` twin reading the page through the async
+ORM, for async views (see ``core.asyncviews``).
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+FALSE_VALUES = ('0', 'false', 'False', 'no')
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination over ``(created_at, id)``.
+
+    The scan runs newest first unless the queryset is ordered by ascending
+    ``created_at`` (forum posts, for instance). The cursor holds the position
+    of the last row served. The next page is ``created_at < X OR (created_at
+    = X AND id < pk)``, which Postgres cannot turn into an index range, so
+    the redundant bound ``created_at <= X`` is added: the composite
+    ``(created_at, id)`` indexes then start the scan at the cursor instead
+    of reading every row before it.
+    """
+    page_size = pagination.PageNumberPagination.page_size
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.set_page([row async for row in self.get_page_queryset(queryset, request, view)])
+
+    def get_page_queryset(self, queryset, request, view):
+        """
+        The rows of the requested page, plus one telling whether there is
+        another page.
+        """
+        self.request = request
+        self.descending = self.get_descending(queryset, request, view)
+        self.cursor = self.decode_cursor(request)
+
+        # Previous pages are read backwards from the cursor and flipped
+        descending = self.descending != self.reverse
+        if self.cursor:
+            op = 'lt' if descending else 'gt'
+            position, pk = self.cursor['created_at'], self.cursor['id']
+            queryset = queryset.filter(
+                Q(**{f'created_at__{op}': position}) | Q(created_at=position, **{f'id__{op}': pk}),
+                **{f'created_at__{op}e': position},
+            )
+        ordering = ('-created_at', '-id') if descending else ('created_at', 'id')
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    @property
+    def reverse(self):
+        return bool(self.cursor and self.cursor['reverse'])
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        self.page = rows
+        return rows
+
+    def get_descending(self, queryset, request, view):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        first = ordering[0] if ordering else '-created_at'
+        if first in ('created_at', '-created_at'):
+            return first.startswith('-')
+
+        # The default ordering of the view is replaced by the keyset order,
+        # but an ordering the client asked for cannot be honoured.
+        if request.query_params.get(api_settings.ORDERING_PARAM) or first.lstrip('-') == 'search_rank':
+            raise ValidationError({'paginator': 'Cursor pagination only supports ordering by created_at.'})
+        return True
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk, reverse = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError
+            return {'created_at': created_at, 'id': int(pk), 'reverse': bool(reverse)}
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        # Rows are model instances, or dicts on the fast path (core.fastpath)
+        created_at, pk = (row['created_at'], row['id']) if isinstance(row, dict) else (row.created_at, row.pk)
+        payload = json.dumps([created_at.isoformat(), pk, int(reverse)])
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class SelectablePagination(pagination.PageNumberPagination):
+    """
+    Page number pagination that can skip the total count (``?count=false``)
+    or hand over to ``KeysetPagination`` (``?paginator=cursor``, or
+    ``pagination_mode = 'cursor'`` on the viewset).
+    """
+    paginator_query_param = 'paginator'
+    count_query_param = 'count'
+    modes = ('page', 'cursor')
+
+    def get_mode(self, request, view):
+        mode = request.query_params.get(self.paginator_query_param) or getattr(view, 'pagination_mode', 'page')
+        if mode not in self.modes:
+            raise ValidationError({self.paginator_query_param: f"Must be one of: {', '.join(self.modes)}."})
+        return mode
+
+    def counts_rows(self, request, view):
+        """
+        Whether the page will be served with a total count.
+        """
+        return self.get_mode(request, view) == 'page' and request.query_params.get(self.count_query_param) not in FALSE_VALUES
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset = None
+        self.counted = True
+
+        if self.get_mode(request, view) == 'cursor':
+            self.keyset = KeysetPagination()
+            self.keyset.page_size = self.get_page_size(request)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        if not self.counts_rows(request, view):
+            return self.paginate_without_count(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        ``paginate_queryset`` for async views, through the async ORM.
+        """
+        self.request = request
+        self.keyset = None
+        self.counted = True
+
+        if self.get_mode(request, view) == 'cursor':
+            self.keyset = KeysetPagination()
+            self.keyset.page_size = self.get_page_size(request)
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+        if not self.counts_rows(request, view):
+            rows = self.get_uncounted_page(queryset, request)
+            return self.set_uncounted_page([row async for row in rows])
+
+        # PageNumberPagination.paginate_queryset() with the count awaited
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        self.page.object_list = [row async for row in self.page.object_list]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def paginate_without_count(self, queryset, request):
+        return self.set_uncounted_page(list(self.get_uncounted_page(queryset, request)))
+
+    def get_uncounted_page(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            number = 0
+        if number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        self.number = number
+        offset = (number - 1) * page_size
+        return queryset[offset:offset + page_size + 1]
+
+    def set_uncounted_page(self, rows):
+        page_size = self.get_page_size(self.request)
+        self.counted = False
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        if self.counted:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if self.counted:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.counted:
+            return super().get_previous_link()
+        if self.number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
@@ -0,0 +1,59 @@
+"""
+JSON renderer backed by orjson.
+
+``FastJSONRenderer`` produces the same compact UTF-8 output as DRF's
+``JSONRenderer`` with orjson when it is installed, and is DRF's renderer
+otherwise. Types orjson does not encode itself (``Decimal``, ``timedelta``,
+querysets, lazy strings...) go through DRF's ``JSONEncoder.default``, so
+they render exactly as before. Indented output (``application/json;
+indent=4``, the browsable API) and payloads orjson rejects, such as integers
+wider than 64 bits, are rendered by the stdlib encoder.
+
+Two differences remain, both on floats:
+
+* ``NaN`` and ``Infinity`` render as ``null``, where DRF's strict renderer
+  raises ``ValueError``. orjson cannot be told to reject them and finding
+  them beforehand would mean walking every payload in Python. The floats
+  served here (average ratings, distances) are computed from finite values;
+* exponents are written without a plus sign (``1e16``, not ``1e+16``),
+  which is the same number to every JSON parser.
+
+``core.tests.test_renderers`` compares both renderers on representative
+payloads.
+
+``core.parsers.FastJSONParser`` is the matching parser.
+"""
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson:
+    # Datetimes in UTC end with "Z" like DRF's, and non-string dict keys are
+    # converted like the stdlib does.
+    OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    LINE_SEPARATOR, PARAGRAPH_SEPARATOR = '\u2028'.encode(), '\u2029'.encode()
+
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like DRF does, so the output stays a strict JavaScript subset
+        return ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
@@ -0,0 +1,158 @@
+"""
+PostgreSQL full-text search.
+
+Searchable models carry a stored ``search_vector`` column with a GIN index.
+Each app registers the weighted fields that feed it from ``signals.py`` and
+the vector is rewritten after every save that touches those fields.
+``FullTextSearchFilter`` replaces DRF's ``icontains`` based ``SearchFilter``
+with a ranked ``SearchQuery`` match for registered models.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db.models import F
+from django.db.models.signals import post_save
+from rest_framework import filters
+
+registry = {}
+
+# Content types served by /api/search/: the model, the column shown as the
+# hit's title, the column the highlighted snippet is cut from and any extra
+# columns a client needs to link to the hit. ``owner`` restricts private
+# content to its author.
+SEARCH_TYPES = {
+    'stories': {'model': 'stories.Story', 'title': 'title', 'headline': 'body'},
+    'blogs': {'model': 'blogs.Blog', 'title': 'title', 'headline': 'content',
+              'fields': ['slug'], 'filter': {'published': True}},
+    'threads': {'model': 'forums.ForumThread', 'title': 'title', 'headline': 'title',
+                'fields': ['category']},
+    'products': {'model': 'products.Product', 'title': 'title', 'headline': 'description'},
+    'centers': {'model': 'centers.DialysisCenter', 'title': 'name', 'headline': 'address',
+                'fields': ['city', 'state']},
+    'feedback': {'model': 'feedback.Feedback', 'title': 'title', 'headline': 'description',
+                 'owner': 'user'},
+}
+
+
+def search_vector(weights, config=None):
+    """
+    Build the weighted ``SearchVector`` for ``weights``, a mapping of field
+    name to weight ('A' to 'D').
+    """
+    config = config or settings.SEARCH_CONFIG
+    vectors = [SearchVector(field, weight=weight, config=config) for field, weight in weights.items()]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def search_query(value, config=None):
+    return SearchQuery(value, search_type='websearch', config=config or settings.SEARCH_CONFIG)
+
+
+def update_search_vectors(model, pks=None):
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    return queryset.update(search_vector=search_vector(registry[model]))
+
+
+def _post_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(registry[sender]):
+        return
+    update_search_vectors(sender, [instance.pk])
+
+
+def register_search(model, weights):
+    """
+    Keep ``model.search_vector`` up to date with the weighted ``weights``
+    fields.
+    """
+    registry[model] = weights
+    post_save.connect(_post_save, sender=model, dispatch_uid=f'search:{model._meta.label}')
+
+
+def _searchable(spec, user):
+    queryset = apps.get_model(spec['model']).objects.filter(**spec.get('filter', {}))
+    if 'owner' in spec:
+        if not user.is_authenticated:
+            return None
+        if user.role != 'ADMIN':
+            queryset = queryset.filter(**{spec['owner']: user})
+    return queryset
+
+
+def search(value, types, user, limit):
+    """
+    Run ``value`` against each of the ``types`` in ``SEARCH_TYPES`` and return
+    the best ``limit`` hits across all of them, ranked and with highlighted
+    snippets. Issues one query per type.
+    """
+    query = search_query(value)
+    hits = []
+    for name in types:
+        spec = SEARCH_TYPES[name]
+        queryset = _searchable(spec, user)
+        if queryset is None:
+            continue
+        rows = queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            headline=SearchHeadline(
+                spec['headline'], query, config=settings.SEARCH_CONFIG,
+                start_sel='<mark>', stop_sel='</mark>', max_words=35, min_words=15,
+            ),
+        ).order_by('-rank').values('id', spec['title'], *spec.get('fields', []), 'rank', 'headline')[:limit]
+        for row in rows:
+            row['title'] = row.pop(spec['title'])
+            hits.append({'type': name, **row})
+
+    hits.sort(key=lambda hit: hit['rank'], reverse=True)
+    return hits[:limit]
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Ranked full-text search on registered models, ordered by relevance.
+    Views over other models keep DRF's ``icontains`` search.
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = ' '.join(self.get_search_terms(request))
+        if queryset.model not in registry or not getattr(view, 'search_fields', None):
+            return super().filter_queryset(request, queryset, view)
+        if not terms:
+            return queryset
+
+        query = search_query(terms)
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', *ordering)
+
+
+class RankedOrderingFilter(filters.OrderingFilter):
+    """
+    ``OrderingFilter`` that keeps search results in relevance order unless
+    the client asks for an explicit ordering. Orderings end with the primary
+    key so that rows tied on the requested fields keep the same order from
+    one page (and one query plan) to the next. A view's ``ordering_aliases``
+    maps names clients may still send to the fields they now order by.
+    """
+    def filter_queryset(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        aliases = getattr(view, 'ordering_aliases', {})
+        fields = [
+            f"-{aliases.get(term[1:], term[1:])}" if term.startswith('-') else aliases.get(term, term)
+            for term in fields
+        ]
+        return super().remove_invalid_fields(queryset, fields, view, request)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering = [*ordering, '-pk']
+        return ordering
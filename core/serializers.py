@@ -0,0 +1,42 @@
+from rest_framework import serializers
+
+from .models import UploadSession
+
+# Part URLs presigned per request
+MAX_PART_BATCH = 100
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'object_name', 'file_type', 'size', 'part_size', 'part_count', 'status',
+                  'expires_at', 'created_at']
+        read_only_fields = fields
+
+
+class UploadInitiateSerializer(serializers.Serializer):
+    file_type = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
+
+
+class UploadPartsSerializer(serializers.Serializer):
+    part_numbers = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_PART_BATCH,
+    )
+
+
+class UploadedPartSerializer(serializers.Serializer):
+    part_number = serializers.IntegerField(min_value=1)
+    etag = serializers.CharField(max_length=255)
+
+
+class UploadCompleteSerializer(serializers.Serializer):
+    parts = UploadedPartSerializer(many=True, allow_empty=False)
+
+    def validate_parts(self, value):
+        numbers = [part['part_number'] for part in value]
+        if len(numbers) != len(set(numbers)):
+            raise serializers.ValidationError('Each part can only be listed once.')
+        return value
@@ -1,23 +1,91 @@
+"""
+MinIO storage for user uploads.
+
+Clients upload straight to MinIO with presigned ``PUT`` URLs. ``get_storage``
+returns the process-wide ``MinioStorage``: its ``Minio`` client and
+connection pool are created on first use and shared by every request, and
+the bucket is checked (and created) once at that point. Presigning is done
+locally, the region is configured so that the client never has to ask the
+server for it, so handing out URLs costs no network round-trip.
+
+Large files go through multipart uploads instead (see ``core.uploads``).
+"""
+from datetime import timedelta
+import io
+import logging
+import os
+import threading
+import urllib.parse
+import uuid
+
+import certifi
+import urllib3
+from asgiref.sync import sync_to_async
 from minio import Minio
+from minio.datatypes import Part
 from minio.error import S3Error
 from django.conf import settings
-import urllib.parse
-import logging
 
 logger = logging.getLogger(__name__)
 
+_storage = None
+_lock = threading.Lock()
+
+
+def build_http_client():
+    """
+    The connection pool shared by the requests of the client, sized for the
+    worker's threads.
+    """
+    return urllib3.PoolManager(
+        num_pools=4,
+        maxsize=settings.MINIO_POOL_SIZE,
+        timeout=urllib3.Timeout(connect=settings.MINIO_CONNECT_TIMEOUT, read=settings.MINIO_READ_TIMEOUT),
+        retries=urllib3.Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+        cert_reqs='CERT_REQUIRED',
+        ca_certs=os.environ.get('SSL_CERT_FILE') or certifi.where(),
+    )
+
+
+def new_object_name(file_type):
+    """
+    A unique object name for a file of MIME type ``file_type``.
+    """
+    file_extension = file_type.split('/')[-1]
+    return f"{uuid.uuid4()}.{file_extension}"
+
+
+def public_url_prefix():
+    """
+    The URL every object of the bucket is served under.
+    """
+    return f"http://{settings.MINIO_ENDPOINT}/{settings.MINIO_BUCKET_NAME}/"
+
+
+def object_name_for(url):
+    """
+    The name of the object served at ``url``, or ``None`` when ``url`` is
+    not in the bucket.
+    """
+    prefix = public_url_prefix()
+    if not url or not url.startswith(prefix):
+        return None
+    return urllib.parse.unquote(url[len(prefix):]) or None
+
+
 class MinioStorage:
-    def __init__(self):
+    def __init__(self, http_client=None):
         self.client = Minio(
             settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_USE_SSL
+            secure=settings.MINIO_USE_SSL,
+            region=settings.MINIO_REGION,
+            http_client=http_client or build_http_client(),
         )
         self.bucket_name = settings.MINIO_BUCKET_NAME
-        self._ensure_bucket_exists()
 
-    def _ensure_bucket_exists(self):
+    def ensure_bucket(self):
         try:
             if not self.client.bucket_exists(self.bucket_name):
                 self.client.make_bucket(self.bucket_name)
@@ -38,12 +106,12 @@ class MinioStorage:
             logger.error(f"Error ensuring bucket exists: {e}")
             raise
 
-    def get_presigned_put_url(self, object_name, expires=3600):
+    def get_presigned_put_url(self, object_name, expires=None):
         try:
             url = self.client.presigned_put_object(
                 self.bucket_name,
                 object_name,
-                expires=expires
+                expires=timedelta(seconds=expires or settings.MINIO_PRESIGN_EXPIRES)
             )
             return url
         except S3Error as e:
@@ -57,3 +125,109 @@ class MinioStorage:
         except Exception as e:
             logger.error(f"Error generating object URL: {e}")
             raise
+
+    def get_object_bytes(self, object_name):
+        response = self.client.get_object(self.bucket_name, object_name)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def put_object_bytes(self, object_name, data, content_type, cache_control=None):
+        headers = {'Cache-Control': cache_control} if cache_control else None
+        self.client.put_object(
+            self.bucket_name, object_name, io.BytesIO(data), len(data),
+            content_type=content_type, metadata=headers,
+        )
+
+    def presign_upload(self, file_type, expires=None):
+        """
+        A new object name for a file of MIME type ``file_type``, with the
+        presigned URL to upload it and the URL it is then served from.
+        """
+        object_name = new_object_name(file_type)
+        return {
+            'presigned_url': self.get_presigned_put_url(object_name, expires),
+            'public_url': self.get_object_url(object_name),
+        }
+
+    # Multipart uploads, see core.uploads. The minio SDK only exposes these
+    # S3 calls through put_object(), so its low-level methods are used: minio
+    # is pinned in requirements.txt and core.tests.test_uploads covers them.
+
+    def create_multipart_upload(self, object_name, file_type):
+        return self.client._create_multipart_upload(self.bucket_name, object_name, {'Content-Type': file_type})
+
+    def get_presigned_part_url(self, object_name, upload_id, part_number, expires=None):
+        return self.client.get_presigned_url(
+            'PUT',
+            self.bucket_name,
+            object_name,
+            expires=timedelta(seconds=expires or settings.MINIO_PRESIGN_EXPIRES),
+            extra_query_params={'partNumber': str(part_number), 'uploadId': upload_id},
+        )
+
+    def list_parts(self, object_name, upload_id):
+        """
+        ``(part_number, etag, size)`` of the parts uploaded so far.
+        """
+        parts, marker = [], None
+        while True:
+            result = self.client._list_parts(self.bucket_name, object_name, upload_id, part_number_marker=marker)
+            parts.extend((int(part.part_number), part.etag, part.size) for part in result.parts)
+            if not result.is_truncated:
+                return parts
+            # Parsed as an int, but sent back as a query parameter
+            marker = str(result.next_part_number_marker)
+
+    def complete_multipart_upload(self, object_name, upload_id, parts):
+        """
+        Assemble the object from ``parts``, ``(part_number, etag)`` pairs in
+        ascending order.
+        """
+        return self.client._complete_multipart_upload(
+            self.bucket_name, object_name, upload_id, [Part(number, etag) for number, etag in parts],
+        )
+
+    def abort_multipart_upload(self, object_name, upload_id):
+        self.client._abort_multipart_upload(self.bucket_name, object_name, upload_id)
+
+    def list_multipart_uploads(self, prefix=None):
+        """
+        ``(object_name, upload_id, initiated_at)`` of the multipart uploads
+        in progress in the bucket.
+        """
+        key_marker = upload_id_marker = None
+        while True:
+            result = self.client._list_multipart_uploads(
+                self.bucket_name, prefix=prefix, key_marker=key_marker, upload_id_marker=upload_id_marker,
+            )
+            for upload in result.uploads:
+                yield upload.object_name, upload.upload_id, upload.initiated_time
+            if not result.is_truncated:
+                return
+            key_marker, upload_id_marker = result.next_key_marker, result.next_upload_id_marker
+
+
+def get_storage():
+    """
+    The process-wide ``MinioStorage``, created and its bucket checked on
+    first use. A failed check is retried by the next call.
+    """
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                storage = MinioStorage()
+                storage.ensure_bucket()
+                _storage = storage
+    return _storage
+
+
+async def aget_storage():
+    """
+    ``get_storage`` for async views: only the first call, which checks the
+    bucket, leaves the event loop.
+    """
+    return _storage or await sync_to_async(get_storage)()
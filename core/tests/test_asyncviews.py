@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from blogs.views import BlogViewSet
+from centers.models import DialysisCenter
+from centers.views import DialysisCenterViewSet
+from forums.models import ForumCategory, ForumThread
+from forums.views import ForumThreadViewSet
+from blogs.models import Blog
+from products.models import Product, ProductCategory
+from products.views import ProductViewSet
+from stories.models import Story, Tag
+from stories.views import StoryViewSet
+
+User = get_user_model()
+
+
+class AsyncListParityTests(TestCase):
+    """
+    ``alist`` gives the same responses as ``list`` on every async viewset.
+    """
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(email='author@example.com', password='x', first_name='Author', last_name='One')
+        tags = [Tag.objects.create(name=name) for name in ('diet', 'travel')]
+        forum = ForumCategory.objects.create(name='General')
+        shop = ProductCategory.objects.create(name='Supplies')
+        for i in range(12):
+            story = Story.objects.create(title=f'Story {i}', body='Body', user=self.user)
+            story.tags.set(tags[:i % 3])
+            blog = Blog.objects.create(title=f'Blog {i}', content='Content', author=self.user, published=i % 2 == 0)
+            blog.tags.set(tags[:i % 3])
+            ForumThread.objects.create(title=f'Thread {i}', category=forum, user=self.user, is_pinned=i == 5)
+            product = Product.objects.create(
+                title=f'Product {i}', description='Description', category=shop, price=Decimal(i % 4) + Decimal('0.50'),
+            )
+            product.tags.set(tags[:i % 3])
+            DialysisCenter.objects.create(
+                name=f'Center {i}', address='1 Main St', city='Springfield', state='IL', contact='555', type='HOSPITAL',
+            )
+        story.likes.add(self.user)
+
+    def get(self, viewset, query, asynchronous, user=None):
+        request = self.factory.get(f'/api/list/{query}', HTTP_ACCEPT='application/json')
+        if user is not None:
+            force_authenticate(request, user)
+        # Anonymous list responses are cached, both sides must build theirs
+        cache.clear()
+        with override_settings(ASYNC_VIEWS=asynchronous):
+            view = viewset.as_view({'get': 'list'})
+            response = async_to_sync(view)(request) if asynchronous else view(request)
+        return response.render()
+
+    def assertParity(self, viewset, query='', user=None):
+        expected = self.get(viewset, query, False, user)
+        actual = self.get(viewset, query, True, user)
+        self.assertEqual(expected.status_code, 200)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content)
+        self.assertEqual(actual.get('ETag'), expected.get('ETag'))
+
+    def test_stories(self):
+        for query in ('', '?page=2', '?paginator=cursor', '?ordering=-like_count', '?tags__name=diet'):
+            with self.subTest(query=query):
+                self.assertParity(StoryViewSet, query)
+        self.assertParity(StoryViewSet, user=self.user)
+
+    def test_blogs(self):
+        for query in ('', '?tags__name=travel', '?search=blog'):
+            with self.subTest(query=query):
+                self.assertParity(BlogViewSet, query)
+        self.assertParity(BlogViewSet, user=self.user)
+
+    def test_forum_threads(self):
+        for query in ('', '?page=2'):
+            with self.subTest(query=query):
+                self.assertParity(ForumThreadViewSet, query)
+
+    def test_products(self):
+        for query in ('', '?ordering=-price', '?tags__name=diet', '?page=2'):
+            with self.subTest(query=query):
+                self.assertParity(ProductViewSet, query)
+
+    def test_centers(self):
+        for query in ('', '?page=2'):
+            with self.subTest(query=query):
+                self.assertParity(DialysisCenterViewSet, query)
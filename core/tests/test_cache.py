@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.test import TestCase
+
+from blogs.models import Blog, BlogComment
+from core.cache import tag_versions
+
+User = get_user_model()
+
+
+class ResponseCacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='author@example.com', password='x', first_name='Author', last_name='One')
+        self.blog = Blog.objects.create(title='Blog', content='Content', author=self.user, published=True)
+
+    def comment_counts(self):
+        response = self.client.get('/api/blogs/', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return [row['comment_count'] for row in response.json()['results']]
+
+    def test_new_comment_invalidates_cached_blog_list(self):
+        self.assertEqual(self.comment_counts(), [0])
+        # The counter is bumped with an UPDATE on commit, which sends no
+        # signal for Blog
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogComment.objects.create(blog=self.blog, user=self.user, content='First')
+        self.assertEqual(self.comment_counts(), [1])
+
+    def test_only_rendered_author_fields_invalidate(self):
+        before = tag_versions(['users.User'])
+        update_last_login(None, self.user)
+        self.user.set_password('y')
+        self.user.save()
+        self.assertEqual(tag_versions(['users.User']), before)
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertNotEqual(tag_versions(['users.User']), before)
+        response = self.client.get('/api/blogs/', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.json()['results'][0]['author']['first_name'], 'Renamed')
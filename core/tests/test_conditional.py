@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.fastpath import FastPath
+from core.viewcounts import view_counter
+from stories.models import Story
+from stories.serializers import StorySerializer
+
+User = get_user_model()
+
+
+class NotModifiedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        view_counter.cache.clear()
+        self.user = User.objects.create_user(email='author@example.com', password='x', first_name='Author', last_name='One')
+        self.story = Story.objects.create(title='Story', body='Body', user=self.user)
+
+    def assertNotSerialized(self, url):
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        with mock.patch.object(StorySerializer, 'to_representation') as to_representation, \
+                mock.patch.object(FastPath, 'serialize') as serialize:
+            response = self.client.get(url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        to_representation.assert_not_called()
+        serialize.assert_not_called()
+
+    def test_list(self):
+        self.assertNotSerialized('/api/stories/')
+
+    def test_detail(self):
+        self.assertNotSerialized(f'/api/stories/{self.story.pk}/')
+
+    def test_revalidated_detail_reads_are_counted(self):
+        Story.objects.filter(pk=self.story.pk).update(views=1000)
+        url = f'/api/stories/{self.story.pk}/'
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.json()['views'], 1001)
+
+        response = self.client.get(url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.story.refresh_from_db()
+        self.assertEqual(self.story.views + view_counter.pending(self.story), 1002)
+
+    def test_detail_etag_follows_views(self):
+        Story.objects.filter(pk=self.story.pk).update(views=998)
+        url = f'/api/stories/{self.story.pk}/'
+        etag = self.client.get(url, HTTP_ACCEPT='application/json')['ETag']
+        # The second read takes the count to 1000, past the rounding step
+        response = self.client.get(url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['views'], 1000)
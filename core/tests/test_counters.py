@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.test import TestCase
+
+from blogs.models import Blog
+from stories.models import Comment, Story, Tag
+
+User = get_user_model()
+
+
+class CascadeDeleteCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(email='author@example.com', password='x', first_name='Author', last_name='One')
+        self.reader = User.objects.create_user(email='reader@example.com', password='x', first_name='Reader', last_name='Two')
+        self.tag = Tag.objects.create(name='django')
+        self.story = Story.objects.create(title='Story', body='Body', user=self.author)
+        self.other = Story.objects.create(title='Other', body='Body', user=self.reader)
+        self.story.tags.add(self.tag)
+        self.other.tags.add(self.tag)
+        self.story.likes.add(self.reader)
+
+    def test_deleting_tagged_content_recounts_tags(self):
+        blog = Blog.objects.create(title='Blog', content='Content', author=self.author)
+        blog.tags.add(self.tag)
+        self.tag.refresh_from_db()
+        self.assertEqual((self.tag.story_count, self.tag.blog_count), (2, 1))
+
+        self.other.delete()
+        blog.delete()
+        self.tag.refresh_from_db()
+        self.assertEqual((self.tag.story_count, self.tag.blog_count), (1, 0))
+
+    def test_deleting_a_user_recounts_likes_and_tags(self):
+        self.story.refresh_from_db()
+        self.assertEqual(self.story.like_count, 1)
+
+        # Cascades to the reader's likes and stories
+        self.reader.delete()
+        self.story.refresh_from_db()
+        self.tag.refresh_from_db()
+        self.assertEqual(self.story.like_count, 0)
+        self.assertEqual(self.tag.story_count, 1)
+
+
+class SaveCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='author@example.com', first_name='Author', last_name='One')
+        self.story = Story.objects.create(title='Story', body='Body', user=self.user)
+        self.other = Story.objects.create(title='Other', body='Body', user=self.user)
+
+    def counts(self):
+        return list(Story.objects.filter(pk__in=[self.story.pk, self.other.pk]).order_by('pk').values_list('comment_count', flat=True))
+
+    def test_counted_once_the_write_commits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(story=self.story, user=self.user, content='Comment')
+            self.assertEqual(self.counts(), [0, 0])
+        self.assertEqual(self.counts(), [1, 0])
+
+        # A rolled back write is not counted
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Comment.objects.create(story=self.story, user=self.user, content='Comment')
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        self.assertEqual(self.counts(), [1, 0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.story = self.other
+            comment.save()
+        self.assertEqual(self.counts(), [0, 1])
+
+    def test_only_saves_of_the_foreign_key_read_it_back(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(story=self.story, user=self.user, content='Comment')
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.content = 'Edited'
+        with self.assertNumQueries(1):
+            comment.save(update_fields=['content'])
+        with self.assertNumQueries(2):
+            comment.save()
+        self.assertEqual(self.counts(), [1, 0])
@@ -0,0 +1,94 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from blogs.models import Blog
+from blogs.serializers import BlogSerializer, blog_fast_path
+from blogs.views import BlogViewSet
+from core.viewcounts import view_counter
+from forums.models import ForumCategory, ForumPost, ForumThread
+from forums.serializers import ForumThreadSerializer, thread_fast_path
+from forums.views import ForumThreadViewSet
+from stories.models import Story, Tag
+from stories.serializers import StorySerializer, story_fast_path
+from stories.views import StoryViewSet
+
+User = get_user_model()
+
+
+class FastPathParityTests(TestCase):
+    """
+    The fast path renders exactly what the serializer it was compiled from
+    renders for the same queryset.
+    """
+    def setUp(self):
+        cache.clear()
+        view_counter.cache.clear()
+        self.factory = APIRequestFactory()
+        self.author = User.objects.create_user(
+            email='author@example.com', first_name='Author', last_name='One', city='Springfield',
+            avatar_url='https://example.com/a.png',
+        )
+        self.reader = User.objects.create_user(email='reader@example.com', first_name='Reader', last_name='Two')
+        tags = [Tag.objects.create(name=name) for name in ('travel', 'diet', 'exercise')]
+        general = ForumCategory.objects.create(name='General', description='Anything')
+        for i in range(5):
+            story = Story.objects.create(title=f'Story {i}', body='Body', user=self.author if i % 2 else self.reader)
+            story.tags.set(tags[:i % 4])
+            blog = Blog.objects.create(title=f'Blog {i}', content='Content', author=self.author, published=True)
+            blog.tags.set(tags[i % 2:])
+            thread = ForumThread.objects.create(title=f'Thread {i}', category=general, user=self.author, is_pinned=i == 3)
+            for j in range(i % 3):
+                ForumPost.objects.create(thread=thread, user=self.reader if j else self.author, content='Post')
+        story.likes.add(self.reader)
+
+    def context(self, user=None):
+        request = Request(self.factory.get('/'))
+        if user is not None:
+            request.user = user
+        return {'request': request}
+
+    def assertSerializerParity(self, fast_path, serializer_class, queryset, context):
+        expected = serializer_class(queryset, many=True, context=context).data
+        actual = fast_path.serialize(list(fast_path.values(queryset)), context)
+        self.assertEqual(actual, expected)
+
+    def test_stories(self):
+        queryset = Story.objects.prefetch_related('tags').order_by('-created_at')
+        self.assertSerializerParity(story_fast_path, StorySerializer, queryset, self.context())
+        self.assertSerializerParity(story_fast_path, StorySerializer, queryset, self.context(self.reader))
+
+    def test_blogs(self):
+        queryset = Blog.objects.prefetch_related('tags').order_by('-created_at')
+        self.assertSerializerParity(blog_fast_path, BlogSerializer, queryset, self.context())
+
+    def test_threads(self):
+        queryset = ForumThread.objects.order_by('-is_pinned', '-created_at')
+        self.assertSerializerParity(thread_fast_path, ForumThreadSerializer, queryset, self.context())
+
+    def get(self, viewset, fast, user=None):
+        request = self.factory.get('/api/list/', HTTP_ACCEPT='application/json')
+        if user is not None:
+            force_authenticate(request, user)
+        cache.clear()
+        with override_settings(FAST_PATH_SERIALIZERS=fast):
+            response = viewset.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, 200)
+        return response.render().content
+
+    @mock.patch.object(view_counter, '_buffered', True)
+    def test_list_responses_with_pending_views(self):
+        for story in Story.objects.all()[:2]:
+            view_counter.increment(story)
+        view_counter.increment(Blog.objects.first())
+        view_counter.increment(ForumThread.objects.first())
+
+        for viewset in (StoryViewSet, BlogViewSet, ForumThreadViewSet):
+            with self.subTest(viewset=viewset.__name__):
+                self.assertEqual(self.get(viewset, True), self.get(viewset, False))
+                self.assertEqual(self.get(viewset, True, self.reader), self.get(viewset, False, self.reader))
+        self.assertIn(b'"views":1', self.get(StoryViewSet, True))
@@ -0,0 +1,167 @@
+import json
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchRank
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+from django.test import TestCase
+
+from blogs.models import Blog
+from centers.models import DialysisCenter
+from core.search import search_query, update_search_vectors
+from feedback.models import Feedback
+from forums.models import ForumCategory, ForumThread, ForumPost, ReportedContent
+from products.models import Order
+from stories.models import Story, Comment
+
+User = get_user_model()
+
+ROWS = 5000
+PAGE = 9
+BATCH_SIZE = 1000
+CITIES = [f'City {i}' for i in range(200)]
+STATES = [f'State {i}' for i in range(30)]
+
+# (name, queryset factory, indexes any of which the plan must use)
+HOT_QUERIES = [
+    ('story feed', lambda c: Story.objects.order_by('-created_at', '-id')[:PAGE],
+     {'story_created_idx'}),
+    ('trending stories', lambda c: Story.objects.filter(trending_score__gt=0).order_by('-trending_score')[:10],
+     {'story_trending_idx'}),
+    ('story search', lambda c: Story.objects.filter(search_vector=search_query('transplant')).annotate(
+        search_rank=SearchRank(F('search_vector'), search_query('transplant'))).order_by('-search_rank')[:PAGE],
+     {'story_search_idx'}),
+    ('top-level story comments', lambda c: Comment.objects.filter(story=c['story'], parent=None).order_by('-created_at')[:PAGE],
+     {'comment_toplevel_idx', 'comment_story_created_idx'}),
+    ('published blogs', lambda c: Blog.objects.filter(published=True).order_by('-created_at')[:PAGE],
+     {'blog_published_idx'}),
+    ('blogs by author', lambda c: Blog.objects.filter(author=c['user']).order_by('-created_at')[:PAGE],
+     {'blog_author_idx'}),
+    ('forum threads', lambda c: ForumThread.objects.order_by('-is_pinned', '-created_at')[:PAGE],
+     {'forumthread_order_idx'}),
+    ('forum threads by category', lambda c: ForumThread.objects.filter(category=c['category']).order_by('-is_pinned', '-created_at')[:PAGE],
+     {'forumthread_category_idx'}),
+    ('top-level forum posts', lambda c: ForumPost.objects.filter(thread=c['thread'], parent=None).order_by('created_at')[:PAGE],
+     {'forumpost_toplevel_idx', 'forumpost_thread_created_idx'}),
+    ('orders by user and status', lambda c: Order.objects.filter(user=c['user'], status='PENDING').order_by('-created_at')[:PAGE],
+     {'order_user_status_idx'}),
+    ('reports by type and status', lambda c: ReportedContent.objects.filter(content_type='POST', status='PENDING').order_by('-created_at')[:PAGE],
+     {'reportedcontent_type_idx', 'reportedcontent_pending_idx'}),
+    ('pending reports', lambda c: ReportedContent.objects.filter(status='PENDING').order_by('-created_at')[:PAGE],
+     {'reportedcontent_pending_idx'}),
+    ('centers by city', lambda c: DialysisCenter.objects.filter(city=c['city']).order_by('name')[:PAGE],
+     {'center_city_idx'}),
+    ('centers by state', lambda c: DialysisCenter.objects.filter(state=c['state']).order_by('name')[:PAGE],
+     {'center_state_idx'}),
+    ('feedback by user', lambda c: Feedback.objects.filter(user=c['user']).order_by('-created_at')[:PAGE],
+     {'feedback_user_idx'}),
+]
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    The hot list queries use their indexes, checked with EXPLAIN on a
+    synthetic dataset large enough for the planner to prefer them.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        random.seed(0)
+        users = [
+            User.objects.create_user(email=f'explain{i}@example.com', first_name='Explain', last_name=str(i))
+            for i in range(50)
+        ]
+        categories = [ForumCategory.objects.create(name=f'Category {i}') for i in range(10)]
+
+        def create(model, make, rows=ROWS):
+            model.objects.bulk_create((make(i) for i in range(rows)), batch_size=BATCH_SIZE)
+
+        create(Story, lambda i: Story(
+            user=random.choice(users), title=f'Story {i}',
+            body='kidney transplant journey' if random.random() < 0.002 else f'Topic {random.randrange(1000)}',
+        ))
+        story_ids = list(Story.objects.values_list('id', flat=True)[:200])
+        create(Comment, lambda i: Comment(story_id=random.choice(story_ids), user=random.choice(users), content='Comment'))
+
+        create(Blog, lambda i: Blog(
+            author=random.choice(users), title=f'Blog {i}', slug=f'explain-blog-{i}', content='Blog',
+            published=random.random() < 0.8,
+        ))
+
+        create(ForumThread, lambda i: ForumThread(
+            category=random.choice(categories), user=random.choice(users), title=f'Thread {i}',
+            is_pinned=random.random() < 0.01,
+        ))
+        thread_ids = list(ForumThread.objects.values_list('id', flat=True)[:200])
+        create(ForumPost, lambda i: ForumPost(thread_id=random.choice(thread_ids), user=random.choice(users), content='Post'))
+        create(ReportedContent, lambda i: ReportedContent(
+            content_type=random.choice(['THREAD', 'POST']), content_id=i, reported_by=random.choice(users),
+            reason='SPAM', status='PENDING' if random.random() < 0.05 else random.choice(['RESOLVED', 'DISMISSED']),
+        ))
+
+        create(Order, lambda i: Order(
+            user=random.choice(users), status=random.choice(['PENDING', 'SHIPPED', 'DELIVERED', 'CANCELLED']),
+            shipping_address='Address', contact_number='0', total_amount=0,
+        ))
+        create(DialysisCenter, lambda i: DialysisCenter(
+            name=f'Center {i}', address='Address', city=random.choice(CITIES), state=random.choice(STATES),
+            contact='0', type=random.choice(['HOSPITAL', 'STANDALONE']),
+        ))
+        create(Feedback, lambda i: Feedback(
+            title=f'Feedback {i}', description='Feedback', type='GENERAL', user=random.choice(users),
+        ))
+
+        # Replies, so that the top-level filters are selective
+        comments = list(Comment.objects.values_list('id', 'story_id')[:ROWS // 2])
+        Comment.objects.bulk_create(
+            (Comment(story_id=story_id, parent_id=pk, user=random.choice(users), content='Reply') for pk, story_id in comments),
+            batch_size=BATCH_SIZE,
+        )
+        posts = list(ForumPost.objects.values_list('id', 'thread_id')[:ROWS // 2])
+        ForumPost.objects.bulk_create(
+            (ForumPost(thread_id=thread_id, parent_id=pk, user=random.choice(users), content='Reply') for pk, thread_id in posts),
+            batch_size=BATCH_SIZE,
+        )
+
+        models = [Story, Comment, Blog, ForumThread, ForumPost, ReportedContent, Order, DialysisCenter, Feedback]
+        for model in models:
+            model.objects.update(created_at=RawSQL("now() - random() * interval '365 days'", []))
+        update_search_vectors(Story)
+        with connection.cursor() as cursor:
+            for model in models:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+            # What autovacuum would do: the planner charges GIN indexes for
+            # entries still in their pending list
+            cursor.execute("SELECT gin_clean_pending_list('story_search_idx')")
+
+        cls.context = {
+            'user': users[0],
+            'story': Story.objects.get(pk=story_ids[0]),
+            'category': categories[0],
+            'thread': ForumThread.objects.get(pk=thread_ids[0]),
+            'city': CITIES[0],
+            'state': STATES[0],
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hot_queries_use_their_indexes(self):
+        for name, build, indexes in HOT_QUERIES:
+            with self.subTest(query=name):
+                queryset = build(self.context)
+                nodes = list(plan_nodes(json.loads(queryset.explain(format='json'))[0]['Plan']))
+                scans = [
+                    (node['Node Type'], node.get('Index Name'), node.get('Relation Name'))
+                    for node in nodes if 'Scan' in node['Node Type']
+                ]
+                self.assertTrue(any(index in indexes for _, index, _ in scans), scans)
+                self.assertNotIn(('Seq Scan', None, queryset.model._meta.db_table), scans)
@@ -0,0 +1,63 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+
+from products.inventory import InsufficientStock, reserve_cart
+from products.models import Cart, CartItem, Order, Product, ProductCategory
+from products.services import place_order
+
+User = get_user_model()
+
+BUYERS = 30
+STOCK = 10
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    """
+    Buyers checking out the same product from many threads at once, each on
+    its own connection, never oversell it.
+    """
+    def setUp(self):
+        cache.clear()
+        category = ProductCategory.objects.create(name='Supplies')
+        self.product = Product.objects.create(title='Kit', description='Kit', category=category, price=10, stock=STOCK)
+        self.users = []
+        for i in range(BUYERS):
+            user = User.objects.create_user(email=f'buyer{i}@example.com', first_name='Buyer', last_name=str(i))
+            CartItem.objects.create(cart=Cart.objects.create(user=user), product=self.product, quantity=1)
+            self.users.append(user)
+
+    def test_no_oversell(self):
+        outcomes = []
+        barrier = threading.Barrier(BUYERS)
+
+        def buy(i, user):
+            try:
+                barrier.wait()
+                # Every other buyer holds the stock first, like a client going
+                # through a payment step
+                if i % 2:
+                    reserve_cart(user)
+                place_order(user, 'Address', '0')
+                outcomes.append('ordered')
+            except InsufficientStock:
+                outcomes.append('sold out')
+            except Exception as exc:
+                outcomes.append(repr(exc))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=(i, user)) for i, user in enumerate(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([o for o in outcomes if o not in ('ordered', 'sold out')], [])
+        self.assertEqual(outcomes.count('ordered'), STOCK)
+        self.assertEqual(Order.objects.count(), STOCK)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.in_stock), (0, False))
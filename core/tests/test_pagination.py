@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from stories.models import Story
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='reader@example.com', password='x', first_name='Reader', last_name='One')
+        start = timezone.now() - timedelta(days=1)
+        self.stories = [Story.objects.create(title=f'Story {i}', body='Body', user=self.user) for i in range(20)]
+        # Stories share timestamps in pairs, so ties are broken by id
+        for i, story in enumerate(self.stories):
+            Story.objects.filter(pk=story.pk).update(created_at=start + timedelta(minutes=i // 2))
+        self.expected = list(
+            Story.objects.filter(pk__in=[story.pk for story in self.stories])
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def fetch(self, url):
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return [row['id'] for row in data['results']], data['next'], data['previous']
+
+    def test_inserts_between_fetches_do_not_shift_pages(self):
+        seen = []
+        url = '/api/stories/?paginator=cursor'
+        while url:
+            ids, url, _ = self.fetch(url)
+            seen.extend(ids)
+            Story.objects.create(title='Posted while scrolling', body='Body', user=self.user)
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_page_is_the_page_before(self):
+        first, next_url, _ = self.fetch('/api/stories/?paginator=cursor')
+        Story.objects.create(title='Posted while scrolling', body='Body', user=self.user)
+        second, _, previous_url = self.fetch(next_url)
+        self.assertEqual(first + second, self.expected[:len(first) + len(second)])
+        self.assertEqual(self.fetch(previous_url)[0], first)
+
+    def test_cursor_bounds_the_index_scan(self):
+        _, next_url, _ = self.fetch('/api/stories/?paginator=cursor')
+        with CaptureQueriesContext(connection) as queries:
+            self.fetch(next_url)
+        # The OR of the cursor alone cannot start an index range scan
+        self.assertTrue(any('"stories_story"."created_at" <=' in query['sql'] for query in queries))
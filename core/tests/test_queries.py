@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from products.models import Product, ProductCategory, ProductReview
+from stories.models import Tag
+
+User = get_user_model()
+
+
+class ProductQueryCountTests(TestCase):
+    """
+    Product pages cost a fixed number of queries whatever the number of
+    products, tags and reviews they render.
+    """
+    def setUp(self):
+        cache.clear()
+        self.category = ProductCategory.objects.create(name='Supplies')
+        self.users = [
+            User.objects.create_user(email=f'reviewer{i}@example.com', password='x', first_name='Reviewer', last_name=str(i))
+            for i in range(3)
+        ]
+        self.tags = [Tag.objects.create(name=f'tag {i}') for i in range(3)]
+
+    def add_products(self, count):
+        for i in range(count):
+            product = Product.objects.create(title=f'Product {i}', description='Description', category=self.category, price=Decimal('9.99'))
+            product.tags.set(self.tags)
+            for user in self.users:
+                ProductReview.objects.create(product=product, user=user, rating=4, comment='Fine')
+        return product
+
+    def get(self, url, queries):
+        # Anonymous responses are cached, measure the uncached request
+        cache.clear()
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list(self):
+        # Validators, count, page, tags
+        for count in (2, 6):
+            self.add_products(count)
+            response = self.get('/api/products/', 4)
+            self.assertEqual(len(response.json()['results']), Product.objects.count())
+
+    def test_detail(self):
+        # Product, tags, reviews with their users, validators
+        for count in (1, 5):
+            product = self.add_products(count)
+            response = self.get(f'/api/products/{product.pk}/', 4)
+            self.assertEqual(len(response.json()['reviews']), len(self.users))
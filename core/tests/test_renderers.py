@@ -0,0 +1,73 @@
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer, orjson
+
+PAYLOADS = {
+    'list page': {
+        'count': 2, 'next': None, 'previous': 'http://testserver/api/stories/?page=1',
+        'results': [
+            {
+                'id': 1, 'title': 'Living with dialysis', 'tags': [{'id': 3, 'name': 'diet'}], 'is_liked': False,
+                'user': {'id': 7, 'first_name': 'Zoë', 'avatar_url': None}, 'views': 1200,
+                'created_at': '2024-05-01T10:00:00.123456Z',
+            },
+            {'id': 2, 'title': 'Line and paragraph separators, "quotes" and \\', 'tags': []},
+        ],
+    },
+    'thread with its last post': {
+        'id': 1, 'last_post': {
+            'id': 9, 'user': {'id': 7, 'full_name': 'Author One'},
+            'created_at': datetime(2024, 5, 1, 10, 0, 0, 123456, tzinfo=dt_timezone.utc),
+        },
+    },
+    'other types': {
+        'price': Decimal('19.90'), 'day': date(2024, 5, 1), 'at': time(10, 30, 15, 250000),
+        'offset': datetime(2024, 5, 1, 10, 0, tzinfo=dt_timezone(timedelta(hours=2))), 'naive': datetime(2024, 5, 1),
+        'duration': timedelta(minutes=5), 'uuid': uuid.UUID(int=1), 'lazy': gettext_lazy('Not found.'),
+        'big': 2 ** 70, 'tuple': (1, 2), 'keys': {1: 'a', 2: 'b'}, 'empty': {}, 'bools': [True, False],
+    },
+}
+
+FLOATS = [0.1, 1 / 3, 2.5, -0.0, 1e16, 1.5e-7, 123456789.125]
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """
+    ``FastJSONRenderer`` renders what DRF's ``JSONRenderer`` renders.
+    """
+    def test_same_bytes_as_drf(self):
+        for name, payload in PAYLOADS.items():
+            with self.subTest(payload=name):
+                self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_floats_have_the_same_values(self):
+        # Exponents are written 1e16 rather than 1e+16: the same number
+        fast, drf = FastJSONRenderer().render(FLOATS), JSONRenderer().render(FLOATS)
+        self.assertEqual(json.loads(fast), json.loads(drf))
+        self.assertEqual(json.loads(fast), FLOATS)
+
+    def test_non_finite_floats_render_as_null(self):
+        # Where DRF's strict renderer raises, see the module docstring
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({'score': value})
+                self.assertEqual(FastJSONRenderer().render({'score': value}), b'{"score":null}')
+
+    def test_indented_output_is_drf_output(self):
+        context = {'indent': 2}
+        payload = PAYLOADS['list page']
+        self.assertEqual(
+            FastJSONRenderer().render(payload, renderer_context=context),
+            JSONRenderer().render(payload, renderer_context=context),
+        )
+
+    def test_orjson_is_used(self):
+        self.assertIsNotNone(orjson)
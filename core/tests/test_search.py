@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from blogs.models import Blog
+from products.models import Product, ProductCategory
+from stories.models import Story
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='author@example.com', password='x', first_name='Author', last_name='One')
+        # Title matches weigh more than body matches
+        self.story = Story.objects.create(title='Living with dialysis', body='A diary.', user=self.user)
+        self.blog = Blog.objects.create(title='Diet notes', content='Eating well on dialysis days.', author=self.user, published=True)
+        Blog.objects.create(title='Dialysis draft', content='Unpublished.', author=self.user)
+        category = ProductCategory.objects.create(name='Supplies')
+        self.product = Product.objects.create(
+            title='Travel bag', description='Fits dialysis supplies.', category=category, price=Decimal('20.00'),
+        )
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', params, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return [(hit['type'], hit['id']) for hit in response.json()['results']]
+
+    def test_hits_are_ranked_across_types(self):
+        hits = self.search(q='dialysis')
+        self.assertEqual(hits[0], ('stories', self.story.pk))
+        self.assertCountEqual(hits[1:], [('blogs', self.blog.pk), ('products', self.product.pk)])
+
+    def test_types_restricts_the_content_types(self):
+        self.assertEqual(self.search(q='dialysis', types='products'), [('products', self.product.pk)])
+        self.assertCountEqual(
+            self.search(q='dialysis', types='blogs,products'),
+            [('blogs', self.blog.pk), ('products', self.product.pk)],
+        )
+
+        response = self.client.get('/api/search/', {'q': 'dialysis', 'types': 'stories,videos'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_vector_follows_saves(self):
+        self.assertEqual(self.search(q='kayaking', types='stories'), [])
+
+        self.story.title = 'Kayaking after a transplant'
+        self.story.save()
+        self.assertEqual(self.search(q='kayaking', types='stories'), [('stories', self.story.pk)])
+        self.assertEqual(self.search(q='living', types='stories'), [])
+
+    def test_list_search_is_ranked(self):
+        other = Story.objects.create(title='A diary', body='Notes about dialysis.', user=self.user)
+        response = self.client.get('/api/stories/', {'search': 'dialysis'}, HTTP_ACCEPT='application/json')
+        self.assertEqual([story['id'] for story in response.json()['results']], [self.story.pk, other.pk])
+
+
+class OrderingAliasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        users = [
+            User.objects.create_user(email=f'reader{i}@example.com', password='x', first_name='Reader', last_name=str(i))
+            for i in range(3)
+        ]
+        self.stories = [Story.objects.create(title=f'Story {i}', body='Body', user=users[0]) for i in range(3)]
+        for story, likes in zip(self.stories, (1, 3, 2)):
+            story.likes.set(users[:likes])
+
+    def ids(self, ordering):
+        response = self.client.get('/api/stories/', {'ordering': ordering}, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return [story['id'] for story in response.json()['results']]
+
+    def test_likes_orders_by_like_count(self):
+        expected = [self.stories[1].pk, self.stories[2].pk, self.stories[0].pk]
+        self.assertEqual(self.ids('-likes'), expected)
+        self.assertEqual(self.ids('-like_count'), expected)
+        self.assertEqual(self.ids('likes'), expected[::-1])
@@ -0,0 +1,79 @@
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import urllib3
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import storage
+from core.views import UploadRateThrottle
+
+User = get_user_model()
+
+
+class FakeS3Pool(urllib3.PoolManager):
+    """
+    Stands in for the MinIO server: records every request, answers the
+    bucket check and refuses anything else.
+    """
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def urlopen(self, method, url, *args, **kwargs):
+        self.requests.append((method, urlparse(url).path))
+        if method == 'HEAD' and urlparse(url).path == f'/{settings.MINIO_BUCKET_NAME}':
+            return urllib3.HTTPResponse(body=b'', status=200, preload_content=False)
+        raise AssertionError(f'Unexpected request to MinIO: {method} {url}')
+
+
+class PresignTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pool = FakeS3Pool()
+        patcher = mock.patch.object(storage, 'build_http_client', return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # A fresh process-wide storage, created against the fake server
+        self.addCleanup(setattr, storage, '_storage', storage._storage)
+        storage._storage = None
+
+        user = User.objects.create_user(email='uploader@example.com', password='x', first_name='Up', last_name='Loader')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def assertPresigned(self, upload):
+        url = urlparse(upload['presigned_url'])
+        query = parse_qs(url.query)
+        self.assertIn('X-Amz-Signature', query)
+        self.assertIn(f'/{settings.MINIO_REGION}/s3/', query['X-Amz-Credential'][0])
+        self.assertEqual(url.path, urlparse(upload['public_url']).path)
+
+    def test_uploads_are_presigned_locally(self):
+        for _ in range(3):
+            response = self.client.post('/api/upload/', {'file_type': 'image/jpeg'}, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertPresigned(response.data)
+
+        response = self.client.post('/api/upload/batch/', {'file_types': ['image/jpeg'] * 5}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['uploads']), 5)
+        for upload in response.data['uploads']:
+            self.assertPresigned(upload)
+
+        # Only the bucket check of the first request reached the server
+        self.assertEqual(self.pool.requests, [('HEAD', f'/{settings.MINIO_BUCKET_NAME}')])
+
+    def test_batch_requires_a_user_and_is_throttled(self):
+        response = APIClient().post('/api/upload/batch/', {'file_types': ['image/jpeg']}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+        with mock.patch.dict(UploadRateThrottle.THROTTLE_RATES, {'uploads': '2/hour'}):
+            statuses = [
+                self.client.post('/api/upload/batch/', {'file_types': ['image/jpeg']}, format='json').status_code
+                for _ in range(3)
+            ]
+        self.assertEqual(statuses, [200, 200, 429])
@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+
+from stories import tagging
+from stories.models import Tag
+
+
+class ResolveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tagging._cache.update(version=None, expires=0, ids={})
+
+    def delete_elsewhere(self, name):
+        # Another worker deleted the tag: no signal reaches this process
+        Tag.objects.filter(name=name)._raw_delete(Tag.objects.db)
+
+    @mock.patch('stories.tagging.time.monotonic')
+    def test_per_process_cache_expires(self, monotonic):
+        monotonic.return_value = 1000
+        first = Tag.objects.create(name='django').pk
+        self.assertEqual(tagging.resolve(['Django']), [first])
+        with self.assertNumQueries(0):
+            self.assertEqual(tagging.resolve(['django']), [first])
+
+        self.delete_elsewhere('django')
+        monotonic.return_value += settings.TAG_ID_CACHE_TTL
+        [second] = tagging.resolve(['django'])
+        self.assertNotEqual(first, second)
+        self.assertTrue(Tag.objects.filter(pk=second, name='django').exists())
+
+    def test_per_process_cache_drops_ids_when_tags_change_here(self):
+        [first] = tagging.resolve(['django'])
+        Tag.objects.filter(name='django').delete()
+        [second] = tagging.resolve(['django'])
+        self.assertNotEqual(first, second)
+
+    @mock.patch('stories.tagging.is_shared', return_value=True)
+    def test_shared_cache_drops_ids_when_tags_change(self, is_shared):
+        [first] = tagging.resolve(['django'])
+        self.assertEqual(tagging.resolve(['django']), [first])
+
+        Tag.objects.filter(name='django').delete()
+        [second] = tagging.resolve(['django'])
+        self.assertNotEqual(first, second)
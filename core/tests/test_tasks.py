@@ -0,0 +1,127 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import backoff, claim, execute, requeue_stale, task
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.fail', max_attempts=2)
+def fail():
+    raise ValueError('boom')
+
+
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_takes_ready_tasks_of_its_queues_oldest_first(self):
+        now = timezone.now()
+        second = record.enqueue([2], run_at=now - timedelta(seconds=1))
+        first = record.enqueue([1], run_at=now - timedelta(seconds=2))
+        record.enqueue([3], run_at=now + timedelta(hours=1))
+        Task.objects.create(name='tests.record', queue='media', args=[4])
+
+        claimed = claim('worker-1', ['default'], 10)
+        self.assertEqual([t.pk for t in claimed], [first.pk, second.pk])
+        for t in Task.objects.filter(pk__in=[first.pk, second.pk]):
+            self.assertEqual((t.status, t.locked_by, t.attempts), ('RUNNING', 'worker-1', 1))
+        # Claimed tasks are not handed out twice
+        self.assertEqual(claim('worker-2', ['default'], 10), [])
+
+    def test_success_deletes_the_task(self):
+        record.delay('x')
+        [t] = claim('worker', ['default'], 1)
+        self.assertTrue(execute(t))
+        self.assertEqual(calls, ['x'])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASK_RETRY_BACKOFF=10, TASK_RETRY_BACKOFF_MAX=60)
+    def test_backoff_doubles_up_to_the_maximum(self):
+        with mock.patch('tasks.queue.random.uniform', return_value=1):
+            self.assertEqual([backoff(attempts) for attempts in range(1, 6)], [10, 20, 40, 60, 60])
+        for attempts in range(1, 6):
+            delay = backoff(attempts)
+            self.assertTrue(min(10 * 2 ** (attempts - 1), 60) <= delay <= min(10 * 2 ** (attempts - 1), 60) * 1.1)
+
+    @override_settings(TASK_RETRY_BACKOFF=10, TASK_RETRY_BACKOFF_MAX=60)
+    def test_failures_are_retried_then_failed(self):
+        fail.delay()
+        [t] = claim('worker', ['default'], 1)
+        before = timezone.now()
+        with self.assertLogs('tasks.queue', 'WARNING'):
+            self.assertFalse(execute(t))
+
+        t.refresh_from_db()
+        self.assertEqual((t.status, t.attempts, t.locked_by), ('QUEUED', 1, ''))
+        self.assertIn('ValueError: boom', t.last_error)
+        self.assertGreaterEqual(t.run_at, before + timedelta(seconds=10))
+        self.assertEqual(claim('worker', ['default'], 1), [])
+
+        # Second and last attempt
+        Task.objects.filter(pk=t.pk).update(run_at=timezone.now())
+        [t] = claim('worker', ['default'], 1)
+        with self.assertLogs('tasks.queue', 'ERROR'):
+            self.assertFalse(execute(t))
+        t.refresh_from_db()
+        self.assertEqual((t.status, t.attempts), ('FAILED', 2))
+        self.assertEqual(claim('worker', ['default'], 1), [])
+
+    def test_key_is_queued_once(self):
+        self.assertIsNotNone(record.enqueue(['a'], key='a'))
+        self.assertIsNone(record.enqueue(['a'], key='a'))
+        self.assertIsNotNone(record.enqueue(['b'], key='b'))
+        self.assertEqual(Task.objects.count(), 2)
+
+        # Once running, the same call can be queued again
+        claim('worker', ['default'], 10)
+        self.assertIsNotNone(record.enqueue(['a'], key='a'))
+
+    @override_settings(TASK_TIMEOUT=60)
+    def test_tasks_of_dead_workers_are_requeued(self):
+        record.delay('x')
+        fail.delay()
+        claim('dead', ['default'], 2)
+        Task.objects.filter(name='tests.fail').update(attempts=2)
+
+        self.assertEqual(requeue_stale(now=timezone.now() + timedelta(seconds=61)), 2)
+        self.assertEqual(Task.objects.get(name='tests.record').status, 'QUEUED')
+        self.assertEqual(Task.objects.get(name='tests.fail').status, 'FAILED')
+
+
+class ConcurrentClaimTests(TransactionTestCase):
+    def test_locked_tasks_are_skipped(self):
+        locked, free = record.delay(1), record.delay(2)
+        holding, release = threading.Event(), threading.Event()
+
+        def hold():
+            # Another worker in the middle of claiming the first task
+            try:
+                with transaction.atomic():
+                    Task.objects.select_for_update().get(pk=locked.pk)
+                    holding.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        try:
+            self.assertTrue(holding.wait(10))
+            # Does not wait for the lock, takes the next task instead
+            self.assertEqual([t.pk for t in claim('worker', ['default'], 2)], [free.pk])
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual([t.pk for t in claim('worker', ['default'], 2)], [locked.pk])
@@ -0,0 +1,166 @@
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from blogs.models import Blog, BlogComment
+from core.trees import build_tree, get_tree_replies
+from forums.models import ForumCategory, ForumPost, ForumThread
+from stories.models import Comment, Story
+
+User = get_user_model()
+
+
+def shape(nodes):
+    """
+    ``(id, replies)`` pairs of rendered comments, in id order.
+    """
+    return sorted((node['id'], shape(node['replies'])) for node in nodes)
+
+
+class BuildTreeTests(SimpleTestCase):
+    def setUp(self):
+        # 1 -> 2 -> 4 -> 6, 1 -> 3, 1 -> 5, and 7 alone
+        self.nodes = [
+            SimpleNamespace(pk=pk, parent_id=parent)
+            for pk, parent in ((1, None), (2, 1), (3, 1), (4, 2), (5, 1), (6, 4), (7, None))
+        ]
+
+    def tree(self, nodes):
+        return [(node.pk, self.tree(get_tree_replies(node))) for node in nodes]
+
+    def test_links_every_level_in_fetch_order(self):
+        roots = build_tree(self.nodes)
+        self.assertEqual(self.tree(roots), [(1, [(2, [(4, [(6, [])])]), (3, []), (5, [])]), (7, [])])
+
+    def test_max_depth_and_limit(self):
+        self.assertEqual(self.tree(build_tree(self.nodes, max_depth=0)), [(1, []), (7, [])])
+        self.assertEqual(self.tree(build_tree(self.nodes, max_depth=2)), [(1, [(2, [(4, [])]), (3, []), (5, [])]), (7, [])])
+        self.assertEqual(self.tree(build_tree(self.nodes, limit=1)), [(1, [(2, [(4, [(6, [])])])]), (7, [])])
+
+    def test_given_roots(self):
+        roots = build_tree(self.nodes[1:], roots=[self.nodes[1]])
+        self.assertEqual(self.tree(roots), [(2, [(4, [(6, [])])])])
+
+
+class ReplyTreeTests:
+    """
+    Discussions render their whole reply trees in a fixed number of queries,
+    truncated by ``max_depth`` and ``reply_limit``. Subclasses set ``url``
+    and implement ``scope``, ``params`` and ``add``.
+    """
+    url = None
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='author@example.com', first_name='Author', last_name='One')
+        self.owner, other = self.scope(), self.scope()
+        # A reply tree on another discussion must not show up
+        self.add(other, self.add(other))
+
+    def discussion(self, roots):
+        """
+        ``roots`` top-level comments, the first one with three replies, two
+        replies below its first reply and one more level below that.
+        """
+        expected = []
+        for i in range(roots):
+            root = self.add(self.owner)
+            if i:
+                expected.append((root.pk, []))
+                continue
+            first, second, third = (self.add(self.owner, root) for _ in range(3))
+            deep, other = self.add(self.owner, first), self.add(self.owner, first)
+            deepest = self.add(self.owner, deep)
+            expected.append((root.pk, sorted([
+                (first.pk, sorted([(deep.pk, [(deepest.pk, [])]), (other.pk, [])])),
+                (second.pk, []), (third.pk, []),
+            ])))
+        return sorted(expected)
+
+    def get(self, **params):
+        response = self.client.get(self.url, {**self.params(), **params}, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get()
+        return len(queries)
+
+    def test_whole_tree(self):
+        expected = self.discussion(2)
+        self.assertEqual(shape(self.get()), expected)
+
+    def test_query_count_does_not_grow_with_the_tree(self):
+        self.discussion(1)
+        queries = self.count_queries()
+        self.discussion(3)
+        self.assertEqual(self.count_queries(), queries)
+
+    def test_max_depth(self):
+        [(root, replies)] = self.discussion(1)
+        self.assertEqual(shape(self.get(max_depth=0)), [(root, [])])
+        self.assertEqual(shape(self.get(max_depth=1)), [(root, [(pk, []) for pk, _ in replies])])
+        [first, *rest] = replies
+        self.assertEqual(
+            shape(self.get(max_depth=2)),
+            [(root, [(first[0], [(pk, []) for pk, _ in first[1]]), *rest])],
+        )
+
+    def test_reply_limit(self):
+        self.discussion(1)
+        [root] = self.get(reply_limit=2)
+        self.assertEqual(len(root['replies']), 2)
+        for reply in root['replies']:
+            self.assertLessEqual(len(reply['replies']), 2)
+        self.assertEqual(self.get(reply_limit=0)[0]['replies'], [])
+
+    def test_invalid_options(self):
+        for params in ({'max_depth': -1}, {'reply_limit': 'all'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, {**self.params(), **params}, HTTP_ACCEPT='application/json')
+                self.assertEqual(response.status_code, 400)
+
+
+class StoryCommentTreeTests(ReplyTreeTests, TestCase):
+    url = '/api/stories/comments/'
+
+    def scope(self):
+        return Story.objects.create(title='Story', body='Body', user=self.user)
+
+    def params(self):
+        return {'story': self.owner.pk}
+
+    def add(self, story, parent=None):
+        return Comment.objects.create(story=story, user=self.user, content='Comment', parent=parent)
+
+
+class BlogCommentTreeTests(ReplyTreeTests, TestCase):
+    url = '/api/blogs/comments/'
+
+    def scope(self):
+        return Blog.objects.create(title=f'Blog {Blog.objects.count()}', content='Content', author=self.user, published=True)
+
+    def params(self):
+        return {'blog': self.owner.pk}
+
+    def add(self, blog, parent=None):
+        return BlogComment.objects.create(blog=blog, user=self.user, content='Comment', parent=parent)
+
+
+class ForumPostTreeTests(ReplyTreeTests, TestCase):
+    url = '/api/forums/posts/'
+
+    def scope(self):
+        category = ForumCategory.objects.get_or_create(name='General')[0]
+        return ForumThread.objects.create(title='Thread', category=category, user=self.user)
+
+    def params(self):
+        return {'thread': self.owner.pk, 'top_level': 'true'}
+
+    def add(self, thread, parent=None):
+        return ForumPost.objects.create(thread=thread, user=self.user, content='Post', parent=parent)
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from core.trending import refresh_scores
+from stories.models import Story
+
+User = get_user_model()
+
+WEIGHTS = {'views': 1, 'like_count': 4, 'comment_count': 6}
+
+
+class RefreshScoresTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        user = User.objects.create_user(email='author@example.com', password='x', first_name='Author', last_name='One')
+        self.rows = {}
+        for hours, views, likes, comments in ((0, 10, 1, 0), (5, 40, 3, 2), (70, 7, 0, 1), (24 * 40, 100, 9, 9)):
+            story = Story.objects.create(title='Story', body='Body', user=user)
+            Story.objects.filter(pk=story.pk).update(
+                created_at=self.now - timedelta(hours=hours), views=views, like_count=likes,
+                comment_count=comments, trending_score=1,
+            )
+            self.rows[story.pk] = (hours, views + 4 * likes + 6 * comments)
+
+    def test_scores_decay_with_age(self):
+        scored = refresh_scores(Story, WEIGHTS, window_days=30, now=self.now)
+        self.assertEqual(scored, 3)
+
+        for pk, score in Story.objects.values_list('pk', 'trending_score'):
+            hours, total = self.rows[pk]
+            expected = total / (hours + 2) ** settings.TRENDING_GRAVITY if hours < 24 * 30 else 0
+            self.assertAlmostEqual(score, expected, places=6)
@@ -0,0 +1,180 @@
+import itertools
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.etree import ElementTree
+
+import urllib3
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import storage, uploads
+from core.models import UploadSession
+from core.tests.test_storage import FakeS3Pool
+
+User = get_user_model()
+
+NS = 'http://s3.amazonaws.com/doc/2006-03-01/'
+
+
+def xml(root, body):
+    return f'<?xml version="1.0" encoding="UTF-8"?><{root} xmlns="{NS}">{body}</{root}>'.encode()
+
+
+class FakeMultipartS3(FakeS3Pool):
+    """
+    Answers the multipart upload calls of the S3 API the way MinIO does,
+    from an in-memory set of uploads. Listings come one item per page so
+    that pagination is exercised.
+    """
+    def __init__(self):
+        super().__init__()
+        self.uploads = {}
+        self.completed = {}
+        self.ids = (f'upload-{i}' for i in itertools.count(1))
+
+    def respond(self, body=b'', status=200):
+        return urllib3.HTTPResponse(
+            body=body, status=status, headers={'Content-Type': 'application/xml'}, preload_content=True,
+        )
+
+    def urlopen(self, method, url, *args, body=None, **kwargs):
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query, keep_blank_values=True)
+        key = unquote(parsed.path).split('/', 2)[2] if parsed.path.count('/') > 1 else None
+        if key is None and method == 'GET' and 'uploads' in query:
+            return self.list_uploads(query)
+        if key is None or not ('uploads' in query or 'uploadId' in query):
+            return super().urlopen(method, url, *args, **kwargs)
+        self.requests.append((method, parsed.path))
+
+        if method == 'POST' and 'uploads' in query:
+            upload_id = next(self.ids)
+            self.uploads[upload_id] = {'key': key, 'parts': {}, 'initiated': timezone.now()}
+            return self.respond(xml('InitiateMultipartUploadResult', f'<Key>{key}</Key><UploadId>{upload_id}</UploadId>'))
+
+        upload_id = query['uploadId'][0]
+        if upload_id not in self.uploads:
+            return self.respond(xml('Error', '<Code>NoSuchUpload</Code><Message>No such upload</Message>'), 404)
+        upload = self.uploads[upload_id]
+        if method == 'GET':
+            marker = int(query.get('part-number-marker', ['0'])[0] or 0)
+            numbers = sorted(n for n in upload['parts'] if n > marker)
+            page = numbers[:1]
+            parts = ''.join(
+                f'<Part><PartNumber>{n}</PartNumber><ETag>"{upload["parts"][n][0]}"</ETag>'
+                f'<Size>{upload["parts"][n][1]}</Size></Part>'
+                for n in page
+            )
+            truncated = len(numbers) > 1
+            return self.respond(xml('ListPartsResult', (
+                f'<IsTruncated>{str(truncated).lower()}</IsTruncated>'
+                + (f'<NextPartNumberMarker>{page[0]}</NextPartNumberMarker>' if truncated else '')
+                + parts
+            )))
+        if method == 'POST':
+            element = ElementTree.fromstring(body)
+            self.completed[upload['key']] = [
+                (int(part.findtext(f'{{{NS}}}PartNumber')), part.findtext(f'{{{NS}}}ETag').strip('"'))
+                for part in element
+            ]
+            del self.uploads[upload_id]
+            return self.respond(xml('CompleteMultipartUploadResult', f'<Key>{key}</Key><ETag>"final"</ETag>'))
+        if method == 'DELETE':
+            del self.uploads[upload_id]
+            return self.respond(status=204)
+        raise AssertionError(f'Unexpected request to MinIO: {method} {url}')
+
+    def list_uploads(self, query):
+        self.requests.append(('GET', 'uploads'))
+        marker = query.get('upload-id-marker', [''])[0]
+        ids = sorted(upload_id for upload_id in self.uploads if upload_id > marker)
+        page = ids[:1]
+        uploads = ''.join(
+            f'<Upload><Key>{self.uploads[upload_id]["key"]}</Key><UploadId>{upload_id}</UploadId>'
+            f'<Initiated>{self.uploads[upload_id]["initiated"].strftime("%Y-%m-%dT%H:%M:%S.000Z")}</Initiated></Upload>'
+            for upload_id in page
+        )
+        truncated = len(ids) > 1
+        return self.respond(xml('ListMultipartUploadsResult', (
+            f'<IsTruncated>{str(truncated).lower()}</IsTruncated>'
+            + (f'<NextKeyMarker>{self.uploads[page[0]]["key"]}</NextKeyMarker>'
+               f'<NextUploadIdMarker>{page[0]}</NextUploadIdMarker>' if truncated else '')
+            + uploads
+        )))
+
+
+@override_settings(UPLOAD_PART_SIZE=uploads.MIN_PART_SIZE)
+class MultipartUploadTests(TestCase):
+    """
+    ``MinioStorage`` drives multipart uploads through private methods of the
+    minio client (pinned in requirements.txt): these tests break if an
+    upgrade changes them.
+    """
+    def setUp(self):
+        cache.clear()
+        self.s3 = FakeMultipartS3()
+        patcher = mock.patch.object(storage, 'build_http_client', return_value=self.s3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, storage, '_storage', storage._storage)
+        storage._storage = None
+        self.user = User.objects.create_user(email='uploader@example.com', first_name='Up', last_name='Loader')
+
+    def test_upload_is_resumed_and_completed(self):
+        session = uploads.initiate(self.user, 'video/mp4', 3 * uploads.MIN_PART_SIZE)
+        self.assertEqual(session.part_count, 3)
+        self.assertEqual(self.s3.uploads[session.upload_id]['key'], session.object_name)
+
+        parts = self.s3.uploads[session.upload_id]['parts']
+        parts.update({1: ('etag-1', uploads.MIN_PART_SIZE), 3: ('etag-3', uploads.MIN_PART_SIZE)})
+        self.assertEqual(uploads.uploaded_parts(session), [
+            {'part_number': 1, 'etag': 'etag-1', 'size': uploads.MIN_PART_SIZE},
+            {'part_number': 3, 'etag': 'etag-3', 'size': uploads.MIN_PART_SIZE},
+        ])
+
+        parts[2] = ('etag-2', uploads.MIN_PART_SIZE)
+        url = uploads.complete(session, {n: etag for n, (etag, _) in parts.items()})
+        self.assertEqual(self.s3.completed[session.object_name], [(1, 'etag-1'), (2, 'etag-2'), (3, 'etag-3')])
+        self.assertTrue(url.endswith(session.object_name))
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'COMPLETED')
+
+    def test_abort_tolerates_uploads_already_gone(self):
+        session = uploads.initiate(self.user, 'video/mp4', uploads.MIN_PART_SIZE)
+        del self.s3.uploads[session.upload_id]
+        uploads.abort(session)
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'ABORTED')
+
+    def test_cleanup_aborts_expired_sessions_after_releasing_their_locks(self):
+        expired = [uploads.initiate(self.user, 'video/mp4', uploads.MIN_PART_SIZE) for _ in range(2)]
+        active = uploads.initiate(self.user, 'video/mp4', uploads.MIN_PART_SIZE)
+        UploadSession.objects.filter(pk__in=[s.pk for s in expired]).update(expires_at=timezone.now())
+        # An upload left in MinIO without a session
+        self.s3.uploads['upload-0'] = {
+            'key': 'abandoned.mp4', 'parts': {},
+            'initiated': timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL + 60),
+        }
+
+        depth = len(connection.atomic_blocks)
+        aborts = []
+        abort = storage.MinioStorage.abort_multipart_upload
+
+        def record(self, object_name, upload_id):
+            aborts.append((upload_id, len(connection.atomic_blocks)))
+            return abort(self, object_name, upload_id)
+
+        with mock.patch.object(storage.MinioStorage, 'abort_multipart_upload', record):
+            self.assertEqual(uploads.cleanup(), (2, 1))
+
+        self.assertCountEqual(aborts, [(s.upload_id, depth) for s in expired] + [('upload-0', depth)])
+        self.assertEqual(list(self.s3.uploads), [active.upload_id])
+        self.assertEqual(
+            dict(UploadSession.objects.values_list('pk', 'status')),
+            {expired[0].pk: 'ABORTED', expired[1].pk: 'ABORTED', active.pk: 'ACTIVE'},
+        )
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.viewcounts import ViewCounter
+from stories.models import Story
+
+User = get_user_model()
+
+
+@mock.patch('core.viewcounts.LOCK_TIMEOUT', 0.05)
+class ViewCounterLockTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.counter = ViewCounter(['stories.Story'], buffered=True)
+        self.counter.cache.clear()
+        user = User.objects.create_user(email='author@example.com', password='x', first_name='Author', last_name='One')
+        self.story = Story.objects.create(title='Story', body='Body', user=user)
+        self.lock = 'viewcount:stories.story:lock'
+
+    def test_views_are_kept_while_another_worker_holds_the_lock(self):
+        self.counter.cache.set(self.lock, 'other', timeout=None)
+        self.counter.increment(self.story)
+        self.assertEqual(self.counter.flush(), 0)
+        # Neither call released a lock it did not take
+        self.assertEqual(self.counter.cache.get(self.lock), 'other')
+
+        self.counter.cache.delete(self.lock)
+        self.counter.increment(self.story)
+        self.assertEqual(self.counter.flush(), 2)
+        self.story.refresh_from_db()
+        self.assertEqual(self.story.views, 2)
+
+    def test_expired_lock_is_not_released_by_its_former_holder(self):
+        with self.counter._mutex('stories.story') as acquired:
+            self.assertTrue(acquired)
+            # Our lock expired and another worker took it
+            self.counter.cache.set(self.lock, 'other', timeout=None)
+        self.assertEqual(self.counter.cache.get(self.lock), 'other')
+
+
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(email='author@example.com', password='x', first_name='Author', last_name='One')
+        self.story = Story.objects.create(title='Story', body='Body', user=user)
+
+    def test_unshared_cache_writes_views_directly(self):
+        counter = ViewCounter(['stories.Story'])
+        self.assertFalse(counter.buffered)
+        counter.increment(self.story)
+        counter.increment(self.story)
+        self.assertEqual(self.story.views, 2)
+        self.assertEqual(counter.pending(self.story), 0)
+        self.assertEqual(counter.flush(), 0)
+        self.story.refresh_from_db()
+        self.assertEqual(self.story.views, 2)
+
+    def test_flush_deletes_the_counters(self):
+        counter = ViewCounter(['stories.Story'], buffered=True)
+        counter.cache.clear()
+        counter.increment(self.story)
+        counter.increment(self.story)
+        self.assertEqual(counter.pending(self.story), 2)
+        self.assertEqual(counter.flush(), 2)
+
+        self.assertEqual(counter.cache.get_many([counter._count_key('stories.story', self.story.pk)]), {})
+        self.story.refresh_from_db()
+        self.assertEqual(self.story.views, 2)
@@ -0,0 +1,119 @@
+"""
+Helpers for rendering threaded discussions (story comments, blog comments and
+forum posts) without issuing a query per node.
+
+A discussion is loaded with a single query, linked into a parent -> children
+tree in memory and the children of every node are attached to it, where the
+serializers' ``get_replies`` pick them up.
+"""
+from collections import defaultdict
+from rest_framework.exceptions import ValidationError
+
+REPLIES_ATTR = '_tree_replies'
+
+
+def build_tree(nodes, roots=None, max_depth=None, limit=None):
+    """
+    Link ``nodes`` into a tree in one pass and attach each node's children.
+
+    ``roots`` defaults to the nodes whose parent is not part of ``nodes``.
+    ``max_depth`` caps how many levels of replies are attached below the
+    roots and ``limit`` caps the number of replies kept per node. Children
+    keep the order in which ``nodes`` were fetched.
+    """
+    children = defaultdict(list)
+    for node in nodes:
+        if node.parent_id is not None:
+            children[node.parent_id].append(node)
+
+    if roots is None:
+        ids = {node.pk for node in nodes}
+        roots = [node for node in nodes if node.parent_id not in ids]
+
+    stack = [(root, 0) for root in roots]
+    while stack:
+        node, depth = stack.pop()
+        if max_depth is not None and depth >= max_depth:
+            replies = []
+        else:
+            replies = children.get(node.pk, [])
+            if limit is not None:
+                replies = replies[:limit]
+        setattr(node, REPLIES_ATTR, replies)
+        stack.extend((reply, depth + 1) for reply in replies)
+
+    return roots
+
+
+def attach_replies(roots, queryset, max_depth=None, limit=None):
+    """
+    Fetch the replies in ``queryset`` with their authors in one query and
+    attach them below ``roots``.
+    """
+    roots = list(roots)
+    if roots:
+        build_tree(list(queryset.select_related('user')), roots=roots,
+                   max_depth=max_depth, limit=limit)
+    return roots
+
+
+def get_tree_replies(node):
+    """
+    Return the replies attached by ``build_tree``, or None when ``node`` was
+    loaded on its own and its replies have to be queried.
+    """
+    return getattr(node, REPLIES_ATTR, None)
+
+
+def _non_negative_int(request, param):
+    value = request.query_params.get(param)
+    if value in (None, ''):
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        value = -1
+    if value < 0:
+        raise ValidationError({param: 'Must be a non-negative integer.'})
+    return value
+
+
+def reply_tree_options(request):
+    """
+    Read the optional ``max_depth`` and ``reply_limit`` query parameters.
+    """
+    if request is None:
+        return {'max_depth': None, 'limit': None}
+    return {
+        'max_depth': _non_negative_int(request, 'max_depth'),
+        'limit': _non_negative_int(request, 'reply_limit'),
+    }
+
+
+class ReplyTreeMixin:
+    """
+    ViewSet mixin that loads the reply trees of the comments being rendered
+    in one query. ``reply_scope_field`` names the foreign key to the story,
+    blog or thread that owns the discussion.
+    """
+    reply_scope_field = None
+
+    def get_object(self):
+        obj = super().get_object()
+        if self.action == 'retrieve':
+            self.attach_reply_trees([obj])
+        return obj
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            self.attach_reply_trees(page)
+        return page
+
+    def attach_reply_trees(self, roots):
+        scope = f'{self.reply_scope_field}_id'
+        replies = self.queryset.model.objects.filter(**{
+            f'{scope}__in': {getattr(root, scope) for root in roots},
+            'parent__isnull': False,
+        })
+        return attach_replies(roots, replies, **reply_tree_options(self.request))
@@ -0,0 +1,93 @@
+"""
+Time-decayed trending ranking for stories, blogs and forum threads.
+
+Each model listed in ``settings.TRENDING_MODELS`` stores a precomputed
+``trending_score`` column backed by a descending index. The score weighs the
+model's engagement columns (views, likes, comments, posts) and decays with
+age, Hacker News style::
+
+    score = sum(weight * column) / (age_in_hours + 2) ** TRENDING_GRAVITY
+
+Scores are recomputed periodically by the ``update_trending`` command, with
+one ``UPDATE`` per model that computes every score in the database, so
+``/trending/`` endpoints are a plain top-N read over the index.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import DurationField, ExpressionWrapper, F, FloatField, Value
+from django.db.models.functions import Cast, Extract, Greatest, Power
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def score(weights, now, gravity=None):
+    """
+    Expression computing the trending score of a row at ``now`` from its
+    ``weights`` columns and ``created_at``.
+    """
+    if gravity is None:
+        gravity = settings.TRENDING_GRAVITY
+    weighted_total = sum(weight * F(field) for field, weight in weights.items())
+    age = ExpressionWrapper(Value(now) - F('created_at'), output_field=DurationField())
+    age_hours = Greatest(Extract(age, 'epoch'), Value(0.0)) / Value(3600.0)
+    return Cast(weighted_total, FloatField()) / Power(age_hours + Value(2.0), Value(float(gravity)))
+
+
+def refresh_scores(model, weights, window_days=None, now=None):
+    """
+    Recompute ``trending_score`` for the rows of ``model`` created within the
+    window and reset the rows that have aged out of it. Returns the number of
+    rows scored.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=window_days or settings.TRENDING_WINDOW_DAYS)
+
+    model.objects.filter(created_at__lt=cutoff, trending_score__gt=0).update(trending_score=0)
+    return model.objects.filter(created_at__gte=cutoff).update(trending_score=score(weights, now))
+
+
+def refresh_all(now=None):
+    return {
+        label: refresh_scores(apps.get_model(label), weights, now=now)
+        for label, weights in settings.TRENDING_MODELS.items()
+    }
+
+
+def _bounded_int(request, param, default, maximum):
+    value = request.query_params.get(param)
+    if value in (None, ''):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        value = 0
+    if not 1 <= value <= maximum:
+        raise ValidationError({param: f'Must be an integer between 1 and {maximum}.'})
+    return value
+
+
+class TrendingMixin:
+    """
+    ViewSet mixin adding a ``trending`` list action that reads the top
+    ``?limit=`` rows by precomputed score among those created in the last
+    ``?window=`` days.
+    """
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        window = _bounded_int(request, 'window', settings.TRENDING_WINDOW_DAYS, settings.TRENDING_WINDOW_DAYS)
+        limit = _bounded_int(request, 'limit', DEFAULT_LIMIT, MAX_LIMIT)
+
+        queryset = self.get_queryset().filter(
+            created_at__gte=timezone.now() - timedelta(days=window),
+            trending_score__gt=0,
+        ).order_by('-trending_score')[:limit]
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
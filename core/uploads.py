@@ -0,0 +1,175 @@
+"""
+Resumable multipart uploads of large media straight to MinIO.
+
+1. ``initiate`` starts an S3 multipart upload and records it as an
+   ``UploadSession``, with the part size the client must cut the file into;
+2. ``presign_parts`` hands out presigned ``PUT`` URLs for batches of part
+   numbers. Parts can be uploaded in parallel and in any order, and a part
+   that failed is simply uploaded again with a new URL;
+3. ``uploaded_parts`` lists the parts MinIO already has, so that a client
+   resuming after a dropped connection only sends the missing ones;
+4. ``complete`` assembles the object from the parts' ETags, or ``abort``
+   discards them.
+
+Sessions live for ``settings.UPLOAD_SESSION_TTL`` seconds. The
+``cleanup_uploads`` command aborts the ones that were abandoned, and the
+multipart uploads MinIO holds without a session, so their parts do not use
+storage forever.
+"""
+from datetime import timedelta
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from minio.error import S3Error
+
+from .models import UploadSession
+from .storage import get_storage, new_object_name
+
+# S3 limits on multipart uploads
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+MAX_PARTS = 10000
+
+
+class UploadError(Exception):
+    pass
+
+
+def part_size_for(size):
+    """
+    The part size for a file of ``size`` bytes: ``settings.UPLOAD_PART_SIZE``,
+    or more when the file would otherwise need more than ``MAX_PARTS`` parts.
+    """
+    part_size = max(settings.UPLOAD_PART_SIZE, MIN_PART_SIZE, math.ceil(size / MAX_PARTS))
+    if part_size > MAX_PART_SIZE:
+        raise UploadError(f'Files larger than {MAX_PART_SIZE * MAX_PARTS} bytes cannot be uploaded')
+    return part_size
+
+
+def initiate(user, file_type, size):
+    part_size = part_size_for(size)
+    object_name = new_object_name(file_type)
+    upload_id = get_storage().create_multipart_upload(object_name, file_type)
+    return UploadSession.objects.create(
+        user=user,
+        object_name=object_name,
+        upload_id=upload_id,
+        file_type=file_type,
+        size=size,
+        part_size=part_size,
+        part_count=max(math.ceil(size / part_size), 1),
+        expires_at=timezone.now() + timedelta(seconds=settings.UPLOAD_SESSION_TTL),
+    )
+
+
+def _check_part_numbers(session, part_numbers):
+    invalid = sorted({n for n in part_numbers if not 1 <= n <= session.part_count})
+    if invalid:
+        raise UploadError(f'Part numbers must be between 1 and {session.part_count}, got {invalid}')
+
+
+def presign_parts(session, part_numbers):
+    """
+    ``{part_number, url}`` for each of ``part_numbers``. URLs expire with the
+    session at the latest.
+    """
+    _check_part_numbers(session, part_numbers)
+    expires = max(min(
+        settings.MINIO_PRESIGN_EXPIRES,
+        int((session.expires_at - timezone.now()).total_seconds()),
+    ), 1)
+    storage = get_storage()
+    return [
+        {
+            'part_number': number,
+            'url': storage.get_presigned_part_url(session.object_name, session.upload_id, number, expires),
+        }
+        for number in sorted(set(part_numbers))
+    ]
+
+
+def uploaded_parts(session):
+    """
+    ``{part_number, etag, size}`` of the parts MinIO has received.
+    """
+    return [
+        {'part_number': number, 'etag': etag, 'size': size}
+        for number, etag, size in get_storage().list_parts(session.object_name, session.upload_id)
+    ]
+
+
+def complete(session, parts):
+    """
+    Assemble the object from ``parts``, ``{part_number: etag}`` covering
+    every part of the session. Returns the URL the object is served from.
+    """
+    _check_part_numbers(session, parts)
+    missing = sorted(set(range(1, session.part_count + 1)) - set(parts))
+    if missing:
+        raise UploadError(f'Parts {missing} have not been uploaded')
+
+    storage = get_storage()
+    storage.complete_multipart_upload(session.object_name, session.upload_id, sorted(parts.items()))
+    session.status = 'COMPLETED'
+    session.save(update_fields=['status', 'updated_at'])
+    return storage.get_object_url(session.object_name)
+
+
+def _abort_upload(storage, object_name, upload_id):
+    try:
+        storage.abort_multipart_upload(object_name, upload_id)
+    except S3Error as e:
+        # Already aborted or completed on the MinIO side
+        if e.code != 'NoSuchUpload':
+            raise
+
+
+def abort(session):
+    _abort_upload(get_storage(), session.object_name, session.upload_id)
+    session.status = 'ABORTED'
+    session.save(update_fields=['status', 'updated_at'])
+
+
+def cleanup(now=None):
+    """
+    Abort the sessions that expired before ``now``, then the multipart
+    uploads in the bucket that were started more than a session lifetime
+    ago (those whose session is gone). Returns the number of each.
+    """
+    now = now or timezone.now()
+    storage = get_storage()
+
+    expired = 0
+    while True:
+        with transaction.atomic():
+            # Sessions locked by a request completing them are left alone
+            sessions = list(
+                UploadSession.objects.select_for_update(skip_locked=True)
+                .filter(status='ACTIVE', expires_at__lte=now)
+                .order_by('expires_at')[:100]
+            )
+            if not sessions:
+                break
+            UploadSession.objects.filter(pk__in=[session.pk for session in sessions]).update(
+                status='ABORTED', updated_at=timezone.now(),
+            )
+        # MinIO is only called once the locks are released. Uploads left
+        # behind by a failure here are swept below on a later run
+        for session in sessions:
+            _abort_upload(storage, session.object_name, session.upload_id)
+        expired += len(sessions)
+
+    cutoff = now - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    stale = [
+        (object_name, upload_id)
+        for object_name, upload_id, initiated_at in storage.list_multipart_uploads()
+        if initiated_at and initiated_at < cutoff
+    ]
+    for object_name, upload_id in stale:
+        _abort_upload(storage, object_name, upload_id)
+    UploadSession.objects.filter(
+        status='ACTIVE', upload_id__in=[upload_id for _, upload_id in stale],
+    ).update(status='ABORTED')
+    return expired, len(stale)
@@ -1,6 +1,13 @@
-from django.urls import path
-from .views import FileUploadView
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import FileUploadBatchView, FileUploadView, SearchView, UploadSessionViewSet
+
+router = DefaultRouter()
+router.register(r'upload/multipart', UploadSessionViewSet, basename='upload-session')
 
 urlpatterns = [
     path('upload/', FileUploadView.as_view(), name='file-upload'),
+    path('upload/batch/', FileUploadBatchView.as_view(), name='file-upload-batch'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('', include(router.urls)),
 ]
@@ -0,0 +1,275 @@
+"""
+Write-behind view counting for stories, blogs and forum threads.
+
+A view is an atomic increment of a per-object counter in the cache. The ids
+of objects with pending views are tracked per model and flushed to the
+database periodically with one ``UPDATE ... SET views = views + n`` per
+distinct delta, so retrieving an object no longer rewrites its row, bumps
+``updated_at`` or loses increments between concurrent workers.
+
+The counters live in the cache named by ``settings.VIEW_COUNT_CACHE``, a
+dedicated alias that never culls entries: an evicted counter loses its
+views. Buffering needs a cache that every worker and the
+``flush_view_counts`` command share and that increments atomically across
+processes, so it is only enabled on Redis. A flush takes each counter with
+an atomic ``GET`` and ``DEL``, so flushed objects leave no key behind. With
+any other backend (the default local-memory cache, or files) each view is
+written straight to the database with ``UPDATE ... SET views = views + 1``.
+
+The per-model set of dirty ids is read and rewritten under a cache lock.
+A worker that cannot take the lock within ``LOCK_TIMEOUT`` leaves the set
+alone: a view keeps its count and registers the object on a later view, a
+flush skips the model until the next run.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'viewcount'
+LOCK_TIMEOUT = 5
+
+
+class ViewCounter:
+    def __init__(self, models, cache_alias='viewcounts', flush_interval=60, field='views', buffered=None):
+        self.models = [label.lower() for label in models]
+        self.cache_alias = cache_alias
+        self.flush_interval = flush_interval
+        self.field = field
+        self._buffered = buffered
+        self._last_flush = time.monotonic()
+        self._flush_lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def buffered(self):
+        """
+        Whether views are buffered in the cache: by default only on Redis.
+        """
+        if self._buffered is None:
+            return isinstance(self.cache, RedisCache)
+        return self._buffered
+
+    def _count_key(self, label, pk):
+        return f'{KEY_PREFIX}:{label}:{pk}'
+
+    def _marker_key(self, label, pk):
+        return f'{KEY_PREFIX}:{label}:{pk}:dirty'
+
+    def _dirty_key(self, label):
+        return f'{KEY_PREFIX}:{label}:dirty'
+
+    @contextmanager
+    def _mutex(self, label):
+        """
+        Hold the lock of ``label``'s dirty set. Yields whether the lock was
+        taken; callers must not touch the set otherwise.
+        """
+        key = f'{KEY_PREFIX}:{label}:lock'
+        token = uuid4().hex
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        acquired = self.cache.add(key, token, timeout=LOCK_TIMEOUT)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(0.005)
+            acquired = self.cache.add(key, token, timeout=LOCK_TIMEOUT)
+        try:
+            yield acquired
+        finally:
+            # The lock may have expired and been taken by another worker
+            if acquired and self.cache.get(key) == token:
+                self.cache.delete(key)
+
+    def increment(self, instance, amount=1):
+        if not self.buffered:
+            type(instance)._default_manager.filter(pk=instance.pk).update(**{self.field: F(self.field) + amount})
+            setattr(instance, self.field, getattr(instance, self.field) + amount)
+            return
+        self._add(instance._meta.label_lower, instance.pk, amount)
+        self._maybe_flush()
+
+    def _add(self, label, pk, amount):
+        key = self._count_key(label, pk)
+        self.cache.add(key, 0, timeout=None)
+        try:
+            self.cache.incr(key, amount)
+        except ValueError:
+            # The counter was evicted between add() and incr()
+            self.cache.set(key, amount, timeout=None)
+
+        # Only the first view since the last flush registers the object. The
+        # marker expires before the next flush is due, so an object whose
+        # registration was lost is registered again by a later view.
+        marker = self._marker_key(label, pk)
+        if self.cache.add(marker, 1, timeout=max(self.flush_interval // 2, 1)):
+            with self._mutex(label) as acquired:
+                if not acquired:
+                    self.cache.delete(marker)
+                    return
+                dirty = self.cache.get(self._dirty_key(label)) or set()
+                dirty.add(pk)
+                self.cache.set(self._dirty_key(label), dirty, timeout=None)
+
+    def pending(self, instance):
+        if not self.buffered:
+            return 0
+        return self.cache.get(self._count_key(instance._meta.label_lower, instance.pk)) or 0
+
+    def merge_pending(self, objects, model=None):
+        """
+        Add the views that have not been flushed yet to ``objects`` in
+        memory so that responses show live counts. ``objects`` can also be
+        ``.values()`` rows of ``model``.
+        """
+        if not self.buffered:
+            return objects
+        keys = {}
+        for obj in objects:
+            if isinstance(obj, dict):
+                keys[self._count_key(model._meta.label_lower, obj['id'])] = obj
+            else:
+                keys[self._count_key(obj._meta.label_lower, obj.pk)] = obj
+        for key, count in self.cache.get_many(list(keys)).items():
+            obj = keys[key]
+            if isinstance(obj, dict):
+                obj[self.field] += count
+            else:
+                setattr(obj, self.field, getattr(obj, self.field) + count)
+        return objects
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush < self.flush_interval:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = time.monotonic()
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing view counts: {e}")
+        finally:
+            self._flush_lock.release()
+
+    def _take(self, label, pks):
+        """
+        Read and delete the counters of ``pks``. Returns the counts by pk.
+        """
+        keys = {self._count_key(label, pk): pk for pk in pks}
+        if isinstance(self.cache, RedisCache):
+            # One transaction, so a view counted meanwhile either makes it
+            # into the values read or starts a new counter
+            names = [self.cache.make_and_validate_key(key) for key in keys]
+            pipeline = self.cache._cache.get_client(write=True).pipeline(transaction=True)
+            for name in names:
+                pipeline.get(name)
+            pipeline.delete(*names)
+            *values, _ = pipeline.execute()
+            counts = {pk: int(value) for pk, value in zip(keys.values(), values) if value is not None}
+        else:
+            # Buffering forced on a per-process cache (tests): not atomic
+            counts = {keys[key]: count for key, count in self.cache.get_many(list(keys)).items()}
+            self.cache.delete_many(list(keys))
+        return {pk: count for pk, count in counts.items() if count}
+
+    def flush(self):
+        """
+        Write pending views to the database. Returns the number of views
+        written.
+        """
+        if not self.buffered:
+            return 0
+        total = 0
+        for label in self.models:
+            model = apps.get_model(label)
+            with self._mutex(label) as acquired:
+                if not acquired:
+                    logger.warning(f"Skipping view count flush of {label}: dirty set is locked")
+                    continue
+                dirty = self.cache.get(self._dirty_key(label)) or set()
+                self.cache.delete(self._dirty_key(label))
+            if not dirty:
+                continue
+
+            # Clear the markers before reading so that views arriving from
+            # now on register the object again for the next flush.
+            self.cache.delete_many([self._marker_key(label, pk) for pk in dirty])
+
+            deltas = defaultdict(list)
+            for pk, count in self._take(label, dirty).items():
+                deltas[count].append(pk)
+
+            try:
+                with transaction.atomic():
+                    for delta, pks in deltas.items():
+                        model.objects.filter(pk__in=pks).update(**{self.field: F(self.field) + delta})
+            except Exception:
+                # Put the views back so the next flush retries them
+                for delta, pks in deltas.items():
+                    for pk in pks:
+                        self._add(label, pk, delta)
+                raise
+
+            total += sum(delta * len(pks) for delta, pks in deltas.items())
+        return total
+
+
+view_counter = ViewCounter(
+    models=settings.VIEW_COUNT_MODELS,
+    cache_alias=settings.VIEW_COUNT_CACHE,
+    flush_interval=settings.VIEW_COUNT_FLUSH_INTERVAL,
+)
+
+
+def etag_views(views):
+    """
+    ``views`` rounded for the detail ``ETag``: to 10 below 1000, then to two
+    significant digits, so a reader's own view does not always defeat
+    revalidation and a ``304`` shows a count at most about 10% behind.
+    """
+    return views - views % max(10, 10 ** (len(str(views)) - 2))
+
+
+class ViewCountMixin:
+    """
+    ViewSet mixin that counts a view on every retrieve and merges pending
+    views into the objects it renders.
+
+    Place it after ``ConditionalGetMixin`` in the bases: the view is counted
+    when the object is loaded, before the validators are checked, so reads
+    answered with ``304 Not Modified`` are counted too.
+    """
+    def get_object(self):
+        instance = super().get_object()
+        if self.action == 'retrieve':
+            view_counter.increment(instance)
+            view_counter.merge_pending([instance])
+        return instance
+
+    def get_etag_extras(self, instance):
+        return {view_counter.field: etag_views(getattr(instance, view_counter.field))}
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            view_counter.merge_pending(page, queryset.model)
+        return page
+
+    async def apaginate_queryset(self, queryset):
+        page = await super().apaginate_queryset(queryset)
+        if page is not None:
+            await sync_to_async(view_counter.merge_pending)(page, queryset.model)
+        return page
@@ -1,14 +1,36 @@
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from minio.error import S3Error
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from .storage import MinioStorage
-import uuid
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.throttling import UserRateThrottle
+from . import uploads
+from .asyncviews import AsyncViewMixin
+from .models import UploadSession
+from .search import SEARCH_TYPES, search
+from .serializers import (
+    UploadCompleteSerializer,
+    UploadInitiateSerializer,
+    UploadPartsSerializer,
+    UploadSessionSerializer,
+)
+from .storage import aget_storage, get_storage
 
-class FileUploadView(APIView):
+class FileUploadView(AsyncViewMixin, APIView):
     """
     View to get a presigned URL for file upload to MinIO.
     """
     def post(self, request, *args, **kwargs):
+        return self.presign(get_storage(), request)
+    
+    async def apost(self, request, *args, **kwargs):
+        return self.presign(await aget_storage(), request)
+    
+    def presign(self, storage, request):
         file_type = request.data.get('file_type', '')
         
         if not file_type:
@@ -16,19 +38,142 @@ class FileUploadView(APIView):
                 {'error': 'File type is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-            
-        # Generate a unique filename
-        file_extension = file_type.split('/')[-1]
-        object_name = f"{uuid.uuid4()}.{file_extension}"
         
-        # Get the presigned URL
-        storage = MinioStorage()
-        presigned_url = storage.get_presigned_put_url(object_name)
+        return Response(storage.presign_upload(file_type))
+
+
+class UploadRateThrottle(UserRateThrottle):
+    scope = 'uploads'
+
+
+class FileUploadBatchView(AsyncViewMixin, APIView):
+    """
+    Presigned upload URLs for several files at once (multi-image posts).
+
+    ``file_types`` lists the MIME type of each file; the response has one
+    ``{presigned_url, public_url}`` pair per file, in the same order. Each
+    request can presign up to ``max_files`` writes to the bucket, so it is
+    limited to signed-in users and throttled by the ``uploads`` rate.
+    """
+    max_files = 20
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserRateThrottle, UploadRateThrottle]
+    
+    def post(self, request, *args, **kwargs):
+        return self.presign(get_storage(), request)
+    
+    async def apost(self, request, *args, **kwargs):
+        return self.presign(await aget_storage(), request)
+    
+    def presign(self, storage, request):
+        file_types = request.data.get('file_types')
+        
+        if not isinstance(file_types, list) or not file_types:
+            raise ValidationError({'file_types': 'A non-empty list of file types is required.'})
+        if len(file_types) > self.max_files:
+            raise ValidationError({'file_types': f'At most {self.max_files} files can be uploaded at once.'})
+        if not all(isinstance(file_type, str) and file_type for file_type in file_types):
+            raise ValidationError({'file_types': 'File types must be non-empty strings.'})
+        
+        return Response({'uploads': [storage.presign_upload(file_type) for file_type in file_types]})
+
+
+class UploadSessionViewSet(mixins.RetrieveModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Multipart uploads of large files (see ``core.uploads``).
+
+    ``POST`` with ``{file_type, size}`` starts an upload, ``parts/`` presigns
+    part URLs, ``GET`` lists the parts already received to resume,
+    ``complete/`` assembles the file and ``DELETE`` aborts the upload.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user, status='ACTIVE')
+    
+    def create(self, request, *args, **kwargs):
+        params = UploadInitiateSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        try:
+            session = uploads.initiate(request.user, **params.validated_data)
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data = UploadSessionSerializer(session).data
+        data['public_url'] = get_storage().get_object_url(session.object_name)
+        return Response(data, status=status.HTTP_201_CREATED)
+    
+    def retrieve(self, request, *args, **kwargs):
+        session = self.get_object()
+        data = UploadSessionSerializer(session).data
+        data['uploaded_parts'] = uploads.uploaded_parts(session)
+        return Response(data)
+    
+    def perform_destroy(self, instance):
+        uploads.abort(instance)
+    
+    @action(detail=True, methods=['post'])
+    def parts(self, request, pk=None):
+        session = self.get_object()
+        params = UploadPartsSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        try:
+            parts = uploads.presign_parts(session, params.validated_data['part_numbers'])
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'parts': parts})
+    
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        params = UploadCompleteSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        parts = {part['part_number']: part['etag'] for part in params.validated_data['parts']}
+        
+        with transaction.atomic():
+            # Locked so that cleanup_uploads cannot abort it meanwhile
+            session = get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            try:
+                public_url = uploads.complete(session, parts)
+            except uploads.UploadError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            except S3Error as e:
+                # Wrong or missing ETags, parts below the minimum size, ...
+                return Response({'error': e.message, 'code': e.code}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'object_name': session.object_name, 'public_url': public_url})
+
+
+class SearchView(APIView):
+    """
+    Ranked full-text search across stories, blogs, forum threads, products,
+    dialysis centers and the user's own feedback.
+
+    ``?q=`` is the query (web search syntax), ``?types=`` a comma separated
+    subset of the content types and ``?limit=`` the number of hits (1-50).
+    """
+    permission_classes = [AllowAny]
+    default_limit = 20
+    max_limit = 50
+    
+    def get(self, request, *args, **kwargs):
+        value = request.query_params.get('q', '').strip()
+        if not value:
+            raise ValidationError({'q': 'This parameter is required.'})
+        
+        types = request.query_params.get('types')
+        types = [t.strip() for t in types.split(',') if t.strip()] if types else list(SEARCH_TYPES)
+        unknown = [t for t in types if t not in SEARCH_TYPES]
+        if unknown:
+            raise ValidationError({'types': f"Unknown types: {', '.join(unknown)}. Choose from {', '.join(SEARCH_TYPES)}."})
         
-        # Get the public URL for the object
-        public_url = storage.get_object_url(object_name)
+        limit = request.query_params.get('limit', self.default_limit)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            limit = 0
+        if not 1 <= limit <= self.max_limit:
+            raise ValidationError({'limit': f'Must be an integer between 1 and {self.max_limit}.'})
         
         return Response({
-            'presigned_url': presigned_url,
-            'public_url': public_url
+            'query': value,
+            'results': search(value, types, request.user, limit),
         })
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0002_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['user', '-created_at'], name='feedback_user_idx'),
+        ),
+    ]
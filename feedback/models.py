@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.conf import settings
 from core.models import TimeStampedModel
@@ -21,9 +23,14 @@ class Feedback(TimeStampedModel):
     type = models.CharField(max_length=10, choices=FEEDBACK_TYPES)
     status = models.CharField(max_length=15, choices=FEEDBACK_STATUS, default='PENDING')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='feedback')
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='feedback_search_idx'),
+            models.Index(fields=['user', '-created_at'], name='feedback_user_idx'),
+        ]
     
     def __str__(self):
         return self.title
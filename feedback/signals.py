@@ -0,0 +1,4 @@
+from core.search import register_search
+from .models import Feedback
+
+register_search(Feedback, {'title': 'A', 'description': 'B'})
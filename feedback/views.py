@@ -1,4 +1,4 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -11,15 +11,18 @@ from .serializers import (
     FeedbackUpdateStatusSerializer,
     FeedbackResponseSerializer
 )
+from core.conditional import ConditionalGetMixin
 from core.permissions import IsOwnerOrReadOnly, IsOwnerOrAdmin, IsAdminUser
+from core.search import FullTextSearchFilter, RankedOrderingFilter
 
 class FeedbackRateThrottle(UserRateThrottle):
     rate = '10/day'
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    etag_related = ['responses']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RankedOrderingFilter]
     filterset_fields = ['type', 'status', 'user']
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'updated_at']
@@ -59,7 +62,7 @@ class FeedbackViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(FeedbackSerializer(feedback).data)
 
-class FeedbackResponseViewSet(viewsets.ModelViewSet):
+class FeedbackResponseViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = FeedbackResponse.objects.all()
     serializer_class = FeedbackResponseSerializer
     permission_classes = [IsAuthenticated]
@@ -3,17 +3,18 @@ from .models import ForumCategory, ForumThread, ForumPost, ReportedContent
 
 @admin.register(ForumCategory)
 class ForumCategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'description', 'created_at')
+    list_display = ('name', 'description', 'thread_count', 'created_at')
     search_fields = ('name', 'description')
+    readonly_fields = ('thread_count',)
     ordering = ('name',)
 
 @admin.register(ForumThread)
 class ForumThreadAdmin(admin.ModelAdmin):
-    list_display = ('title', 'category', 'user', 'is_pinned', 'is_closed', 'views', 'created_at')
+    list_display = ('title', 'category', 'user', 'is_pinned', 'is_closed', 'views', 'post_count', 'created_at')
     list_filter = ('is_pinned', 'is_closed', 'category')
     search_fields = ('title', 'user__first_name', 'user__last_name', 'category__name')
     autocomplete_fields = ('user', 'category')
-    readonly_fields = ('views', 'created_at', 'updated_at')
+    readonly_fields = ('views', 'post_count', 'created_at', 'updated_at')
 
 @admin.register(ForumPost)
 class ForumPostAdmin(admin.ModelAdmin):
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:45
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount(model, field, related_model, related_field):
+    # Frozen copy of core.counters.recount
+    rows = related_model.objects.filter(**{related_field: OuterRef('pk')}).order_by()
+    rows = rows.values(related_field).annotate(n=Count('pk')).values('n')
+    model.objects.update(**{field: Coalesce(Subquery(rows, output_field=IntegerField()), 0)})
+
+
+def backfill_counters(apps, schema_editor):
+    ForumCategory = apps.get_model('forums', 'ForumCategory')
+    ForumThread = apps.get_model('forums', 'ForumThread')
+    recount(ForumCategory, 'thread_count', ForumThread, 'category')
+    ForumPost = apps.get_model('forums', 'ForumPost')
+    recount(ForumThread, 'post_count', ForumPost, 'thread')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forumcategory',
+            name='thread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='forumthread',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
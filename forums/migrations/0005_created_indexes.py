@@ -0,0 +1,21 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='forumpost',
+            index=models.Index(fields=['thread', 'created_at', 'id'], name='forumpost_thread_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportedcontent',
+            index=models.Index(fields=['created_at', 'id'], name='reportedcontent_created_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0005_created_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='forumpost',
+            index=models.Index(condition=models.Q(('parent__isnull', True)), fields=['thread', 'created_at'], name='forumpost_toplevel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='forumthread',
+            index=models.Index(fields=['-is_pinned', '-created_at'], name='forumthread_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='forumthread',
+            index=models.Index(fields=['category', '-is_pinned', '-created_at'], name='forumthread_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportedcontent',
+            index=models.Index(fields=['content_type', 'status', '-created_at'], name='reportedcontent_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportedcontent',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['-created_at'], name='reportedcontent_pending_idx'),
+        ),
+    ]
@@ -1,10 +1,14 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from core.models import TimeStampedModel
 
 class ForumCategory(TimeStampedModel):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
+    thread_count = models.PositiveIntegerField(default=0)
     
     class Meta:
         verbose_name_plural = 'Forum Categories'
@@ -20,9 +24,18 @@ class ForumThread(TimeStampedModel):
     is_pinned = models.BooleanField(default=False)
     is_closed = models.BooleanField(default=False)
     views = models.PositiveIntegerField(default=0)
+    post_count = models.PositiveIntegerField(default=0)
+    trending_score = models.FloatField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['-is_pinned', '-created_at']
+        indexes = [
+            models.Index(fields=['-trending_score'], name='forumthread_trending_idx'),
+            GinIndex(fields=['search_vector'], name='forumthread_search_idx'),
+            models.Index(fields=['-is_pinned', '-created_at'], name='forumthread_order_idx'),
+            models.Index(fields=['category', '-is_pinned', '-created_at'], name='forumthread_category_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -35,6 +48,10 @@ class ForumPost(TimeStampedModel):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['thread', 'created_at', 'id'], name='forumpost_thread_created_idx'),
+            models.Index(fields=['thread', 'created_at'], condition=Q(parent__isnull=True), name='forumpost_toplevel_idx'),
+        ]
     
     def __str__(self):
         return f"Post by {self.user.get_full_name()} in {self.thread.title}"
@@ -67,6 +84,11 @@ class ReportedContent(TimeStampedModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='reportedcontent_created_idx'),
+            models.Index(fields=['content_type', 'status', '-created_at'], name='reportedcontent_type_idx'),
+            models.Index(fields=['-created_at'], condition=Q(status='PENDING'), name='reportedcontent_pending_idx'),
+        ]
     
     def __str__(self):
         return f"Report by {self.reported_by.get_full_name()} - {self.get_reason_display()}"
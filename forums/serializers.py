@@ -1,17 +1,19 @@
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from .models import ForumCategory, ForumThread, ForumPost, ReportedContent
 from users.serializers import UserSerializer
+from core.fastpath import BatchField, FastPath
+from core.trees import build_tree, get_tree_replies, reply_tree_options
+
+User = get_user_model()
 
 class ForumCategorySerializer(serializers.ModelSerializer):
-    thread_count = serializers.SerializerMethodField()
+    thread_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = ForumCategory
         fields = ['id', 'name', 'description', 'thread_count', 'created_at']
         read_only_fields = ['id', 'created_at']
-    
-    def get_thread_count(self, obj):
-        return obj.threads.count()
 
 class ForumPostSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -23,9 +25,12 @@ class ForumPostSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'replies']
     
     def get_replies(self, obj):
-        if not obj.replies.exists():
-            return []
-        return ForumPostSerializer(obj.replies.all(), many=True).data
+        replies = get_tree_replies(obj)
+        if replies is None:
+            if not obj.replies.exists():
+                return []
+            replies = obj.replies.all()
+        return ForumPostSerializer(replies, many=True, context=self.context).data
 
 class ForumPostCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -35,7 +40,7 @@ class ForumPostCreateSerializer(serializers.ModelSerializer):
 class ForumThreadSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     category = ForumCategorySerializer(read_only=True)
-    post_count = serializers.SerializerMethodField()
+    post_count = serializers.IntegerField(read_only=True)
     last_post = serializers.SerializerMethodField()
     
     class Meta:
@@ -44,9 +49,6 @@ class ForumThreadSerializer(serializers.ModelSerializer):
                   'views', 'post_count', 'last_post', 'created_at', 'updated_at']
         read_only_fields = ['id', 'views', 'created_at', 'updated_at']
     
-    def get_post_count(self, obj):
-        return obj.posts.count()
-    
     def get_last_post(self, obj):
         last_post = obj.posts.order_by('-created_at').first()
         if last_post:
@@ -61,6 +63,30 @@ class ForumThreadSerializer(serializers.ModelSerializer):
             }
         return None
 
+def last_posts(rows, context):
+    # The latest post of every thread of the page, in one DISTINCT ON query
+    posts = ForumPost.objects.filter(thread_id__in=[row['id'] for row in rows]).order_by(
+        'thread_id', '-created_at',
+    ).distinct('thread_id').values(
+        'thread_id', 'id', 'created_at', 'user__id', 'user__first_name', 'user__last_name', 'user__avatar_url',
+    )
+    return {
+        post['thread_id']: {
+            'id': post['id'],
+            'user': {
+                'id': post['user__id'],
+                'full_name': User(first_name=post['user__first_name'], last_name=post['user__last_name']).get_full_name(),
+                'avatar_url': post['user__avatar_url']
+            },
+            'created_at': post['created_at']
+        }
+        for post in posts
+    }
+
+thread_fast_path = FastPath(ForumThreadSerializer, batch_fields={
+    'last_post': BatchField(last_posts),
+})
+
 class ForumThreadCreateUpdateSerializer(serializers.ModelSerializer):
     first_post = serializers.CharField(write_only=True)
     
@@ -88,8 +114,9 @@ class ForumThreadDetailSerializer(ForumThreadSerializer):
         fields = ForumThreadSerializer.Meta.fields + ['posts']
     
     def get_posts(self, obj):
-        # Only get top-level posts
-        posts = obj.posts.filter(parent=None)
+        # Load the whole discussion at once and render it from the top-level posts
+        options = reply_tree_options(self.context.get('request'))
+        posts = build_tree(list(obj.posts.select_related('user')), **options)
         return ForumPostSerializer(posts, many=True, context=self.context).data
 
 class ReportedContentSerializer(serializers.ModelSerializer):
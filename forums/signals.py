@@ -0,0 +1,12 @@
+from core.cache import register_cache_invalidation
+from core.counters import register_counter
+from core.search import register_search
+from .models import ForumCategory, ForumThread, ForumPost
+
+register_counter(ForumCategory, 'thread_count', ForumThread, 'category')
+register_counter(ForumThread, 'post_count', ForumPost, 'thread')
+
+register_search(ForumThread, {'title': 'A'})
+
+register_cache_invalidation(ForumCategory)
+register_cache_invalidation(ForumThread)
@@ -13,12 +13,23 @@ from .serializers import (
     ForumPostSerializer,
     ForumPostCreateSerializer,
     ReportedContentSerializer,
-    ReportedContentCreateSerializer
+    ReportedContentCreateSerializer,
+    thread_fast_path
 )
+from core.asyncviews import AsyncViewMixin
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin
+from core.fastpath import FastListMixin
 from core.permissions import IsOwnerOrReadOnly, IsOwnerOrAdmin, IsAdminUser
+from core.search import FullTextSearchFilter, RankedOrderingFilter
+from core.trees import ReplyTreeMixin
+from core.trending import TrendingMixin
+from core.viewcounts import ViewCountMixin
 
-class ForumCategoryViewSet(viewsets.ModelViewSet):
+class ForumCategoryViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ForumCategory.objects.all()
+    cache_models = ['forums.ForumCategory', 'forums.ForumThread']
+    etag_fields = ['thread_count']
     serializer_class = ForumCategorySerializer
     permission_classes = [AllowAny]
     
@@ -29,17 +40,26 @@ class ForumCategoryViewSet(viewsets.ModelViewSet):
             permission_classes = [AllowAny]
         return [permission() for permission in permission_classes]
 
-class ForumThreadViewSet(viewsets.ModelViewSet):
+class ForumThreadViewSet(AsyncViewMixin, ConditionalGetMixin, ViewCountMixin, TrendingMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = ForumThread.objects.all()
     serializer_class = ForumThreadSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'user', 'is_pinned', 'is_closed']
+    fast_path = thread_fast_path
+    etag_fields = ['post_count']
+    etag_related = ['posts']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RankedOrderingFilter]
+    filterset_fields = {
+        'category': ['exact'],
+        'user': ['exact'],
+        'is_pinned': ['exact'],
+        'is_closed': ['exact'],
+        'post_count': ['gte'],
+    }
     search_fields = ['title']
-    ordering_fields = ['created_at', 'views']
+    ordering_fields = ['created_at', 'views', 'post_count']
     ordering = ['-is_pinned', '-created_at']
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'trending']:
             permission_classes = [AllowAny]
         elif self.action in ['update', 'partial_update', 'destroy']:
             permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
@@ -56,14 +76,6 @@ class ForumThreadViewSet(viewsets.ModelViewSet):
             return ForumThreadCreateUpdateSerializer
         return ForumThreadSerializer
     
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        # Increment view count
-        instance.views += 1
-        instance.save()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
-    
     @action(detail=True, methods=['post'])
     def pin(self, request, pk=None):
         thread = self.get_object()
@@ -78,11 +90,13 @@ class ForumThreadViewSet(viewsets.ModelViewSet):
         thread.save()
         return Response({'status': 'closed' if thread.is_closed else 'opened'})
 
-class ForumPostViewSet(viewsets.ModelViewSet):
+class ForumPostViewSet(ReplyTreeMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ForumPost.objects.all()
     serializer_class = ForumPostSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['thread', 'user']
+    reply_scope_field = 'thread'
+    etag_scope_field = 'thread'
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -99,7 +113,7 @@ class ForumPostViewSet(viewsets.ModelViewSet):
         return ForumPostSerializer
     
     def get_queryset(self):
-        queryset = ForumPost.objects.all()
+        queryset = ForumPost.objects.select_related('user')
         
         # Filter by thread if provided
         thread_id = self.request.query_params.get('thread', None)
@@ -122,7 +136,7 @@ class ForumPostViewSet(viewsets.ModelViewSet):
             
         serializer.save(user=self.request.user)
 
-class ReportedContentViewSet(viewsets.ModelViewSet):
+class ReportedContentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ReportedContent.objects.all()
     serializer_class = ReportedContentSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration, picked up from the working directory.
+
+``SERVER_MODE`` selects the server (the same variable switches the views,
+see ``config.settings``):
+
+* ``wsgi`` (default): ``config.wsgi`` on sync workers, or threaded workers
+  with ``GUNICORN_THREADS`` above 1;
+* ``asgi``: ``config.asgi`` on uvicorn workers, each running one event loop
+  for all its requests. The hot endpoints are served by async views there
+  (see ``core.asyncviews``), the others on Django's thread for sync code.
+
+The number of workers is gunicorn's ``WEB_CONCURRENCY`` (default 1).
+"""
+import os
+
+mode = os.getenv('SERVER_MODE', 'wsgi')
+if mode not in ('wsgi', 'asgi'):
+    raise RuntimeError(f'SERVER_MODE must be wsgi or asgi, not {mode!r}')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+
+if mode == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
+    threads = int(os.getenv('GUNICORN_THREADS', '1'))
@@ -1,24 +1,33 @@
 from django.contrib import admin
 from .models import (
-    ProductCategory, Product, ProductReview,
+    ProductCategory, Product, ProductReview, StockReservation,
     Cart, CartItem, Wishlist,
     Order, OrderItem
 )
 
 @admin.register(ProductCategory)
 class ProductCategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'description', 'created_at')
+    list_display = ('name', 'description', 'product_count', 'created_at')
     search_fields = ('name', 'description')
+    readonly_fields = ('product_count',)
     ordering = ('name',)
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ('title', 'category', 'price', 'in_stock', 'created_at')
+    list_display = ('title', 'category', 'price', 'stock', 'in_stock', 'review_count', 'created_at')
     list_filter = ('category', 'in_stock')
     search_fields = ('title', 'description', 'category__name', 'tags__name')
     autocomplete_fields = ('category', 'tags')
+    readonly_fields = ('in_stock', 'review_count')
     ordering = ('title',)
 
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('product', 'user', 'quantity', 'expires_at', 'created_at')
+    search_fields = ('product__title', 'user__first_name', 'user__last_name', 'user__email')
+    autocomplete_fields = ('product', 'user')
+    ordering = ('expires_at',)
+
 @admin.register(ProductReview)
 class ProductReviewAdmin(admin.ModelAdmin):
     list_display = ('product', 'user', 'rating', 'created_at')
@@ -33,6 +42,13 @@ class CartAdmin(admin.ModelAdmin):
     search_fields = ('user__first_name', 'user__last_name', 'user__email')
     readonly_fields = ('total',)
     ordering = ('-updated_at',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_totals().select_related('user')
+    
+    @admin.display(ordering='total')
+    def total(self, obj):
+        return obj.total
 
 @admin.register(CartItem)
 class CartItemAdmin(admin.ModelAdmin):
@@ -40,6 +56,13 @@ class CartItemAdmin(admin.ModelAdmin):
     search_fields = ('cart__user__first_name', 'cart__user__last_name', 'product__title')
     autocomplete_fields = ('cart', 'product')
     readonly_fields = ('subtotal',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_subtotals().select_related('cart__user', 'product')
+    
+    @admin.display(ordering='subtotal')
+    def subtotal(self, obj):
+        return obj.subtotal
 
 @admin.register(Wishlist)
 class WishlistAdmin(admin.ModelAdmin):
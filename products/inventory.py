@@ -0,0 +1,132 @@
+"""
+Product inventory.
+
+``Product.stock`` is the quantity that can still be sold; ``in_stock`` is
+derived from it and kept in the same row so it can be filtered and indexed.
+
+Stock only ever moves through ``adjust``: a single conditional
+``UPDATE ... WHERE stock >= n`` over all the products involved. Workers never
+read stock to write it back, so concurrent checkouts of the same product
+cannot oversell it and only wait on each other for the duration of that one
+statement's row locks.
+
+Checkout can hold stock for ``settings.STOCK_RESERVATION_TTL`` seconds with
+``reserve_cart``. Stock is taken from the product as soon as it is reserved;
+``place_order`` consumes the user's reservations and the
+``expire_reservations`` command gives back the stock of those that lapsed.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.cache import invalidate
+from .models import CartItem, Product, StockReservation
+
+
+class InsufficientStock(Exception):
+    """
+    Raised with the ids of the products that do not have enough stock left.
+    """
+    def __init__(self, product_ids):
+        super().__init__(product_ids)
+        self.product_ids = product_ids
+
+
+def adjust(deltas):
+    """
+    Take ``deltas[product_id]`` units from the stock of each product (a
+    negative delta gives stock back), all or nothing. Raises
+    ``InsufficientStock`` when a product has less stock than is taken from
+    it; the caller's transaction must then be rolled back.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    table = connection.ops.quote_name(Product._meta.db_table)
+    # Products are listed in id order so concurrent statements lock their
+    # rows in the same order.
+    values = ', '.join(['(%s, %s)'] * len(deltas))
+    params = [value for pk in sorted(deltas) for value in (pk, deltas[pk])]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} AS p SET stock = p.stock - d.delta, in_stock = p.stock - d.delta > 0 '
+            f'FROM (VALUES {values}) AS d (id, delta) '
+            f'WHERE p.id = d.id AND p.stock >= d.delta '
+            f'RETURNING p.id',
+            params,
+        )
+        updated = {row[0] for row in cursor.fetchall()}
+
+    missing = sorted(set(deltas) - updated)
+    if missing:
+        raise InsufficientStock(missing)
+    # Stock changes bypass post_save, drop the cached product pages here
+    transaction.on_commit(lambda: invalidate(Product._meta.label))
+
+
+def _held(user):
+    """
+    The reservations of ``user``, locked, and the quantity they hold per
+    product.
+    """
+    reservations = list(StockReservation.objects.select_for_update().filter(user=user))
+    held = Counter()
+    for reservation in reservations:
+        held[reservation.product_id] += reservation.quantity
+    return reservations, held
+
+
+def reserve_cart(user):
+    """
+    Hold stock for the content of ``user``'s cart for
+    ``settings.STOCK_RESERVATION_TTL`` seconds, replacing the user's previous
+    reservations. Returns the new reservations.
+    """
+    with transaction.atomic():
+        reservations, held = _held(user)
+        wanted = Counter(dict(CartItem.objects.filter(cart__user=user).values_list('product_id', 'quantity')))
+
+        adjust({pk: wanted[pk] - held[pk] for pk in wanted.keys() | held.keys()})
+
+        StockReservation.objects.filter(pk__in=[r.pk for r in reservations]).delete()
+        expires_at = timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+        return StockReservation.objects.bulk_create([
+            StockReservation(user=user, product_id=pk, quantity=quantity, expires_at=expires_at)
+            for pk, quantity in wanted.items()
+        ])
+
+
+def consume(user, quantities):
+    """
+    Take ``quantities[product_id]`` units for an order placed by ``user``,
+    using the stock the user holds first. Must run inside the transaction
+    creating the order.
+    """
+    reservations, held = _held(user)
+    adjust({pk: quantities.get(pk, 0) - held[pk] for pk in quantities.keys() | held.keys()})
+    StockReservation.objects.filter(pk__in=[r.pk for r in reservations]).delete()
+
+
+def expire_reservations(now=None):
+    """
+    Give back the stock of reservations that expired before ``now`` and
+    delete them. Reservations locked by a checkout in progress are left for
+    the next run. Returns the number of reservations expired.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = list(
+            StockReservation.objects.select_for_update(skip_locked=True)
+            .filter(expires_at__lte=now)
+            .values_list('pk', 'product_id', 'quantity')
+        )
+        released = Counter()
+        for _, product_id, quantity in expired:
+            released[product_id] -= quantity
+        adjust(released)
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in expired]).delete()
+    return len(expired)
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:45
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount(model, field, related_model, related_field):
+    # Frozen copy of core.counters.recount
+    rows = related_model.objects.filter(**{related_field: OuterRef('pk')}).order_by()
+    rows = rows.values(related_field).annotate(n=Count('pk')).values('n')
+    model.objects.update(**{field: Coalesce(Subquery(rows, output_field=IntegerField()), 0)})
+
+
+def backfill_counters(apps, schema_editor):
+    ProductCategory = apps.get_model('products', 'ProductCategory')
+    Product = apps.get_model('products', 'Product')
+    recount(ProductCategory, 'product_count', Product, 'category')
+    ProductReview = apps.get_model('products', 'ProductReview')
+    recount(Product, 'review_count', ProductReview, 'product')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productcategory',
+            name='product_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
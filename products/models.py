@@ -1,11 +1,24 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.conf import settings
+from django.db.models.functions import Cast, Coalesce
+from django.utils.functional import cached_property
 from core.models import TimeStampedModel
 from stories.models import Tag
 
+class AnnotatedQuerySet(models.QuerySet):
+    def _keep_default_ordering(self):
+        # Meta.ordering is dropped from GROUP BY queries, so restate it
+        # unless the caller already chose an ordering.
+        if self.query.order_by:
+            return self
+        return self.order_by(*self.model._meta.ordering)
+
 class ProductCategory(TimeStampedModel):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
+    product_count = models.PositiveIntegerField(default=0)
     
     class Meta:
         verbose_name_plural = 'Product Categories'
@@ -14,20 +27,66 @@ class ProductCategory(TimeStampedModel):
     def __str__(self):
         return self.name
 
+class ProductQuerySet(AnnotatedQuerySet):
+    def with_stats(self):
+        """
+        Compute the average rating in SQL and batch-load the category and
+        tags rendered by ProductSerializer, so a page of products costs a
+        fixed number of queries regardless of its size.
+        """
+        return self.annotate(
+            average_rating=models.Avg(Cast('reviews__rating', models.FloatField())),
+        )._keep_default_ordering().select_related('category').prefetch_related('tags')
+
 class Product(TimeStampedModel):
     title = models.CharField(max_length=255)
     description = models.TextField()
     image_url = models.URLField(blank=True)
+    # Resized copies of the image (see core.images)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     category = models.ForeignKey(ProductCategory, on_delete=models.CASCADE, related_name='products')
     price = models.DecimalField(max_digits=10, decimal_places=2)
-    in_stock = models.BooleanField(default=True)
+    # Units left to sell, changed through products.inventory
+    stock = models.PositiveIntegerField(default=0)
+    # Derived from stock
+    in_stock = models.BooleanField(default=False, editable=False)
     tags = models.ManyToManyField(Tag, related_name='products', blank=True)
+    review_count = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = ProductQuerySet.as_manager()
     
     class Meta:
         ordering = ['title']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='product_search_idx'),
+        ]
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        self.in_stock = self.stock > 0
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'stock' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'in_stock'}
+        super().save(*args, **kwargs)
+
+class StockReservation(TimeStampedModel):
+    """
+    Stock held for a user during checkout, already taken from
+    ``Product.stock`` and given back if it expires unused.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='stock_reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        ordering = ['expires_at']
+    
+    def __str__(self):
+        return f"{self.quantity} x {self.product.title} held for {self.user.get_full_name()}"
 
 class ProductReview(TimeStampedModel):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews')
@@ -42,28 +101,73 @@ class ProductReview(TimeStampedModel):
     def __str__(self):
         return f"Review by {self.user.get_full_name()} for {self.product.title}"
 
+def line_total(prefix=''):
+    return models.ExpressionWrapper(
+        models.F(f'{prefix}quantity') * models.F(f'{prefix}product__price'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+    )
+
+class CartQuerySet(AnnotatedQuerySet):
+    def with_totals(self):
+        """
+        Compute ``total`` in SQL instead of summing the items in Python.
+        """
+        return self.annotate(
+            total=Coalesce(
+                models.Sum(line_total('items__')), models.Value(0),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            ),
+        )._keep_default_ordering()
+    
+    def with_items(self):
+        """
+        Batch-load the items rendered by CartSerializer together with their
+        products (stats, category and tags), in a fixed number of queries.
+        """
+        return self.prefetch_related(models.Prefetch(
+            'items',
+            queryset=CartItem.objects.with_subtotals().order_by('created_at', 'id').prefetch_related(
+                models.Prefetch('product', queryset=Product.objects.with_stats())
+            ),
+        ))
+
 class Cart(TimeStampedModel):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='cart')
     
+    objects = CartQuerySet.as_manager()
+    
     def __str__(self):
         return f"Cart for {self.user.get_full_name()}"
     
-    @property
+    # Carts fetched through Cart.objects.with_totals() carry the total as
+    # an annotation, which takes the place of this fallback.
+    @cached_property
     def total(self):
         return sum(item.subtotal for item in self.items.all())
 
+class CartItemQuerySet(AnnotatedQuerySet):
+    def with_subtotals(self):
+        """
+        Compute ``subtotal`` in SQL, joining the product price instead of
+        loading the product.
+        """
+        return self.annotate(subtotal=line_total())
+
 class CartItem(TimeStampedModel):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
     
+    objects = CartItemQuerySet.as_manager()
+    
     class Meta:
         unique_together = ('cart', 'product')
     
     def __str__(self):
         return f"{self.quantity} x {self.product.title}"
     
-    @property
+    # Filled in by CartItem.objects.with_subtotals()
+    @cached_property
     def subtotal(self):
         return self.product.price * self.quantity
 
@@ -87,9 +191,18 @@ class Order(TimeStampedModel):
     shipping_address = models.TextField()
     contact_number = models.CharField(max_length=20)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    # Client supplied key making checkout submissions safe to retry
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True, editable=False)
     
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'idempotency_key'], name='order_idempotency_key_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_idx'),
+            models.Index(fields=['user', 'status', '-created_at'], name='order_user_status_idx'),
+        ]
     
     def __str__(self):
         return f"Order {self.id} by {self.user.get_full_name()}"
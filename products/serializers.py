@@ -11,17 +11,16 @@ from .models import (
 )
 from users.serializers import UserSerializer
 from stories.serializers import TagSerializer
+from stories.tagging import set_tags
+from core.fastpath import BatchField, FastPath
 
 class ProductCategorySerializer(serializers.ModelSerializer):
-    product_count = serializers.SerializerMethodField()
+    product_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = ProductCategory
         fields = ['id', 'name', 'description', 'product_count', 'created_at']
         read_only_fields = ['id', 'created_at']
-    
-    def get_product_count(self, obj):
-        return obj.products.count()
 
 class ProductReviewSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -35,22 +34,31 @@ class ProductSerializer(serializers.ModelSerializer):
     category = ProductCategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     average_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    review_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Product
-        fields = ['id', 'title', 'description', 'image_url', 'category', 'price', 
-                  'in_stock', 'tags', 'average_rating', 'review_count', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'description', 'image_url', 'image_variants', 'category', 'price', 
+                  'stock', 'in_stock', 'tags', 'average_rating', 'review_count', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    # Products fetched through Product.objects.with_stats() carry the average
+    # as an annotation; fall back to querying for bare instances.
     def get_average_rating(self, obj):
+        if hasattr(obj, 'average_rating'):
+            return obj.average_rating or 0
         reviews = obj.reviews.all()
         if reviews:
             return sum(review.rating for review in reviews) / len(reviews)
         return 0
-    
-    def get_review_count(self, obj):
-        return obj.reviews.count()
+
+# Rows come from Product.objects.with_stats(), which annotates average_rating
+product_fast_path = FastPath(ProductSerializer, batch_fields={
+    'average_rating': BatchField(
+        lambda rows, context: {row['id']: row['average_rating'] or 0 for row in rows},
+        columns=['average_rating'],
+    ),
+})
 
 class ProductCreateUpdateSerializer(serializers.ModelSerializer):
     tags = serializers.ListField(
@@ -60,16 +68,14 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Product
-        fields = ['title', 'description', 'image_url', 'category', 'price', 'in_stock', 'tags']
+        fields = ['title', 'description', 'image_url', 'category', 'price', 'stock', 'tags']
     
     def create(self, validated_data):
         tags_data = validated_data.pop('tags', [])
         product = Product.objects.create(**validated_data)
         
-        # Process tags
-        for tag_name in tags_data:
-            tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-            product.tags.add(tag)
+        if tags_data:
+            set_tags(product, tags_data)
         
         return product
     
@@ -83,10 +89,7 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
         
         # Update tags if provided
         if tags_data is not None:
-            instance.tags.clear()
-            for tag_name in tags_data:
-                tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-                instance.tags.add(tag)
+            set_tags(instance, tags_data)
         
         return instance
 
@@ -112,6 +115,15 @@ class CartItemCreateUpdateSerializer(serializers.ModelSerializer):
         model = CartItem
         fields = ['product', 'quantity']
 
+class CartItemBatchEntrySerializer(serializers.Serializer):
+    # Checked against the products by the upsert, not one query per entry
+    product = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
+
+class CartItemBatchSerializer(serializers.Serializer):
+    items = CartItemBatchEntrySerializer(many=True, allow_empty=False, max_length=100)
+    replace = serializers.BooleanField(default=False)
+
 class CartSerializer(serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
@@ -0,0 +1,125 @@
+"""
+Cart and checkout.
+
+``add_to_cart`` adds products to a cart with a single upsert, so repeated
+or concurrent additions of the same product are merged by the database
+instead of overwriting each other.
+
+``place_order`` turns a user's cart into an order in one transaction and a
+fixed number of queries, whatever the size of the cart:
+
+1. lock the cart row (``SELECT ... FOR UPDATE``) so concurrent checkouts of
+   the same cart run one after the other;
+2. return the order already placed with the same idempotency key, if any;
+3. load the items with their products in one query and total them in SQL;
+4. take the stock, from the user's reservations first (see
+   ``products.inventory``);
+5. create the order and ``bulk_create`` its items at the current prices;
+6. empty the cart.
+"""
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from .inventory import InsufficientStock, consume
+from .models import Cart, CartItem, Order, OrderItem, Product
+
+
+class EmptyCart(Exception):
+    pass
+
+
+class UnknownProducts(Exception):
+    """
+    Raised with the ids of the products that do not exist.
+    """
+    def __init__(self, product_ids):
+        super().__init__(product_ids)
+        self.product_ids = product_ids
+
+
+def add_to_cart(user, quantities, replace=False):
+    """
+    Add ``quantities[product_id]`` units of each product to ``user``'s cart,
+    or set the quantities when ``replace`` is true, in one
+    ``INSERT ... ON CONFLICT (cart_id, product_id) DO UPDATE``. All or
+    nothing: raises ``UnknownProducts`` or ``inventory.InsufficientStock``
+    when a product does not exist or the cart would hold more than its stock.
+    Returns the cart.
+    """
+    cart, _ = Cart.objects.get_or_create(user=user)
+    if not quantities:
+        return cart
+
+    item_table = connection.ops.quote_name(CartItem._meta.db_table)
+    product_table = connection.ops.quote_name(Product._meta.db_table)
+    merged = 'EXCLUDED.quantity' if replace else 'item.quantity + EXCLUDED.quantity'
+    values = ', '.join(['(%s, %s)'] * len(quantities))
+    params = [value for pk in sorted(quantities) for value in (pk, quantities[pk])]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Products without the stock for the new quantity are left out by
+        # the join (new rows) or the WHERE clause (merged rows).
+        cursor.execute(
+            f'INSERT INTO {item_table} AS item (cart_id, product_id, quantity, created_at, updated_at) '
+            f'SELECT %s, v.product_id, v.quantity, now(), now() '
+            f'FROM (VALUES {values}) AS v (product_id, quantity) '
+            f'JOIN {product_table} AS p ON p.id = v.product_id AND p.stock >= v.quantity '
+            f'ON CONFLICT (cart_id, product_id) DO UPDATE '
+            f'SET quantity = {merged}, updated_at = EXCLUDED.updated_at '
+            f'WHERE {merged} <= (SELECT stock FROM {product_table} WHERE id = EXCLUDED.product_id) '
+            f'RETURNING item.product_id',
+            [cart.pk, *params],
+        )
+        added = {row[0] for row in cursor.fetchall()}
+
+        rejected = set(quantities) - added
+        if rejected:
+            unknown = rejected - set(Product.objects.filter(pk__in=rejected).values_list('pk', flat=True))
+            if unknown:
+                raise UnknownProducts(sorted(unknown))
+            raise InsufficientStock(sorted(rejected))
+    return cart
+
+
+def place_order(user, shipping_address, contact_number, idempotency_key=None):
+    """
+    Place an order for the content of ``user``'s cart. Returns ``(order,
+    created)``: a retried submission with the same ``idempotency_key`` gets
+    the order created the first time and ``created=False``. Raises
+    ``EmptyCart`` when there is nothing to order and
+    ``inventory.InsufficientStock`` when some product has sold out.
+    """
+    with transaction.atomic():
+        cart = Cart.objects.select_for_update().filter(user=user).first()
+
+        if idempotency_key:
+            existing = Order.objects.filter(user=user, idempotency_key=idempotency_key).first()
+            if existing:
+                return existing, False
+
+        if cart is None:
+            raise EmptyCart
+
+        items = CartItem.objects.filter(cart=cart)
+        # One JOIN for the items and the prices they are bought at
+        lines = list(items.values_list('product_id', 'quantity', 'product__price'))
+        if not lines:
+            raise EmptyCart
+
+        total = items.with_subtotals().aggregate(total=Sum('subtotal'))['total']
+
+        consume(user, {product_id: quantity for product_id, quantity, _ in lines})
+
+        order = Order.objects.create(
+            user=user,
+            shipping_address=shipping_address,
+            contact_number=contact_number,
+            total_amount=total,
+            idempotency_key=idempotency_key or None,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=product_id, quantity=quantity, price=price)
+            for product_id, quantity, price in lines
+        ])
+        items.delete()
+    return order, True
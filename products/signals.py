@@ -0,0 +1,18 @@
+from core.cache import register_cache_invalidation
+from core.counters import register_counter
+from core.images import register_images
+from core.search import register_search
+from stories.models import Tag
+from .models import ProductCategory, Product, ProductReview
+
+register_counter(ProductCategory, 'product_count', Product, 'category')
+register_counter(Product, 'review_count', ProductReview, 'product')
+register_counter(Tag, 'product_count', Product.tags.through, 'tag')
+
+register_search(Product, {'title': 'A', 'description': 'B'})
+
+register_images(Product, {'image_url': 'image_variants'})
+
+register_cache_invalidation(ProductCategory)
+register_cache_invalidation(Product)
+register_cache_invalidation(ProductReview)
@@ -4,7 +4,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
+from django.db.models import Prefetch
 from .models import (
     ProductCategory, 
     Product, 
@@ -24,15 +24,26 @@ from .serializers import (
     CartSerializer,
     CartItemSerializer,
     CartItemCreateUpdateSerializer,
+    CartItemBatchSerializer,
     WishlistSerializer,
     WishlistItemCreateSerializer,   
     OrderSerializer,
-    OrderCreateSerializer
+    OrderCreateSerializer,
+    product_fast_path
 )
+from .inventory import InsufficientStock, reserve_cart
+from .services import EmptyCart, UnknownProducts, add_to_cart, place_order
+from core.asyncviews import AsyncViewMixin
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin
+from core.fastpath import FastListMixin
 from core.permissions import IsOwnerOrReadOnly, IsOwnerOrAdmin, IsAdminUser
+from core.search import FullTextSearchFilter, RankedOrderingFilter
 
-class ProductCategoryViewSet(viewsets.ModelViewSet):
+class ProductCategoryViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ProductCategory.objects.all()
+    cache_models = ['products.ProductCategory', 'products.Product']
+    etag_fields = ['product_count']
     serializer_class = ProductCategorySerializer
     permission_classes = [AllowAny]
     
@@ -43,13 +54,22 @@ class ProductCategoryViewSet(viewsets.ModelViewSet):
             permission_classes = [AllowAny]
         return [permission() for permission in permission_classes]
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all()
+class ProductViewSet(AsyncViewMixin, CachedResponseMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
+    queryset = Product.objects.with_stats()
+    fast_path = product_fast_path
+    cache_models = ['products.Product', 'products.ProductCategory', 'products.ProductReview', 'stories.Tag', 'users.User']
+    etag_fields = ['stock', 'review_count', 'category__product_count']
+    etag_related = ['reviews', 'category']
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'in_stock', 'tags__name']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RankedOrderingFilter]
+    filterset_fields = {
+        'category': ['exact'],
+        'in_stock': ['exact'],
+        'tags__name': ['exact'],
+        'review_count': ['gte'],
+    }
     search_fields = ['title', 'description']
-    ordering_fields = ['price', 'created_at']
+    ordering_fields = ['price', 'created_at', 'review_count']
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -58,6 +78,14 @@ class ProductViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated, IsAdminUser]
         return [permission() for permission in permission_classes]
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch('reviews', queryset=ProductReview.objects.select_related('user'))
+            )
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return ProductDetailSerializer
@@ -70,17 +98,22 @@ class ProductViewSet(viewsets.ModelViewSet):
         min_price = request.query_params.get('min', None)
         max_price = request.query_params.get('max', None)
         
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
         
         if min_price:
             queryset = queryset.filter(price__gte=min_price)
         if max_price:
             queryset = queryset.filter(price__lte=max_price)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
             
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
-class ProductReviewViewSet(viewsets.ModelViewSet):
+class ProductReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ProductReview.objects.all()
     serializer_class = ProductReviewSerializer
     permission_classes = [IsAuthenticated]
@@ -123,21 +156,49 @@ class CartViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated()]
 
     def get_queryset(self):
-        return Cart.objects.filter(user=self.request.user)
+        return Cart.objects.filter(user=self.request.user).with_totals().with_items()
 
     def get_object(self):
         # Ensure each user has a cart
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
+        cart, _ = self.get_queryset().get_or_create(user=self.request.user)
         return cart
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+    
+    @action(detail=False, methods=['post'])
+    def reserve(self, request):
+        """
+        Hold stock for the content of the cart while the user checks out.
+        """
+        try:
+            reservations = reserve_cart(request.user)
+        except InsufficientStock as exc:
+            return Response(
+                {'error': 'Insufficient stock', 'products': exc.product_ids},
+                status=status.HTTP_409_CONFLICT
+            )
+        if not reservations:
+            return Response(
+                {'error': 'Cart is empty'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'expires_at': reservations[0].expires_at,
+            'items': [
+                {'product': reservation.product_id, 'quantity': reservation.quantity}
+                for reservation in reservations
+            ],
+        })
 
 class CartItemViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return CartItem.objects.filter(cart__user=self.request.user)
+        return CartItem.objects.filter(cart__user=self.request.user).with_subtotals().prefetch_related(
+            Prefetch('product', queryset=Product.objects.with_stats())
+        )
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -145,27 +206,54 @@ class CartItemViewSet(viewsets.ModelViewSet):
         return CartItemSerializer
 
     def perform_create(self, serializer):
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
         product = serializer.validated_data['product']
-        quantity = serializer.validated_data['quantity']
-
-        # Check if product is in stock
+        
+        # Stock is checked here but only taken at checkout
         if not product.in_stock:
             raise ValidationError({'error': 'Product is out of stock'})
-
-        existing_item = CartItem.objects.filter(cart=cart, product=product).first()
-        if existing_item:
-            existing_item.quantity += quantity
-            existing_item.save()
-        else:
-            serializer.save(cart=cart)
+        try:
+            cart = add_to_cart(self.request.user, {product.pk: serializer.validated_data['quantity']})
+        except InsufficientStock:
+            raise ValidationError({'error': f'Only {product.stock} left in stock'})
+        serializer.instance = CartItem.objects.get(cart=cart, product=product)
+    
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Add many products to the cart at once, or set their quantities with
+        ``replace``. Returns the updated cart.
+        """
+        serializer = CartItemBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        quantities = {}
+        for entry in serializer.validated_data['items']:
+            if serializer.validated_data['replace']:
+                quantities[entry['product']] = entry['quantity']
+            else:
+                quantities[entry['product']] = quantities.get(entry['product'], 0) + entry['quantity']
+        
+        try:
+            add_to_cart(request.user, quantities, replace=serializer.validated_data['replace'])
+        except UnknownProducts as exc:
+            raise ValidationError({'items': f'Unknown products: {exc.product_ids}'})
+        except InsufficientStock as exc:
+            return Response(
+                {'error': 'Insufficient stock', 'products': exc.product_ids},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        cart = Cart.objects.with_totals().with_items().get(user=request.user)
+        return Response(CartSerializer(cart).data)
             
             
 class WishlistViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     def list(self, request):
-        wishlist, _ = Wishlist.objects.get_or_create(user=request.user)
+        wishlist, _ = Wishlist.objects.prefetch_related(
+            Prefetch('products', queryset=Product.objects.with_stats())
+        ).get_or_create(user=request.user)
         serializer = WishlistSerializer(wishlist)
         return Response(serializer.data)
 
@@ -196,8 +284,9 @@ class WishlistViewSet(viewsets.ViewSet):
 
         wishlist.products.remove(product)
         return Response({"detail": "Product removed from wishlist."}, status=status.HTTP_200_OK)
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
+    etag_related = ['items']
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status']
@@ -206,9 +295,13 @@ class OrderViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        queryset = Order.objects.select_related('user').prefetch_related(
+            'items',
+            Prefetch('items__product', queryset=Product.objects.with_stats()),
+        )
         if user.role == 'ADMIN':
-            return Order.objects.all()
-        return Order.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user=user)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -219,47 +312,36 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        user = request.user
-        
-        # Get user's cart
-        try:
-            cart = Cart.objects.get(user=user)
-        except Cart.DoesNotExist:
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+        if len(idempotency_key) > 64:
             return Response(
-                {'error': 'Cart is empty'},
+                {'error': 'Idempotency-Key must be at most 64 characters'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if cart has items
-        if not cart.items.exists():
+        try:
+            order, created = place_order(
+                request.user,
+                shipping_address=serializer.validated_data['shipping_address'],
+                contact_number=serializer.validated_data['contact_number'],
+                idempotency_key=idempotency_key,
+            )
+        except EmptyCart:
             return Response(
                 {'error': 'Cart is empty'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Create order
-        order = Order.objects.create(
-            user=user,
-            shipping_address=serializer.validated_data['shipping_address'],
-            contact_number=serializer.validated_data['contact_number'],
-            total_amount=cart.total
-        )
-        
-        # Create order items
-        for cart_item in cart.items.all():
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                quantity=cart_item.quantity,
-                price=cart_item.product.price
+        except InsufficientStock as exc:
+            return Response(
+                {'error': 'Insufficient stock', 'products': exc.product_ids},
+                status=status.HTTP_409_CONFLICT
             )
         
-        # Clear cart
-        cart.items.all().delete()
-        
+        # Reload through get_queryset to render the items in batched queries
+        order = self.get_queryset().get(pk=order.pk)
         return Response(
             OrderSerializer(order).data,
-            status=status.HTTP_201_CREATED
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
     
     @action(detail=True, methods=['post'])
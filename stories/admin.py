@@ -3,8 +3,9 @@ from .models import Tag, Story, Comment
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ('name', 'created_at')
+    list_display = ('name', 'story_count', 'blog_count', 'product_count', 'created_at')
     search_fields = ('name',)
+    readonly_fields = ('story_count', 'blog_count', 'product_count')
     ordering = ('name',)
 
 class CommentInline(admin.TabularInline):
@@ -16,9 +17,10 @@ class CommentInline(admin.TabularInline):
 
 @admin.register(Story)
 class StoryAdmin(admin.ModelAdmin):
-    list_display = ('title', 'user', 'views', 'like_count', 'created_at')
+    list_display = ('title', 'user', 'views', 'like_count', 'comment_count', 'created_at')
     search_fields = ('title', 'body', 'user__email')
     list_filter = ('created_at',)
+    readonly_fields = ('like_count', 'comment_count')
     filter_horizontal = ('tags', 'likes')
     inlines = [CommentInline]
     ordering = ('-created_at',)
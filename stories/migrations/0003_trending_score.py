@@ -0,0 +1,51 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:47
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import DurationField, ExpressionWrapper, F, FloatField, Value
+from django.db.models.functions import Cast, Extract, Greatest, Power
+from django.utils import timezone
+
+# Engagement weights of settings.TRENDING_MODELS when the column was added
+WEIGHTS = {'views': 1, 'like_count': 4, 'comment_count': 6}
+
+
+def score(weights, now, gravity):
+    # Frozen copy of core.trending.score
+    weighted_total = sum(weight * F(field) for field, weight in weights.items())
+    age = ExpressionWrapper(Value(now) - F('created_at'), output_field=DurationField())
+    age_hours = Greatest(Extract(age, 'epoch'), Value(0.0)) / Value(3600.0)
+    return Cast(weighted_total, FloatField()) / Power(age_hours + Value(2.0), Value(float(gravity)))
+
+
+def backfill_trending_score(apps, schema_editor):
+    # Score the current window so /trending/ is not empty until the first
+    # update_trending run
+    Story = apps.get_model('stories', 'Story')
+    now = timezone.now()
+    cutoff = now - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+    Story.objects.filter(created_at__gte=cutoff).update(
+        trending_score=score(WEIGHTS, now, settings.TRENDING_GRAVITY),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stories', '0002_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='story',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['-trending_score'], name='story_trending_idx'),
+        ),
+        migrations.RunPython(backfill_trending_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.10 on 2026-10-17 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stories', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['story', 'created_at', 'id'], name='comment_story_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['created_at', 'id'], name='story_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:14
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stories', '0006_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='tag',
+            options={'ordering': ['name']},
+        ),
+    ]
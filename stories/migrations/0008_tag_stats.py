@@ -0,0 +1,78 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.expressions
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount(model, field, related_model, related_field):
+    # Frozen copy of core.counters.recount
+    rows = related_model.objects.filter(**{related_field: OuterRef('pk')}).order_by()
+    rows = rows.values(related_field).annotate(n=Count('pk')).values('n')
+    model.objects.update(**{field: Coalesce(Subquery(rows, output_field=IntegerField()), 0)})
+
+
+def backfill_story_count(apps, schema_editor):
+    Tag = apps.get_model('stories', 'Tag')
+    Story = apps.get_model('stories', 'Story')
+    recount(Tag, 'story_count', Story.tags.through, 'tag')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stories', '0007_tag_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField()),
+            ],
+            options={
+                'ordering': ['tag', '-count', 'related_id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='blog_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='product_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='story_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(models.OrderBy(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('story_count'), '+', models.F('blog_count')), '+', models.F('product_count')), descending=True), models.F('name'), name='tag_usage_idx'),
+        ),
+        migrations.AddField(
+            model_name='tagcooccurrence',
+            name='related',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='stories.tag'),
+        ),
+        migrations.AddField(
+            model_name='tagcooccurrence',
+            name='tag',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cooccurrences', to='stories.tag'),
+        ),
+        migrations.AddIndex(
+            model_name='tagcooccurrence',
+            index=models.Index(fields=['tag', '-count'], name='tag_cooccurrence_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tagcooccurrence',
+            constraint=models.UniqueConstraint(fields=('tag', 'related'), name='tag_cooccurrence_unique'),
+        ),
+        migrations.RunPython(backfill_story_count, migrations.RunPython.noop),
+    ]
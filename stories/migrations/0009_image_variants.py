@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-17 23:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stories', '0008_tag_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='story',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
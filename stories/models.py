@@ -1,32 +1,76 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, Q
 from django.conf import settings
 from core.models import TimeStampedModel
 
 class Tag(TimeStampedModel):
     name = models.CharField(max_length=50, unique=True)
+    # Usage per content type, kept by counters registered by each app
+    story_count = models.PositiveIntegerField(default=0)
+    blog_count = models.PositiveIntegerField(default=0)
+    product_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(
+                (F('story_count') + F('blog_count') + F('product_count')).desc(), 'name',
+                name='tag_usage_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.name
 
+class TagCooccurrence(models.Model):
+    """
+    How many stories, blogs and products carry both ``tag`` and ``related``.
+    Rebuilt periodically by the ``rollup_tags`` command.
+    """
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='cooccurrences')
+    related = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField()
+    
+    class Meta:
+        ordering = ['tag', '-count', 'related_id']
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'related'], name='tag_cooccurrence_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', '-count'], name='tag_cooccurrence_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.tag} + {self.related}: {self.count}'
+
 class Story(TimeStampedModel):
     title = models.CharField(max_length=255)
     body = models.TextField()
     image_url = models.URLField(blank=True)
+    # Resized copies of the image (see core.images)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='stories')
     tags = models.ManyToManyField(Tag, related_name='stories', blank=True)
     likes = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='liked_stories', blank=True)
     views = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    trending_score = models.FloatField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         verbose_name_plural = 'Stories'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-trending_score'], name='story_trending_idx'),
+            GinIndex(fields=['search_vector'], name='story_search_idx'),
+            models.Index(fields=['created_at', 'id'], name='story_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
-    
-    @property
-    def like_count(self):
-        return self.likes.count()
 
 class Comment(TimeStampedModel):
     story = models.ForeignKey(Story, on_delete=models.CASCADE, related_name='comments')
@@ -36,6 +80,10 @@ class Comment(TimeStampedModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['story', 'created_at', 'id'], name='comment_story_created_idx'),
+            models.Index(fields=['story', '-created_at'], condition=Q(parent__isnull=True), name='comment_toplevel_idx'),
+        ]
     
     def __str__(self):
         return f"Comment by {self.user.get_full_name()} on {self.story.title}"
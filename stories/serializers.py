@@ -1,12 +1,34 @@
 from rest_framework import serializers
-from .models import Story, Comment, Tag
+from .models import Story, Comment, Tag, TagCooccurrence
+from .tagging import USAGE_FIELDS, set_tags
 from users.serializers import UserSerializer
+from core.fastpath import BatchField, FastPath
+from core.trees import get_tree_replies
 
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ['id', 'name']
 
+class TagUsageSerializer(serializers.ModelSerializer):
+    usage_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'story_count', 'blog_count', 'product_count', 'usage_count']
+
+class RelatedTagSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='related.id')
+    name = serializers.CharField(source='related.name')
+    
+    class Meta:
+        model = TagCooccurrence
+        fields = ['id', 'name', 'count']
+
+class TagStatsQuerySerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=list(USAGE_FIELDS), required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
 class CommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
@@ -17,9 +39,12 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'replies']
     
     def get_replies(self, obj):
-        if not obj.replies.exists():
-            return []
-        return CommentSerializer(obj.replies.all(), many=True).data
+        replies = get_tree_replies(obj)
+        if replies is None:
+            if not obj.replies.exists():
+                return []
+            replies = obj.replies.all()
+        return CommentSerializer(replies, many=True, context=self.context).data
 
 class CommentCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,11 +56,11 @@ class StorySerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)  # Changed this line
     like_count = serializers.IntegerField(read_only=True)
     is_liked = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Story
-        fields = ['id', 'title', 'body', 'image_url', 'user', 'tags', 'like_count', 
+        fields = ['id', 'title', 'body', 'image_url', 'image_variants', 'user', 'tags', 'like_count', 
                   'is_liked', 'views', 'comment_count', 'created_at', 'updated_at']
         read_only_fields = ['id', 'user', 'views', 'created_at', 'updated_at']
     
@@ -44,9 +69,19 @@ class StorySerializer(serializers.ModelSerializer):
         if request and request.user.is_authenticated:
             return obj.likes.filter(id=request.user.id).exists()
         return False
-    
-    def get_comment_count(self, obj):
-        return obj.comments.count()
+
+def liked_stories(rows, context):
+    request = context.get('request')
+    if not (request and request.user.is_authenticated):
+        return {}
+    liked = Story.likes.through.objects.filter(
+        user_id=request.user.id, story_id__in=[row['id'] for row in rows],
+    ).values_list('story_id', flat=True)
+    return {pk: True for pk in liked}
+
+story_fast_path = FastPath(StorySerializer, batch_fields={
+    'is_liked': BatchField(liked_stories, default=False),
+})
 
 class StoryCreateUpdateSerializer(serializers.ModelSerializer):
     tags = serializers.ListField(
@@ -62,10 +97,8 @@ class StoryCreateUpdateSerializer(serializers.ModelSerializer):
         tags_data = validated_data.pop('tags', [])
         story = Story.objects.create(user=self.context['request'].user, **validated_data)
         
-        # Process tags
-        for tag_name in tags_data:
-            tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-            story.tags.add(tag)
+        if tags_data:
+            set_tags(story, tags_data)
         
         return story
     
@@ -79,10 +112,7 @@ class StoryCreateUpdateSerializer(serializers.ModelSerializer):
         
         # Update tags if provided
         if tags_data is not None:
-            instance.tags.clear()
-            for tag_name in tags_data:
-                tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-                instance.tags.add(tag)
+            set_tags(instance, tags_data)
         
         return instance
     
@@ -0,0 +1,15 @@
+from core.cache import register_cache_invalidation
+from core.counters import register_counter
+from core.images import register_images
+from core.search import register_search
+from .models import Story, Comment, Tag
+
+register_counter(Story, 'like_count', Story.likes.through, 'story')
+register_counter(Story, 'comment_count', Comment, 'story')
+register_counter(Tag, 'story_count', Story.tags.through, 'tag')
+
+register_search(Story, {'title': 'A', 'body': 'B'})
+
+register_images(Story, {'image_url': 'image_variants'})
+
+register_cache_invalidation(Tag)
@@ -0,0 +1,168 @@
+"""
+Tags for stories, blogs and products.
+
+``set_tags`` replaces the tags of an object from a list of names in a fixed
+number of queries, whatever the number of tags:
+
+1. names are normalized (trimmed, inner whitespace collapsed, lowercased)
+   and deduplicated;
+2. names already known to this process are mapped to ids from memory, the
+   others are looked up with one ``filter(name__in=...)``;
+3. the tags that still do not exist are created with one
+   ``bulk_create(ignore_conflicts=True)``, so concurrent requests creating
+   the same tag do not fail, and read back;
+4. ``tags.set()`` only deletes and inserts the rows of the through table
+   that change.
+
+The name to id map is per process. It is tied to the ``stories.Tag``
+version of the response cache (see ``core.cache``), which is bumped when a
+tag is saved or deleted, so renamed or deleted tags are not served from
+memory. A worker only sees the bumps of the others through a shared cache
+backend; with a per-process cache (locmem) the map is also dropped every
+``settings.TAG_ID_CACHE_TTL`` seconds, which bounds how long a tag renamed
+or deleted by another worker can be served.
+
+Tag statistics are precomputed, so reading them never groups over the
+through tables:
+
+* ``Tag.story_count``, ``blog_count`` and ``product_count`` are counters
+  (see ``core.counters``) updated as tags are added and removed; ``popular``
+  ranks tags by them;
+* ``TagCooccurrence`` holds, for each tag, the tags most often found on the
+  same story, blog or product. ``rollup_cooccurrence`` rebuilds it from every
+  many-to-many relation to ``Tag`` and runs from the ``rollup_tags``
+  command.
+"""
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from core.cache import invalidate, is_shared, tag_versions
+from .models import Tag, TagCooccurrence
+
+# Bound on the names kept in memory, the map is dropped when it is full
+CACHE_SIZE = 10000
+# Co-occurring tags kept per tag by the rollup
+RELATED_PER_TAG = 20
+# Usage counter of each content type, by the name used in query strings
+USAGE_FIELDS = {
+    'stories': 'story_count',
+    'blogs': 'blog_count',
+    'products': 'product_count',
+}
+
+_cache = {'version': None, 'expires': 0, 'ids': {}}
+
+
+def normalize(names):
+    """
+    The distinct, normalized tag names in ``names``, in their first order.
+    """
+    normalized = (' '.join(name.split()).lower() for name in names)
+    return list(dict.fromkeys(name for name in normalized if name))
+
+
+def _cached_ids():
+    version = tag_versions([Tag._meta.label])[0]
+    now = time.monotonic()
+    # Without a shared cache the changes of other workers only show up once
+    # the map expires
+    expired = not is_shared() and now >= _cache['expires']
+    if expired or _cache['version'] != version or len(_cache['ids']) > CACHE_SIZE:
+        _cache.update(version=version, expires=now + settings.TAG_ID_CACHE_TTL, ids={})
+    return _cache['ids']
+
+
+def resolve(names):
+    """
+    The ids of the tags named ``names``, creating the missing ones, in the
+    order of ``normalize(names)``.
+    """
+    names = normalize(names)
+    ids = _cached_ids()
+    known = {name: ids[name] for name in names if name in ids}
+
+    missing = [name for name in names if name not in known]
+    if missing:
+        found = dict(Tag.objects.filter(name__in=missing).order_by().values_list('name', 'id'))
+        ids.update(found)
+        known.update(found)
+
+        new = [name for name in missing if name not in found]
+        if new:
+            Tag.objects.bulk_create([Tag(name=name) for name in new], ignore_conflicts=True)
+            # Not cached: the tags only exist once the transaction commits
+            known.update(Tag.objects.filter(name__in=new).order_by().values_list('name', 'id'))
+            # bulk_create() skips post_save, drop the cached tag listings here
+            transaction.on_commit(lambda: invalidate(Tag._meta.label))
+
+    return [known[name] for name in names]
+
+
+def set_tags(instance, names):
+    """
+    Make the tags of ``instance`` the tags named ``names``.
+    """
+    instance.tags.set(resolve(names))
+
+
+
+def usage_count():
+    """
+    Expression for the total usage of a tag, matching ``tag_usage_idx``.
+    """
+    return F('story_count') + F('blog_count') + F('product_count')
+
+
+def popular(content_type=None):
+    """
+    Tags in use, most used first: overall, or on one of the ``USAGE_FIELDS``
+    content types.
+    """
+    tags = Tag.objects.annotate(usage_count=usage_count())
+    if content_type is None:
+        return tags.filter(usage_count__gt=0).order_by(usage_count().desc(), 'name')
+    field = USAGE_FIELDS[content_type]
+    return tags.filter(**{f'{field}__gt': 0}).order_by(f'-{field}', 'name')
+
+
+def related(tag):
+    """
+    The ``TagCooccurrence`` rows of ``tag``, most frequent first.
+    """
+    return TagCooccurrence.objects.filter(tag=tag).select_related('related').order_by('-count', 'related_id')
+
+
+def rollup_cooccurrence(per_tag=RELATED_PER_TAG):
+    """
+    Rebuild ``TagCooccurrence`` with the ``per_tag`` tags most often found
+    together with each tag. Readers see the previous rows until the new ones
+    are committed. Returns the number of rows written.
+    """
+    quote = connection.ops.quote_name
+    # Every many-to-many relation to Tag (stories, blogs, products, ...)
+    links = ' UNION ALL '.join(
+        f'SELECT {kind} AS kind, {quote(rel.field.m2m_column_name())} AS object_id, '
+        f'{quote(rel.field.m2m_reverse_name())} AS tag_id FROM {quote(rel.through._meta.db_table)}'
+        for kind, rel in enumerate(r for r in Tag._meta.related_objects if r.many_to_many)
+    )
+    table = quote(TagCooccurrence._meta.db_table)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(
+            f'WITH links AS ({links}), '
+            f'pairs AS ('
+            f'  SELECT a.tag_id, b.tag_id AS related_id, count(*) AS count, '
+            f'  row_number() OVER (PARTITION BY a.tag_id ORDER BY count(*) DESC, b.tag_id) AS rank '
+            f'  FROM links a JOIN links b '
+            f'  ON b.kind = a.kind AND b.object_id = a.object_id AND b.tag_id <> a.tag_id '
+            f'  GROUP BY a.tag_id, b.tag_id'
+            f') '
+            f'INSERT INTO {table} (tag_id, related_id, count) '
+            f'SELECT tag_id, related_id, count FROM pairs WHERE rank <= %s',
+            [per_tag],
+        )
+        return cursor.rowcount
@@ -2,7 +2,7 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Count, Q
+from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Story, Comment, Tag
 from .serializers import (
@@ -10,28 +10,73 @@ from .serializers import (
     StoryCreateUpdateSerializer, 
     CommentSerializer, 
     CommentCreateSerializer,
-    TagSerializer
+    TagSerializer,
+    TagUsageSerializer,
+    RelatedTagSerializer,
+    TagStatsQuerySerializer,
+    story_fast_path
 )
+from .tagging import popular, related
+from core.asyncviews import AsyncViewMixin
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin
+from core.fastpath import FastListMixin
 from core.permissions import IsOwnerOrReadOnly, IsOwnerOrAdmin
+from core.search import FullTextSearchFilter, RankedOrderingFilter
+from core.trees import ReplyTreeMixin
+from core.trending import TrendingMixin
+from core.viewcounts import ViewCountMixin
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
+    cache_models = ['stories.Tag']
     serializer_class = TagSerializer
     permission_classes = [AllowAny]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
+    
+    @action(detail=False, methods=['get'])
+    def popular(self, request):
+        """
+        Most used tags, overall or for one ``?type=`` (stories, blogs,
+        products), read from the precomputed usage counters.
+        """
+        params = TagStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        tags = popular(params.validated_data.get('type'))[:params.validated_data['limit']]
+        return Response(TagUsageSerializer(tags, many=True).data)
+    
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """
+        Tags most often used together with this one, from the last
+        ``rollup_tags`` run.
+        """
+        params = TagStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        cooccurrences = related(self.get_object())[:params.validated_data['limit']]
+        return Response(RelatedTagSerializer(cooccurrences, many=True).data)
 
-class StoryViewSet(viewsets.ModelViewSet):
+class StoryViewSet(AsyncViewMixin, ConditionalGetMixin, ViewCountMixin, TrendingMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Story.objects.all().prefetch_related('tags')
     serializer_class = StorySerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['tags__name', 'user']
+    fast_path = story_fast_path
+    etag_fields = ['like_count', 'comment_count']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RankedOrderingFilter]
+    filterset_fields = {
+        'tags__name': ['exact'],
+        'user': ['exact'],
+        'like_count': ['gte'],
+        'comment_count': ['gte'],
+    }
     search_fields = ['title', 'body']
-    ordering_fields = ['created_at', 'views', 'likes']
+    ordering_fields = ['created_at', 'views', 'like_count', 'comment_count']
+    # ?ordering=likes predates the like_count column
+    ordering_aliases = {'likes': 'like_count'}
     ordering = ['-created_at']
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'trending']:
             permission_classes = [AllowAny]
         elif self.action in ['update', 'partial_update', 'destroy']:
             permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
@@ -44,14 +89,6 @@ class StoryViewSet(viewsets.ModelViewSet):
             return StoryCreateUpdateSerializer
         return StorySerializer
     
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        # Increment view count
-        instance.views += 1
-        instance.save()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
-    
     @action(detail=True, methods=['post'])
     def like(self, request, pk=None):
         story = self.get_object()
@@ -63,29 +100,13 @@ class StoryViewSet(viewsets.ModelViewSet):
         else:
             story.likes.add(user)
             return Response({'status': 'liked'})
-    
-    @action(detail=False, methods=['get'])
-    def trending(self, request):
-        # Get trending stories based on views and likes in the last 30 days
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        
-        trending_stories = Story.objects.filter(
-            created_at__gte=thirty_days_ago
-        ).annotate(
-            like_count=Count('likes'),
-            comment_count=Count('comments')
-        ).order_by('-views', '-like_count', '-comment_count')[:10]
-        
-        serializer = self.get_serializer(trending_stories, many=True)
-        return Response(serializer.data)
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplyTreeMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.filter(parent=None)  # Only top-level comments
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    reply_scope_field = 'story'
+    etag_scope_field = 'story'
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -102,7 +123,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         return CommentSerializer
     
     def get_queryset(self):
-        queryset = Comment.objects.filter(parent=None)  # Only top-level comments
+        queryset = Comment.objects.filter(parent=None).select_related('user')  # Only top-level comments
         
         # Filter by story if provided
         story_id = self.request.query_params.get('story', None)
@@ -0,0 +1,22 @@
+from django.contrib import admin, messages
+from django.db import IntegrityError
+from django.utils import timezone
+from .models import Task
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'queue', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'created_at')
+    list_filter = ('status', 'queue', 'name')
+    search_fields = ('name', 'key', 'last_error')
+    readonly_fields = ('locked_by', 'locked_at', 'last_error', 'created_at', 'updated_at')
+    ordering = ('run_at', 'id')
+    actions = ['retry']
+    
+    @admin.action(description='Retry selected failed tasks now')
+    def retry(self, request, queryset):
+        try:
+            count = queryset.filter(status='FAILED').update(status='QUEUED', attempts=0, run_at=timezone.now())
+        except IntegrityError:
+            self.message_user(request, 'Some of these tasks are already queued.', messages.ERROR)
+            return
+        self.message_user(request, f'{count} tasks queued again.')
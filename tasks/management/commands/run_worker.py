@@ -0,0 +1,35 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.worker import Worker, run_processes
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background tasks (see tasks.queue)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queues', default=','.join(settings.TASK_QUEUES),
+            help='Comma separated queues to run (default: TASK_QUEUES, every queue)',
+        )
+        parser.add_argument('--threads', type=int, default=4, help='Tasks run at once per process (default: 4)')
+        parser.add_argument('--processes', type=int, default=1, help='Worker processes (default: 1)')
+        parser.add_argument('--poll-interval', type=float, help='Seconds between polls when idle (default: TASK_POLL_INTERVAL)')
+        parser.add_argument('--once', action='store_true', help='Exit once no task is ready')
+
+    def handle(self, *args, **options):
+        queues = [queue.strip() for queue in options['queues'].split(',') if queue.strip()]
+        if options['processes'] > 1:
+            exitcodes = run_processes(
+                options['processes'], queues, options['threads'], options['poll_interval'], options['once'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'{len(exitcodes)} worker processes exited with {exitcodes}'))
+            return
+
+        worker = Worker(queues, options['threads'], options['poll_interval'])
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        processed, failed = worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS(f'Ran {processed} tasks, {failed} failed'))
@@ -0,0 +1,45 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from core.models import TimeStampedModel
+
+class Task(TimeStampedModel):
+    """
+    A call of a function decorated with ``tasks.queue.task``, waiting for or
+    being run by a ``run_worker`` process.
+    """
+    TASK_STATUS = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('FAILED', 'Failed'),
+    )
+    
+    name = models.CharField(max_length=200)
+    queue = models.CharField(max_length=50, default='default')
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Tasks enqueued with a key are not queued twice
+    key = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=TASK_STATUS, default='QUEUED')
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['run_at', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'key'], condition=Q(status='QUEUED'), name='task_queued_key_unique',
+            ),
+        ]
+        indexes = [
+            # Only the rows workers poll for
+            models.Index(fields=['queue', 'run_at', 'id'], condition=Q(status='QUEUED'), name='task_ready_idx'),
+            models.Index(fields=['locked_at'], condition=Q(status='RUNNING'), name='task_running_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.name}#{self.pk}'
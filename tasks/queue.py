@@ -0,0 +1,188 @@
+"""
+Database-backed task queue.
+
+Functions decorated with ``task`` can be run later by a worker::
+
+    @task(queue='media', max_attempts=3)
+    def make_variants(url):
+        ...
+
+    make_variants.delay(url)                # queue a call
+    make_variants.enqueue([url], key=url)   # at most one queued call per key
+    make_variants(url)                      # plain call, in this process
+
+Queued calls are ``Task`` rows written in the caller's transaction, so they
+are only seen by workers once it commits and vanish if it rolls back.
+Arguments must be JSON serializable.
+
+Workers (the ``run_worker`` command, see ``tasks.worker``) claim ready rows
+with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of them can poll
+the same table without waiting on each other or running a task twice. A
+task that raises is retried after an exponential backoff
+(``TASK_RETRY_BACKOFF`` seconds, doubled per attempt, up to
+``TASK_RETRY_BACKOFF_MAX``) until it has been attempted ``max_attempts``
+times, then kept as ``FAILED``. Successful tasks are deleted. Tasks left
+``RUNNING`` for more than ``TASK_TIMEOUT`` seconds by a worker that died are
+queued again.
+
+With ``TASKS_EAGER`` enabled, ``delay`` runs the call right away instead,
+for development without a worker.
+"""
+from datetime import timedelta
+from importlib import import_module
+import logging
+import random
+import traceback
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+class TaskFunction:
+    def __init__(self, func, name, queue, max_attempts):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.enqueue(args, kwargs)
+
+    def enqueue(self, args=(), kwargs=None, run_at=None, key=None):
+        """
+        Queue a call. Returns the ``Task``, or ``None`` when ``key`` is
+        already queued or the call was run eagerly.
+        """
+        if settings.TASKS_EAGER:
+            self.func(*args, **(kwargs or {}))
+            return None
+        task = Task(
+            name=self.name,
+            queue=self.queue,
+            args=list(args),
+            kwargs=kwargs or {},
+            key=key,
+            run_at=run_at or timezone.now(),
+            max_attempts=self.max_attempts,
+        )
+        try:
+            with transaction.atomic():
+                task.save()
+        except IntegrityError:
+            # The same key is already queued
+            return None
+        return task
+
+
+def task(func=None, *, name=None, queue='default', max_attempts=None):
+    """
+    Decorator registering ``func`` as a task. Tasks are named after their
+    module and function unless ``name`` is given.
+    """
+    def decorate(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        registry[task_name] = TaskFunction(func, task_name, queue, max_attempts or settings.TASK_MAX_ATTEMPTS)
+        return registry[task_name]
+    return decorate(func) if func is not None else decorate
+
+
+def get_task(name):
+    if name not in registry:
+        # Importing the module registers its tasks
+        module, _, _ = name.rpartition('.')
+        try:
+            import_module(module)
+        except ImportError:
+            pass
+    return registry.get(name)
+
+
+def claim(worker, queues, limit):
+    """
+    Lock up to ``limit`` ready tasks of ``queues`` for ``worker`` and return
+    them, oldest first.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status='QUEUED', queue__in=queues, run_at__lte=now)
+            .order_by('run_at', 'id')[:limit]
+        )
+        if tasks:
+            Task.objects.filter(pk__in=[t.pk for t in tasks]).update(
+                status='RUNNING', locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+            )
+    for t in tasks:
+        t.status, t.locked_by, t.locked_at, t.attempts = 'RUNNING', worker, now, t.attempts + 1
+    return tasks
+
+
+def backoff(attempts):
+    """
+    Seconds to wait before retrying a task that failed ``attempts`` times,
+    with up to 10% jitter so that failed batches do not retry in lockstep.
+    """
+    delay = min(settings.TASK_RETRY_BACKOFF * 2 ** (attempts - 1), settings.TASK_RETRY_BACKOFF_MAX)
+    return delay * random.uniform(1, 1.1)
+
+
+def execute(t):
+    """
+    Run a claimed task, then delete it or schedule its retry. Returns
+    whether it succeeded.
+    """
+    function = get_task(t.name)
+    try:
+        if function is None:
+            raise LookupError(f'Unknown task {t.name}')
+        function.func(*t.args, **t.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if t.attempts < t.max_attempts and function is not None:
+            logger.warning(f'Task {t} failed (attempt {t.attempts}/{t.max_attempts}), retrying')
+            _requeue(t, timezone.now() + timedelta(seconds=backoff(t.attempts)), last_error=error)
+        else:
+            logger.error(f'Task {t} failed after {t.attempts} attempts\n{error}')
+            Task.objects.filter(pk=t.pk).update(status='FAILED', locked_by='', locked_at=None, last_error=error)
+        return False
+    Task.objects.filter(pk=t.pk).delete()
+    return True
+
+
+def _requeue(t, run_at, **fields):
+    try:
+        with transaction.atomic():
+            Task.objects.filter(pk=t.pk).update(status='QUEUED', locked_by='', locked_at=None, run_at=run_at, **fields)
+    except IntegrityError:
+        # An identical call (same key) was queued meanwhile, it replaces this one
+        Task.objects.filter(pk=t.pk).delete()
+
+
+def requeue_stale(now=None):
+    """
+    Queue again the tasks left ``RUNNING`` for more than ``TASK_TIMEOUT``
+    seconds by a worker that died, or fail those out of attempts. Returns
+    their number. ``TASK_TIMEOUT`` must exceed the longest task.
+    """
+    now = now or timezone.now()
+    stale = Task.objects.filter(status='RUNNING', locked_at__lt=now - timedelta(seconds=settings.TASK_TIMEOUT))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='FAILED', locked_by='', locked_at=None, last_error='Worker lost while running the task',
+    )
+    stale = list(stale.filter(attempts__lt=F('max_attempts')))
+    for t in stale:
+        _requeue(t, now)
+    return failed + len(stale)
@@ -0,0 +1,126 @@
+"""
+Worker loop behind the ``run_worker`` command.
+
+A ``Worker`` runs claimed tasks on a pool of threads, each thread with its
+own database connection. It claims only as many tasks as it has idle
+threads, so the tasks it holds are always running. When no task is ready it
+polls again after ``TASK_POLL_INTERVAL`` seconds. ``run_processes`` forks
+several workers for CPU-bound tasks such as image resizing.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+
+from .queue import claim, execute, requeue_stale
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two checks for tasks of dead workers
+STALE_CHECK_INTERVAL = 60
+
+
+class Worker:
+    def __init__(self, queues, threads=1, poll_interval=None):
+        self.queues = queues
+        self.threads = threads
+        self.poll_interval = poll_interval or settings.TASK_POLL_INTERVAL
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self.processed = self.failed = 0
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def _run(self, t):
+        try:
+            return execute(t)
+        except Exception:
+            # Recording the outcome failed, the task is requeued once stale
+            logger.exception(f'Error finishing task {t}')
+            return False
+        finally:
+            connection.close()
+
+    def run(self, once=False):
+        """
+        Run tasks until ``stop`` is called, or until no task is ready when
+        ``once`` is true. Running tasks are always finished.
+        """
+        logger.info(f'Worker {self.name} running {", ".join(self.queues)} with {self.threads} threads')
+        running = set()
+        last_stale_check = 0
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='task') as pool:
+            while not self.stopping.is_set():
+                close_old_connections()
+                if time.monotonic() - last_stale_check > STALE_CHECK_INTERVAL:
+                    requeue_stale()
+                    last_stale_check = time.monotonic()
+
+                idle = self.threads - len(running)
+                tasks = claim(self.name, self.queues, idle) if idle else []
+                running.update(pool.submit(self._run, t) for t in tasks)
+
+                if not running:
+                    if once:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                # Back to claiming as soon as a thread is free, and polling
+                # meanwhile while some are idle
+                timeout = None if len(running) >= self.threads else self.poll_interval
+                done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.result():
+                        self.processed += 1
+                    else:
+                        self.failed += 1
+
+            for future in running:
+                if future.result():
+                    self.processed += 1
+                else:
+                    self.failed += 1
+        return self.processed, self.failed
+
+
+def _process_main(queues, threads, poll_interval, once):
+    worker = Worker(queues, threads, poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(once=once)
+
+
+def run_processes(processes, queues, threads, poll_interval=None, once=False):
+    """
+    Fork ``processes`` workers and wait for them. SIGTERM and SIGINT are
+    passed on, and each worker finishes its running tasks before exiting.
+    """
+    # Children must not share the parent's database connections
+    connections.close_all()
+    children = [
+        multiprocessing.get_context('fork').Process(
+            target=_process_main, args=(queues, threads, poll_interval, once), name=f'worker-{i}',
+        )
+        for i in range(processes)
+    ]
+    for child in children:
+        child.start()
+
+    def forward(signum, frame):
+        for child in children:
+            if child.is_alive():
+                os.kill(child.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for child in children:
+        child.join()
+    return [child.exitcode for child in children]
@@ -37,6 +37,8 @@ class User(AbstractBaseUser, PermissionsMixin, TimeStampedModel):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='PATIENT')
     city = models.CharField(max_length=100, blank=True)
     avatar_url = models.URLField(blank=True)
+    # Resized copies of the avatar (see core.images)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     is_banned = models.BooleanField(default=False)
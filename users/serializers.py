@@ -8,7 +8,7 @@ User = get_user_model()
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ('id', 'email', 'first_name', 'last_name', 'role', 'city', 'avatar_url', 'created_at')
+        fields = ('id', 'email', 'first_name', 'last_name', 'role', 'city', 'avatar_url', 'avatar_variants', 'created_at')
         read_only_fields = ('id', 'created_at')
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,10 @@
+from core.cache import register_cache_invalidation
+from core.images import register_images
+from .models import User
+from .serializers import UserSerializer
+
+register_images(User, {'avatar_url': 'avatar_variants'})
+
+# Users are cached as the authors of blogs and reviews: logins, password
+# changes and other saves of fields not rendered there keep those responses
+register_cache_invalidation(User, fields=UserSerializer.Meta.fields)
@@ -13,6 +13,7 @@ from .serializers import (
     CustomTokenObtainPairSerializer,
     AdminUserUpdateSerializer
 )
+from core.conditional import ConditionalGetMixin
 from core.permissions import IsAdminUser
 
 User = get_user_model()
@@ -73,7 +74,7 @@ class ChangePasswordView(generics.UpdateAPIView):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class AdminUserViewSet(viewsets.ModelViewSet):
+class AdminUserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
@@ -90,7 +91,7 @@ class AdminUserViewSet(viewsets.ModelViewSet):
         instance.is_active = False
         instance.save()
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     filterset_fields = ['role', 'is_active', 'is_banned', 'city']